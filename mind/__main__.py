@@ -10,46 +10,103 @@ Created on Jun 20, 2015
 #################### USAGE ##########################
 
 # sudo python3.3 -m mind
+# sudo python3.3 -m mind --workers=4
+# sudo python3.3 -m mind --data_dir=data
+# sudo python3.3 -m mind --warmup=false
+# sudo python3.3 -m mind --max_thoughts=20000 --max_in_flight=16
+# sudo python3.3 -m mind --model_idle_timeout=600 --model_memory_mb=2048
 
 #####################################################
 
 import os
+import time
+
+# Taken before the imports below so their cost shows up in the startup log
+IMPORT_START = time.perf_counter()
+
 import tornado.httpserver
 import tornado.ioloop
+import tornado.netutil
 
 from tornado_json.application import Application
 from tornado.options import define, options
 
-#from mind.api.sentiment import Sentiment_Analysis
+from mind.api.sentiment import Sentiment_Analysis
 from mind.api.wordstream import Wordstream_Analysis
+from mind.api.thoughttype import Thought_Type_Analysis
+from mind.api.cache import Cache_Stats
+from mind.api.metrics import Metrics_Handler
+from mind.api.artifacts import Artifact_Handler
+from mind.api.startup import Ready_Handler
+from mind.api import pool, prefork, startup
 
 # Define Some Defaults
 define("port", default=443, help="run on the given port", type=int)
+define("workers", default=1, help="number of pre-forked worker processes", type=int)
+define("max_restarts", default=100, help="maximum number of crashed workers to restart", type=int)
+
+def get_routes():
+	"""Return the routes served by the web service"""
+
+	routes = [
+		("/sentiment/?", Sentiment_Analysis),
+		("/wordstream/?", Wordstream_Analysis),
+		("/thoughttype/?", Thought_Type_Analysis),
+		("/cache/?", Cache_Stats),
+		("/metrics/?", Metrics_Handler),
+		("/ready/?", Ready_Handler),
+		("/data/(.*)", Artifact_Handler, {"path": os.path.abspath(options.data_dir)})
+	]
+
+	return routes
 
 def main():
 	"""Launches an HTTPS web service."""
 
+	timer = startup.StartupTimer(start=IMPORT_START)
+	timer.mark("imports")
+
 	# Log that Server is Started
 	print("-- Server Started --")
 
 	# Log access to the web service
 	tornado.options.parse_command_line()
+	timer.mark("options")
 
-	# Define valid routes
-	routes = [
-		#("/sentiment/?", Sentiment_Analysis),
-		("/wordstream/?", Wordstream_Analysis)
-	]
-
-	# Create the tornado_json.application
+	# Create the tornado_json.application and warm up handlers
+	# before forking so loaded modules are shared copy-on-write
+	routes = get_routes()
 	application = Application(routes=routes, settings={})
+	startup.warmup(routes, timer)
+
+	if options.workers > 1:
+
+		# Bind once in the parent, then fork workers sharing the socket
+		sockets = tornado.netutil.bind_sockets(options.port)
+		prefork.fork_workers(options.workers, max_restarts=options.max_restarts)
+		timer.mark("fork")
+
+		# Only workers reach this point
+		pool.prime()
+		timer.mark("pool")
+		http_server = tornado.httpserver.HTTPServer(application)
+		http_server.add_sockets(sockets)
+
+	else:
+
+		# Start the http_server listening on default port
+		pool.prime()
+		timer.mark("pool")
+		http_server = tornado.httpserver.HTTPServer(application)
+		http_server.listen(options.port)
 
-	# Create the http server
-	http_server = tornado.httpserver.HTTPServer(application)
+	timer.mark("listen")
+	timer.log()
 
-	# Start the http_server listening on default port
-	http_server.listen(options.port)
-	tornado.ioloop.IOLoop.instance().start()
+	io_loop = tornado.ioloop.IOLoop.current()
+	prefork.stop_on_signal(http_server, io_loop)
+	io_loop.add_callback(startup.set_ready)
+	io_loop.start()
 
 if __name__ == '__main__':
-	main()
\ No newline at end of file
+	main()
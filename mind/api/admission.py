@@ -0,0 +1,81 @@
+#!/usr/local/bin/python3
+
+"""This module limits the size of API requests and the number of
+requests each route works on at once, so bulk callers are turned
+away quickly instead of queueing behind each other
+
+Created on Oct 18, 2026
+@author: Matthew Sevrens
+"""
+
+from tornado.options import define, options
+from tornado_json.exceptions import APIError
+
+from mind.api import metrics
+
+define("max_days", default=3660, help="most days accepted in one request (0 disables the limit)", type=int)
+define("max_thoughts", default=20000, help="most thoughts accepted in one request (0 disables the limit)", type=int)
+define("max_body_mb", default=32, help="largest request body accepted, in megabytes (0 disables the limit)", type=int)
+define("max_in_flight", default=16, help="requests each route works on at once per worker (0 disables the limit)", type=int)
+define("retry_after", default=1, help="seconds overloaded clients are told to wait before retrying", type=int)
+
+class Overloaded(APIError):
+	"""A route already has as many requests in flight as allowed"""
+
+	def __init__(self, route, retry_after):
+		super().__init__(503, "{0} is at capacity; retry after {1} seconds".format(route, retry_after))
+		self.retry_after = retry_after
+
+REJECTIONS = metrics.Counter("mind_rejected_requests_total", "API requests turned away by admission control", ["route", "reason"])
+
+_in_flight = {}
+
+def check_body(route, size):
+	"""Reject a request body larger than allowed before decoding it"""
+
+	limit = options.max_body_mb * 2 ** 20
+
+	if limit > 0 and size > limit:
+		REJECTIONS.inc(route, "too_large")
+		raise APIError(413, "Request body has {0} bytes; at most {1} are accepted".format(size, limit))
+
+def check_size(route, days, thoughts):
+	"""Reject a request with more days or thoughts than allowed"""
+
+	for count, limit, unit in [(days, options.max_days, "days"), (thoughts, options.max_thoughts, "thoughts")]:
+		if limit > 0 and count > limit:
+			REJECTIONS.inc(route, "too_many_" + unit)
+			raise APIError(413, "Request has {0} {1}; at most {2} are accepted".format(count, unit, limit))
+
+def acquire(route):
+	"""Take one of the route's in-flight slots or raise Overloaded"""
+
+	in_flight = _in_flight.get(route, 0)
+
+	if options.max_in_flight > 0 and in_flight >= options.max_in_flight:
+		REJECTIONS.inc(route, "overloaded")
+		raise Overloaded(route, options.retry_after)
+
+	_in_flight[route] = in_flight + 1
+
+def release(route):
+	"""Give back a slot taken by acquire"""
+	_in_flight[route] -= 1
+
+def in_flight():
+	"""Number of requests being worked on across every route"""
+	return sum(_in_flight.values())
+
+def collect_metrics():
+	"""Report in-flight requests and rejections to /metrics"""
+
+	in_flight = metrics.Gauge("mind_in_flight_requests", "API requests being worked on", ["route"])
+	for route, count in _in_flight.items():
+		in_flight.set(route, value=count)
+
+	return [in_flight, REJECTIONS]
+
+metrics.register_collector(collect_metrics)
+
+if __name__ == "__main__":
+	print("This module is a library that contains useful functions; it should not be run from the console.")
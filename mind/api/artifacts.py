@@ -0,0 +1,170 @@
+#!/usr/local/bin/python3
+
+"""This module serves the generated knowledge tree JSON artifacts to
+the UI, preferring the compressed copies written alongside them and
+answering repeat visits with a 304. Nothing else in the data
+directory, such as the raw thoughts, is ever served.
+
+Created on Oct 18, 2026
+@author: Matthew Sevrens
+"""
+
+import fnmatch
+import mimetypes
+import mmap
+import os
+import threading
+
+from tornado.options import define
+from tornado.web import HTTPError, StaticFileHandler
+
+define("data_dir", default="data", help="directory of generated artifacts served under /data/", type=str)
+
+# The only files under data_dir that may be served
+ARTIFACTS = ["word2vec_tree.json", "sensemaking_word2vec_tree_*.json"]
+
+# Preferred first when the client accepts both
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+CHUNK_SIZE = 64 * 1024
+
+def is_artifact(path):
+	"""Whether a path relative to data_dir names a served artifact"""
+	return "/" not in path and os.sep not in path and any(fnmatch.fnmatchcase(path, pattern) for pattern in ARTIFACTS)
+
+def accepted_encodings(header):
+	"""Parse an Accept-Encoding header into the set of codings
+	the client will take"""
+
+	accepted = set()
+
+	for part in header.split(","):
+		coding, _, params = part.strip().partition(";")
+		quality = 1.0
+		for param in params.split(";"):
+			name, _, value = param.strip().partition("=")
+			if name == "q":
+				try:
+					quality = float(value)
+				except ValueError:
+					quality = 0.0
+		if coding and quality > 0:
+			accepted.add(coding.strip().lower())
+
+	return accepted
+
+class Artifact_Handler(StaticFileHandler):
+	"""This class serves the knowledge tree artifacts of the data
+	directory with content negotiation over pre-compressed variants"""
+
+	# abspath -> (mtime_ns, size, mmap), shared by all requests
+	_maps = {}
+	_maps_lock = threading.Lock()
+
+	def validate_absolute_path(self, root, absolute_path):
+		"""Swap in a pre-compressed variant the client accepts if one
+		is at least as new as the original. Anything but an artifact
+		is not found."""
+
+		if not is_artifact(os.path.relpath(absolute_path, root)):
+			raise HTTPError(404)
+
+		absolute_path = super().validate_absolute_path(root, absolute_path)
+		self.content_encoding = None
+		self.original_path = absolute_path
+
+		if absolute_path is None:
+			return None
+
+		accepted = accepted_encodings(self.request.headers.get("Accept-Encoding", ""))
+		original = self._stat_result
+
+		for coding, suffix in ENCODINGS:
+			if coding not in accepted and "*" not in accepted:
+				continue
+			try:
+				variant = os.stat(absolute_path + suffix)
+			except OSError:
+				continue
+			if variant.st_mtime_ns < original.st_mtime_ns:
+				continue
+			self.content_encoding = coding
+			self._stat_result = variant
+			return absolute_path + suffix
+
+		return absolute_path
+
+	def compute_etag(self):
+		"""Tag each representation by modification time and size
+		instead of hashing the whole file"""
+
+		stat_result = self._stat()
+
+		return '"{0:x}-{1:x}"'.format(stat_result.st_mtime_ns, stat_result.st_size)
+
+	def get_content_type(self):
+		"""Describe the original file rather than its compressed copy"""
+		mime_type, _ = mimetypes.guess_type(self.original_path)
+		return mime_type or "application/octet-stream"
+
+	def get_cache_time(self, path, modified, mime_type):
+		"""Artifacts are regenerated in place so always revalidate"""
+		return 0
+
+	def set_extra_headers(self, path):
+		"""Mark the response as negotiated and compressed"""
+
+		# The compress_response transform adds Vary by itself
+		if not self.settings.get("compress_response", self.settings.get("gzip")):
+			self.set_header("Vary", "Accept-Encoding")
+
+		self.set_header("Cache-Control", "no-cache")
+
+		if self.content_encoding:
+			self.set_header("Content-Encoding", self.content_encoding)
+
+	@classmethod
+	def get_mapping(cls, abspath):
+		"""Return a memory map of abspath, remapping it if the file
+		has been regenerated since it was last mapped"""
+
+		stat_result = os.stat(abspath)
+		version = (stat_result.st_mtime_ns, stat_result.st_size)
+
+		with cls._maps_lock:
+
+			cached = cls._maps.get(abspath)
+
+			if cached is not None and cached[:2] == version:
+				return cached[2]
+
+			with open(abspath, "rb") as artifact:
+				mapping = mmap.mmap(artifact.fileno(), 0, access=mmap.ACCESS_READ)
+
+			cls._maps[abspath] = version + (mapping,)
+
+			# Requests still streaming the old map keep a reference to it
+			return mapping
+
+	@classmethod
+	def get_content(cls, abspath, start=None, end=None):
+		"""Stream the requested range out of the memory map"""
+
+		if os.path.getsize(abspath) == 0:
+			yield b""
+			return
+
+		mapping = cls.get_mapping(abspath)
+		start = start or 0
+		end = len(mapping) if end is None else end
+
+		for offset in range(start, end, CHUNK_SIZE):
+			yield mapping[offset:min(offset + CHUNK_SIZE, end)]
+
+	@classmethod
+	def get_content_version(cls, abspath):
+		"""Version static URLs by modification time and size"""
+		stat_result = os.stat(abspath)
+		return "{0:x}-{1:x}".format(stat_result.st_mtime_ns, stat_result.st_size)
+
+if __name__ == "__main__":
+	print("This module is a library that contains useful functions; it should not be run from the console.")
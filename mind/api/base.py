@@ -0,0 +1,52 @@
+#!/usr/local/bin/python3
+
+"""This module defines the request handler shared by the
+Prophet Mind web service APIs
+
+Created on Oct 18, 2026
+@author: Matthew Sevrens
+"""
+
+from tornado_json.requesthandlers import APIHandler
+
+from mind.api import codec
+
+class Base_Handler(APIHandler):
+	"""APIHandler that serializes responses with the API codec"""
+
+	def write(self, chunk):
+		"""Encode dicts with the fast codec instead of tornado's json_encode"""
+
+		if isinstance(chunk, dict):
+			chunk = codec.dumps(chunk)
+			self.set_header("Content-Type", "application/json; charset=UTF-8")
+			self.response_size = getattr(self, "response_size", 0) + len(chunk)
+
+		super().write(chunk)
+
+	def write_error(self, status_code, **kwargs):
+		"""Write errors as JSend, telling overloaded clients when to retry"""
+
+		exc_info = kwargs.get("exc_info")
+
+		# send_error without an exception, such as tornado's own 405
+		if exc_info is None:
+			self.clear()
+			self.set_status(status_code)
+			self.error(message=self._reason, code=status_code)
+			return
+
+		exception = exc_info[1]
+		retry_after = getattr(exception, "retry_after", None)
+
+		if retry_after is None:
+			return super().write_error(status_code, **kwargs)
+
+		# Set after clear() so the header is not thrown away
+		self.clear()
+		self.set_status(status_code)
+		self.set_header("Retry-After", str(retry_after))
+		self.fail(exception.log_message)
+
+if __name__ == "__main__":
+	print("This module is a Class; it should not be run from the console.")
@@ -0,0 +1,112 @@
+#!/usr/local/bin/python3
+
+"""This module merges concurrent classification requests into
+shared batches run on a dedicated inference thread
+
+Created on Oct 18, 2026
+@author: Matthew Sevrens
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from tornado.concurrent import Future
+from tornado.ioloop import IOLoop
+
+class InferenceBatcher(object):
+	"""Collects thoughts from concurrent requests and classifies them
+	together once max_batch_size thoughts are waiting or the oldest
+	request has waited max_wait seconds. All bookkeeping happens on the
+	IOLoop; only the classifier runs on the inference thread."""
+
+	def __init__(self, load_classifier, max_batch_size=64, max_wait=0.005):
+		self.load_classifier = load_classifier
+		self.max_batch_size = max_batch_size
+		self.max_wait = max_wait
+		self.executor = ThreadPoolExecutor(max_workers=1)
+		self.classifier = None
+		self.pending = []
+		self.pending_count = 0
+		self.deadline = None
+		self.busy = False
+
+	def classify(self, thoughts):
+		"""Queue thoughts for classification and return a Future
+		resolving to the labeled thoughts"""
+
+		future = Future()
+
+		if len(thoughts) == 0:
+			future.set_result([])
+			return future
+
+		self.pending.append((thoughts, future))
+		self.pending_count += len(thoughts)
+
+		if self.pending_count >= self.max_batch_size:
+			self.dispatch()
+		elif self.deadline is None:
+			self.deadline = IOLoop.current().call_later(self.max_wait, self.on_deadline)
+
+		return future
+
+	def on_deadline(self):
+		"""The oldest request has waited long enough"""
+		self.deadline = None
+		self.dispatch()
+
+	def dispatch(self):
+		"""Send up to max_batch_size pending thoughts to the inference
+		thread unless it is still busy with the previous batch"""
+
+		if self.busy or not self.pending:
+			return
+
+		if self.deadline is not None:
+			IOLoop.current().remove_timeout(self.deadline)
+			self.deadline = None
+
+		# Take whole requests; one oversized request runs on its own
+		batch, count = [], 0
+		while self.pending and (not batch or count + len(self.pending[0][0]) <= self.max_batch_size):
+			thoughts, future = self.pending.pop(0)
+			batch.append((thoughts, future))
+			count += len(thoughts)
+
+		self.pending_count -= count
+		self.busy = True
+
+		merged = [thought for thoughts, _ in batch for thought in thoughts]
+		inference = self.executor.submit(self.run_batch, merged)
+		IOLoop.current().add_future(inference, lambda done: self.on_batch_done(batch, done))
+
+	def run_batch(self, thoughts):
+		"""Classify a merged batch on the inference thread"""
+
+		if self.classifier is None:
+			self.classifier = self.load_classifier()
+
+		return self.classifier(thoughts)
+
+	def on_batch_done(self, batch, inference):
+		"""Hand every request its slice of the batch results"""
+
+		self.busy = False
+
+		try:
+			results = inference.result()
+		except Exception as e:
+			for _, future in batch:
+				if not future.done():
+					future.set_exception(e)
+		else:
+			offset = 0
+			for thoughts, future in batch:
+				if not future.done():
+					future.set_result(results[offset:offset + len(thoughts)])
+				offset += len(thoughts)
+
+		# Requests that queued while the thread was busy have already waited
+		self.dispatch()
+
+if __name__ == "__main__":
+	print("This module is a Class; it should not be run from the console.")
@@ -0,0 +1,241 @@
+#!/usr/local/bin/python3
+
+"""This module caches per day analysis results for the Prophet Mind
+web service, keyed by a hash of the day's thoughts
+
+Created on Oct 18, 2026
+@author: Matthew Sevrens
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from collections import OrderedDict
+
+from tornado import gen
+from tornado.ioloop import IOLoop
+from tornado.options import define, options
+
+from mind.api import codec, metrics
+from mind.api.base import Base_Handler
+
+define("cache_size", default=10000, help="days of results kept in memory per worker (0 disables the cache)", type=int)
+define("cache_dir", default=None, help="directory for the on-disk result cache tier", type=str)
+
+class ResultCache(object):
+	"""LRU cache of JSON serializable results with an optional
+	on-disk tier that survives restarts. get_many and put_many read
+	and write the disk tier on a thread so the IOLoop never waits on
+	the file system."""
+
+	def __init__(self, max_entries, directory=None, namespace=""):
+		self.max_entries = max_entries
+		self.directory = directory
+		self.namespace = namespace
+		self.entries = OrderedDict()
+		self.hits = 0
+		self.disk_hits = 0
+		self.misses = 0
+		self.evictions = 0
+
+		if directory:
+			os.makedirs(directory, exist_ok=True)
+
+	def key(self, content):
+		"""Hash JSON serializable content together with the namespace.
+		The standard library serialization keeps keys the same
+		whichever codec the API uses."""
+
+		serialized = json.dumps(content, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+		digest = hashlib.sha1(self.namespace.encode("utf-8"))
+		digest.update(serialized.encode("utf-8", errors="surrogatepass"))
+
+		return digest.hexdigest()
+
+	def get(self, key):
+		"""Return the cached value for key or None"""
+
+		value = self.recall(key)
+
+		if value is None:
+			value = self.read_disk(key)
+			self.count_disk_lookup(key, value)
+
+		return value
+
+	def put(self, key, value):
+		"""Cache value under key in memory and on disk"""
+		self.remember(key, value)
+		self.write_disk(key, value)
+
+	@gen.coroutine
+	def get_many(self, keys):
+		"""Return the cached value or None for each key, reading
+		entries missing from memory off the IOLoop"""
+
+		values = [self.recall(key) for key in keys]
+		missing = [key for key, value in zip(keys, values) if value is None]
+
+		if not missing:
+			return values
+
+		if self.directory:
+			found = yield IOLoop.current().run_in_executor(None, self.read_many, missing)
+		else:
+			found = [None] * len(missing)
+
+		found = dict(zip(missing, found))
+
+		for key, value in found.items():
+			self.count_disk_lookup(key, value)
+
+		return [found[key] if value is None else value for key, value in zip(keys, values)]
+
+	@gen.coroutine
+	def put_many(self, items):
+		"""Cache (key, value) pairs, writing the disk tier off the IOLoop"""
+
+		for key, value in items:
+			self.remember(key, value)
+
+		if self.directory and items:
+			yield IOLoop.current().run_in_executor(None, self.write_many, items)
+
+	def recall(self, key):
+		"""Return the value held in memory for key or None"""
+
+		if key not in self.entries:
+			return None
+
+		self.entries.move_to_end(key)
+		self.hits += 1
+
+		return self.entries[key]
+
+	def count_disk_lookup(self, key, value):
+		"""Count a lookup that missed memory, keeping disk hits"""
+
+		if value is None:
+			self.misses += 1
+		else:
+			self.disk_hits += 1
+			self.remember(key, value)
+
+	def remember(self, key, value):
+		"""Keep value in memory, evicting the least recently used"""
+
+		self.entries[key] = value
+		self.entries.move_to_end(key)
+
+		while len(self.entries) > self.max_entries:
+			self.entries.popitem(last=False)
+			self.evictions += 1
+
+	def disk_path(self, key):
+		"""Path of the on-disk entry for key"""
+		return os.path.join(self.directory, key[:2], key + ".json")
+
+	def read_disk(self, key):
+		"""Load an entry from the disk tier if there is one"""
+
+		if not self.directory:
+			return None
+
+		try:
+			with open(self.disk_path(key), "rb") as entry:
+				return codec.loads(entry.read())
+		except (OSError, ValueError):
+			return None
+
+	def read_many(self, keys):
+		"""Read entries for keys from the disk tier"""
+		return [self.read_disk(key) for key in keys]
+
+	def write_disk(self, key, value):
+		"""Atomically write an entry so concurrent workers never
+		read a partial file"""
+
+		if not self.directory:
+			return
+
+		path = self.disk_path(key)
+		os.makedirs(os.path.dirname(path), exist_ok=True)
+		handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+
+		with os.fdopen(handle, "wb") as entry:
+			entry.write(codec.dumps(value))
+
+		os.replace(temp_path, path)
+
+	def write_many(self, items):
+		"""Write (key, value) pairs to the disk tier"""
+		for key, value in items:
+			self.write_disk(key, value)
+
+	def stats(self):
+		"""Counters for sizing the cache"""
+
+		lookups = self.hits + self.disk_hits + self.misses
+
+		return {
+			"pid": os.getpid(),
+			"entries": len(self.entries),
+			"max_entries": self.max_entries,
+			"hits": self.hits,
+			"disk_hits": self.disk_hits,
+			"misses": self.misses,
+			"evictions": self.evictions,
+			"hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0
+		}
+
+_caches = {}
+
+def get_cache(namespace):
+	"""Return the worker's cache for namespace, or None if caching
+	is disabled"""
+
+	if options.cache_size <= 0:
+		return None
+
+	if namespace not in _caches:
+		directory = os.path.join(options.cache_dir, namespace) if options.cache_dir else None
+		_caches[namespace] = ResultCache(options.cache_size, directory=directory, namespace=namespace)
+
+	return _caches[namespace]
+
+def collect_metrics():
+	"""Report cache counters to /metrics"""
+
+	counters = [
+		("hits", "Result cache lookups served from memory"),
+		("disk_hits", "Result cache lookups served from disk"),
+		("misses", "Result cache lookups that had to be computed"),
+		("evictions", "Result cache entries evicted from memory")
+	]
+	collected = []
+
+	for field, documentation in counters:
+		counter = metrics.Counter("mind_cache_" + field + "_total", documentation, ["cache"])
+		for name, cache in _caches.items():
+			counter.inc(name, amount=getattr(cache, field))
+		collected.append(counter)
+
+	entries = metrics.Gauge("mind_cache_entries", "Result cache entries held in memory", ["cache"])
+	for name, cache in _caches.items():
+		entries.set(name, value=len(cache.entries))
+	collected.append(entries)
+
+	return collected
+
+metrics.register_collector(collect_metrics)
+
+class Cache_Stats(Base_Handler):
+	"""This class reports result cache counters for this worker"""
+
+	def get(self):
+		"""Handle get requests"""
+		self.success({name: cache.stats() for name, cache in _caches.items()})
+
+if __name__ == "__main__":
+	print("This module is a library that contains useful functions; it should not be run from the console.")
@@ -0,0 +1,61 @@
+#!/usr/local/bin/python3
+
+"""This module picks the fastest available JSON library for
+encoding and decoding Prophet Mind API payloads
+
+Created on Oct 18, 2026
+@author: Matthew Sevrens
+"""
+
+import json
+
+try:
+	import orjson
+except ImportError:
+	orjson = None
+
+try:
+	import ujson
+except ImportError:
+	ujson = None
+
+if orjson is not None:
+
+	NAME = "orjson"
+
+	def loads(data):
+		"""Decode JSON from bytes or str"""
+		return orjson.loads(data)
+
+	def dumps(obj):
+		"""Encode obj as UTF-8 JSON bytes"""
+		return orjson.dumps(obj)
+
+elif ujson is not None:
+
+	NAME = "ujson"
+
+	def loads(data):
+		"""Decode JSON from bytes or str"""
+		return ujson.loads(data)
+
+	def dumps(obj):
+		"""Encode obj as UTF-8 JSON bytes"""
+		return ujson.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+else:
+
+	NAME = "json"
+
+	def loads(data):
+		"""Decode JSON from bytes or str"""
+		if isinstance(data, bytes):
+			data = data.decode("utf-8")
+		return json.loads(data)
+
+	def dumps(obj):
+		"""Encode obj as UTF-8 JSON bytes"""
+		return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+if __name__ == "__main__":
+	print("This module is a library that contains useful functions; it should not be run from the console.")
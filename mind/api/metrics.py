@@ -0,0 +1,205 @@
+#!/usr/local/bin/python3
+
+"""This module records per route latency and size metrics for the
+Prophet Mind web service and exposes them in the Prometheus text
+exposition format
+
+Created on Oct 18, 2026
+@author: Matthew Sevrens
+"""
+
+import bisect
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from tornado.web import RequestHandler
+
+LATENCY_BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30]
+THOUGHT_BUCKETS = [1, 10, 100, 1000, 10000, 100000]
+DAY_BUCKETS = [1, 7, 31, 90, 365, 1000, 3650]
+BYTE_BUCKETS = [1e3, 1e4, 1e5, 1e6, 1e7, 1e8]
+
+def format_labels(labels):
+	"""Render a label tuple of (name, value) pairs"""
+
+	if not labels:
+		return ""
+
+	pairs = ['{0}="{1}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"')) for name, value in labels]
+
+	return "{" + ",".join(pairs) + "}"
+
+def format_value(value):
+	"""Render a sample value"""
+	if value == float("inf"):
+		return "+Inf"
+	return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter(object):
+	"""Monotonic counter keyed by label values"""
+
+	kind = "counter"
+
+	def __init__(self, name, documentation, label_names=()):
+		self.name = name
+		self.documentation = documentation
+		self.label_names = tuple(label_names)
+		self.values = OrderedDict()
+
+	def inc(self, *label_values, amount=1):
+		"""Increment the counter for label_values"""
+		labels = tuple(zip(self.label_names, label_values))
+		self.values[labels] = self.values.get(labels, 0) + amount
+
+	def samples(self):
+		"""Yield (name, labels, value) samples"""
+		for labels, value in self.values.items():
+			yield self.name, labels, value
+
+class Gauge(Counter):
+	"""Value that can go up and down, keyed by label values"""
+
+	kind = "gauge"
+
+	def set(self, *label_values, value=0):
+		"""Set the gauge for label_values"""
+		self.values[tuple(zip(self.label_names, label_values))] = value
+
+class Histogram(object):
+	"""Cumulative histogram keyed by label values"""
+
+	kind = "histogram"
+
+	def __init__(self, name, documentation, buckets, label_names=()):
+		self.name = name
+		self.documentation = documentation
+		self.buckets = list(buckets)
+		self.label_names = tuple(label_names)
+		self.values = OrderedDict()
+
+	def observe(self, value, *label_values):
+		"""Record one observation for label_values"""
+
+		labels = tuple(zip(self.label_names, label_values))
+
+		if labels not in self.values:
+			self.values[labels] = {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0}
+
+		series = self.values[labels]
+		series["counts"][bisect.bisect_left(self.buckets, value)] += 1
+		series["sum"] += value
+
+	def samples(self):
+		"""Yield (name, labels, value) samples"""
+
+		for labels, series in self.values.items():
+
+			cumulative = 0
+
+			for bound, count in zip(self.buckets + [float("inf")], series["counts"]):
+				cumulative += count
+				yield self.name + "_bucket", labels + (("le", format_value(bound)),), cumulative
+
+			yield self.name + "_sum", labels, series["sum"]
+			yield self.name + "_count", labels, cumulative
+
+REQUESTS = Counter("mind_requests_total", "API requests handled", ["route"])
+ERRORS = Counter("mind_request_errors_total", "API requests that raised an error", ["route", "error"])
+STAGE_SECONDS = Histogram("mind_stage_seconds", "Time spent in each stage of an API request", LATENCY_BUCKETS, ["route", "stage"])
+REQUEST_SECONDS = Histogram("mind_request_seconds", "Total time spent handling an API request", LATENCY_BUCKETS, ["route"])
+REQUEST_THOUGHTS = Histogram("mind_request_thoughts", "Thoughts per API request", THOUGHT_BUCKETS, ["route"])
+REQUEST_DAYS = Histogram("mind_request_days", "Days per API request", DAY_BUCKETS, ["route"])
+REQUEST_BYTES = Histogram("mind_request_bytes", "Request body size in bytes", BYTE_BUCKETS, ["route"])
+RESPONSE_BYTES = Histogram("mind_response_bytes", "Response body size in bytes", BYTE_BUCKETS, ["route"])
+
+METRICS = [
+	REQUESTS, ERRORS, STAGE_SECONDS, REQUEST_SECONDS,
+	REQUEST_THOUGHTS, REQUEST_DAYS, REQUEST_BYTES, RESPONSE_BYTES
+]
+
+_collectors = []
+
+def register_collector(collector):
+	"""Register a callable returning metrics to add at scrape time"""
+	_collectors.append(collector)
+
+def payload_size(body):
+	"""Count the days and thoughts in a decoded request body, which
+	may not have been validated yet, so anything malformed counts 0"""
+
+	def count(items):
+		return len(items) if isinstance(items, list) else 0
+
+	if not isinstance(body, dict):
+		return 0, 0
+
+	if "days" in body:
+		days = body["days"] if isinstance(body["days"], list) else []
+		return len(days), sum(count(day.get("thoughts")) for day in days if isinstance(day, dict))
+
+	return 0, count(body.get("thoughts"))
+
+class RequestTimer(object):
+	"""Times the stages of a single API request for one route"""
+
+	def __init__(self, route):
+		self.route = route
+		self.start = time.perf_counter()
+
+	@contextmanager
+	def stage(self, name):
+		"""Time the enclosed block as stage name"""
+		start = time.perf_counter()
+		try:
+			yield
+		finally:
+			STAGE_SECONDS.observe(time.perf_counter() - start, self.route, name)
+
+	def record_request(self, request_bytes, body):
+		"""Record the size of a decoded request and return its
+		days and thoughts"""
+
+		days, thoughts = payload_size(body)
+		REQUEST_BYTES.observe(request_bytes, self.route)
+		REQUEST_THOUGHTS.observe(thoughts, self.route)
+
+		if days:
+			REQUEST_DAYS.observe(days, self.route)
+
+		return days, thoughts
+
+	def finish(self, response_bytes=None, error=None):
+		"""Record the outcome and total latency of the request"""
+
+		REQUESTS.inc(self.route)
+		REQUEST_SECONDS.observe(time.perf_counter() - self.start, self.route)
+
+		if error is not None:
+			ERRORS.inc(self.route, type(error).__name__)
+		if response_bytes is not None:
+			RESPONSE_BYTES.observe(response_bytes, self.route)
+
+def exposition():
+	"""Render every metric in the Prometheus text format"""
+
+	lines = []
+
+	for metric in METRICS + [m for collector in _collectors for m in collector()]:
+		lines.append("# HELP {0} {1}".format(metric.name, metric.documentation))
+		lines.append("# TYPE {0} {1}".format(metric.name, metric.kind))
+		for name, labels, value in metric.samples():
+			lines.append("{0}{1} {2}".format(name, format_labels(labels), format_value(value)))
+
+	return "\n".join(lines) + "\n"
+
+class Metrics_Handler(RequestHandler):
+	"""This class serves this worker's metrics for scraping"""
+
+	def get(self):
+		"""Handle get requests"""
+		self.set_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+		self.write(exposition())
+
+if __name__ == "__main__":
+	print("This module is a library that contains useful functions; it should not be run from the console.")
@@ -0,0 +1,103 @@
+#!/usr/local/bin/python3
+
+"""This module runs CPU bound analysis for the Prophet Mind web
+service on a process pool so the IOLoop stays responsive
+
+Created on Oct 18, 2026
+@author: Matthew Sevrens
+"""
+
+import os
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+
+from tornado import gen
+from tornado.options import define, options
+
+define("pool_size", default=None, help="analysis processes per worker (default: cpu count, 0: run on the IOLoop)", type=int)
+define("max_fanout", default=8, help="maximum pool tasks in flight per request", type=int)
+
+_executor = None
+
+def get_executor():
+	"""Return the process pool, creating it on first use so that
+	each pre-forked worker owns its own pool"""
+
+	global _executor
+
+	if options.pool_size == 0:
+		return None
+
+	if _executor is None:
+		_executor = ProcessPoolExecutor(max_workers=options.pool_size)
+
+	return _executor
+
+def parallelism():
+	"""Number of tasks of one request that can run at once"""
+
+	if options.pool_size == 0:
+		return 1
+
+	return max(1, min(options.pool_size or os.cpu_count() or 1, options.max_fanout))
+
+def prime():
+	"""Start the pool processes now instead of on the first request,
+	so they are forked from an already warmed up worker"""
+
+	executor = get_executor()
+
+	if executor is not None:
+		executor.submit(int).result()
+
+def shutdown():
+	"""Stop the process pool, waiting for its processes to exit"""
+
+	global _executor
+
+	if _executor is not None:
+		_executor.shutdown(wait=True)
+		_executor = None
+
+@gen.coroutine
+def map_tasks(func, items, is_cancelled=None, max_fanout=None):
+	"""Apply func to every item on the process pool and return the
+	results in order. At most max_fanout tasks are in flight at once.
+	Raises CancelledError once is_cancelled() returns True."""
+
+	items = list(items)
+	results = [None] * len(items)
+	executor = get_executor()
+	is_cancelled = is_cancelled or (lambda: False)
+	max_fanout = max(1, max_fanout or options.max_fanout)
+
+	if executor is None:
+		return [func(item) for item in items]
+
+	remaining = iter(enumerate(items))
+	in_flight = set()
+
+	@gen.coroutine
+	def run_tasks():
+		for index, item in remaining:
+			if is_cancelled():
+				raise CancelledError()
+			future = executor.submit(func, item)
+			in_flight.add(future)
+			try:
+				results[index] = yield future
+			finally:
+				in_flight.discard(future)
+
+	try:
+		runners = [run_tasks() for _ in range(min(max_fanout, len(items)))]
+		yield gen.multi(runners, quiet_exceptions=CancelledError)
+	except CancelledError:
+		# Drop work the pool has not started yet
+		for future in in_flight:
+			future.cancel()
+		raise
+
+	return results
+
+if __name__ == "__main__":
+	print("This module is a library that contains useful functions; it should not be run from the console.")
@@ -0,0 +1,149 @@
+#!/usr/local/bin/python3
+
+"""This module supervises pre-forked worker processes for the
+Prophet Mind web service
+
+Created on Oct 18, 2026
+@author: Matthew Sevrens
+"""
+
+import errno
+import logging
+import os
+import signal
+import sys
+import time
+
+from mind.api import admission
+
+# Seconds a worker is given to finish in-flight requests on shutdown
+SHUTDOWN_GRACE = 5
+
+# Seconds between checks for in-flight requests while draining
+DRAIN_INTERVAL = 0.05
+
+STOP_SIGNALS = {signal.SIGTERM, signal.SIGINT}
+
+def fork_workers(num_workers, max_restarts=100):
+	"""Fork num_workers children and supervise them from the parent.
+
+	Returns the task id (0 to num_workers - 1) in each child. The parent
+	never returns; it restarts children that die abnormally and exits
+	once every child has stopped after a SIGTERM or SIGINT.
+
+	Each worker leads its own process group, so the analysis pool it
+	forks is terminated with it instead of outliving a crash."""
+
+	children = {}
+	shutting_down = False
+	restarts = 0
+
+	def start_child(task_id):
+		# Held back until the child is known, so shutdown signals it too
+		signal.pthread_sigmask(signal.SIG_BLOCK, STOP_SIGNALS)
+		pid = os.fork()
+		if pid == 0:
+			os.setpgid(0, 0)
+			# Workers get default signal dispositions back
+			signal.signal(signal.SIGTERM, signal.SIG_DFL)
+			signal.signal(signal.SIGINT, signal.SIG_DFL)
+			signal.pthread_sigmask(signal.SIG_UNBLOCK, STOP_SIGNALS)
+			return task_id
+		children[pid] = task_id
+		signal.pthread_sigmask(signal.SIG_UNBLOCK, STOP_SIGNALS)
+		return None
+
+	def stop_group(pid):
+		# Pool processes left behind by a worker that died
+		try:
+			os.killpg(pid, signal.SIGTERM)
+		except OSError:
+			pass
+
+	def shutdown(signum, frame):
+		nonlocal shutting_down
+		shutting_down = True
+		for pid in list(children.keys()):
+			try:
+				os.kill(pid, signal.SIGTERM)
+			except OSError:
+				pass
+
+	for task_id in range(num_workers):
+		if start_child(task_id) is not None:
+			return task_id
+
+	signal.signal(signal.SIGTERM, shutdown)
+	signal.signal(signal.SIGINT, shutdown)
+	logging.info("Started {0} workers in parent {1}".format(num_workers, os.getpid()))
+
+	while children:
+		try:
+			pid, status = os.wait()
+		except OSError as e:
+			if e.errno == errno.EINTR:
+				continue
+			raise
+
+		if pid not in children:
+			continue
+
+		task_id = children.pop(pid)
+		stop_group(pid)
+
+		if shutting_down:
+			continue
+
+		if os.WIFSIGNALED(status):
+			logging.warning("Worker {0} (pid {1}) killed by signal {2}, restarting".format(
+				task_id, pid, os.WTERMSIG(status)))
+		elif os.WEXITSTATUS(status) != 0:
+			logging.warning("Worker {0} (pid {1}) exited with status {2}, restarting".format(
+				task_id, pid, os.WEXITSTATUS(status)))
+		else:
+			logging.info("Worker {0} (pid {1}) exited normally".format(task_id, pid))
+			continue
+
+		restarts += 1
+		if restarts > max_restarts:
+			logging.error("Too many worker restarts, shutting down")
+			shutdown(None, None)
+			continue
+
+		# Avoid a tight crash loop hammering the machine
+		time.sleep(0.1)
+
+		# A signal may have arrived while sleeping
+		if shutting_down:
+			continue
+
+		if start_child(task_id) is not None:
+			return task_id
+
+	logging.info("All workers stopped, parent exiting")
+	sys.exit(0)
+
+def stop_on_signal(http_server, io_loop, grace=SHUTDOWN_GRACE):
+	"""Stop accepting connections on SIGTERM or SIGINT and stop
+	the IOLoop as soon as no request is in flight, or after grace
+	seconds at most"""
+
+	def stop():
+		http_server.stop()
+		drain(io_loop.time() + grace)
+
+	def drain(deadline):
+		if admission.in_flight() == 0 or io_loop.time() >= deadline:
+			io_loop.stop()
+		else:
+			io_loop.call_later(DRAIN_INTERVAL, drain, deadline)
+
+	def handle_signal(signum, frame):
+		logging.info("Worker {0} received signal {1}, shutting down".format(os.getpid(), signum))
+		io_loop.add_callback_from_signal(stop)
+
+	signal.signal(signal.SIGTERM, handle_signal)
+	signal.signal(signal.SIGINT, handle_signal)
+
+if __name__ == "__main__":
+	print("This module is a library that contains useful functions; it should not be run from the console.")
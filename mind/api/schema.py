@@ -1,28 +1,92 @@
 import json
+import os
+import random
 import jsonschema
 
+from concurrent.futures import CancelledError
 from functools import wraps
 from tornado import gen
 from tornado.concurrent import Future
+from tornado.options import define, options
 
 from tornado_json.utils import container
 
+from mind.api import admission, codec, metrics
+
+define("output_validation_rate", default=1.0, help="fraction of responses validated against their output schema (0 disables)", type=float)
+
+# Schemas ship next to the package so the service starts from any directory
+SCHEMA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "schemas")
+
+def load_schemas(name):
+	"""Load the input and output schemas and examples of a route as
+	keyword arguments for validate"""
+
+	loaded = {}
+	files = {
+		"input_schema": "schema_input.json",
+		"input_example": "example_input.json",
+		"output_schema": "schema_output.json",
+		"output_example": "example_output.json"
+	}
+
+	for argument, filename in files.items():
+		with open(os.path.join(SCHEMA_DIR, name, filename)) as data_file:
+			loaded[argument] = json.load(data_file)
+
+	return loaded
+
+def compile_schema(schema):
+	"""Check a schema once and return a reusable validator for it"""
+
+	if schema is None:
+		return None
+
+	validator_class = jsonschema.validators.validator_for(schema)
+	validator_class.check_schema(schema)
+
+	return validator_class(schema)
+
+def should_validate_output():
+	"""Sample whether this response's output gets validated"""
+
+	rate = options.output_validation_rate
+
+	if rate >= 1:
+		return True
+	if rate <= 0:
+		return False
+
+	return random.random() < rate
+
 def validate(input_schema=None, output_schema=None,\
 	input_example=None, output_example=None):
+
+	# Compile validators once when the handler is defined
+	input_validator = compile_schema(input_schema)
+	output_validator = compile_schema(output_schema)
+
 	@container
 	def _validate(rh_method):
 		"""Decorator for RequestHandler schema validation
 
 		This decorator:
 
+			- Rejects the request if its route has too many requests in
+			  flight or the body has too many days or thoughts
 			- Validates request body against input schema of the method
 			- Calls the ``rh_method`` and gets output from it
-			- Validates output against output schema of the method
+			- Validates output against output schema of the method,
+			  for the fraction of responses set by output_validation_rate
 			- Calls ``JSendMixin.success`` to write the validated output
+			- Records the time spent in each of these stages and the
+			  request and response sizes for ``/metrics``
 
 		:type  rh_method: function
 		:param rh_method: The RequestHandler method to be decorated
 		:returns: The decorated method
+		:raises Overloaded: If the route is at its in-flight limit
+		:raises APIError: If the input has too many days or thoughts
 		:raises ValidationError: If input is invalid as per the schema
 			or malformed
 		:raises TypeError: If the output is invalid as per the schema
@@ -31,57 +95,85 @@ def validate(input_schema=None, output_schema=None,\
 		@wraps(rh_method)
 		@gen.coroutine
 		def _wrapper(self, *args, **kwargs):
+			# Every stage is timed per route for the /metrics endpoint
+			route = type(self).__name__
+			timer = metrics.RequestTimer(route)
+
+			try:
+				# Turn the request away before decoding it if the
+				#  route is already working on as much as it may
+				admission.acquire(route)
+				try:
+					yield _handle(self, timer, *args, **kwargs)
+				finally:
+					admission.release(route)
+			except Exception as e:
+				timer.finish(error=e)
+				raise
+
+			timer.finish(response_bytes=getattr(self, "response_size", None))
+
+		@gen.coroutine
+		def _handle(self, timer, *args, **kwargs):
 			# In case the specified input_schema is ``None``, we
 			#   don't json.loads the input, but just set it to ``None``
 			#   instead.
 			if input_schema is not None:
-				# Attempt to json.loads the input
-				try:
-					# TODO: Assuming UTF-8 encoding for all requests,
-					#   find a nice way of determining this from charset
-					#   in headers if provided
-					encoding = "UTF-8"
-					input_ = json.loads(self.request.body.decode(encoding))
-				except ValueError as e:
-					raise jsonschema.ValidationError(
-						"Input is malformed; could not decode JSON object."
-					)
+				# Turn oversized requests away before paying to parse them
+				admission.check_body(timer.route, len(self.request.body))
+				# Attempt to decode the input with the API codec
+				with timer.stage("decode"):
+					try:
+						# TODO: Assuming UTF-8 encoding for all requests,
+						#   find a nice way of determining this from charset
+						#   in headers if provided
+						input_ = codec.loads(self.request.body)
+					except ValueError as e:
+						raise jsonschema.ValidationError(
+							"Input is malformed; could not decode JSON object."
+						)
+				# Count days and thoughts before validating them all
+				days, thoughts = timer.record_request(len(self.request.body), input_)
+				admission.check_size(timer.route, days, thoughts)
 				# Validate the received input
-				jsonschema.validate(
-					input_,
-					input_schema
-				)
+				with timer.stage("input_validation"):
+					input_validator.validate(input_)
 			else:
 				input_ = None
 
-			# A json.loads'd version of self.request["body"] is now available
-			#   as self.body
+			# A decoded version of self.request["body"] is now available
+			#   as self.body, so handlers never parse the body again
 			setattr(self, "body", input_)
 			# Call the requesthandler method
-			output = rh_method(self, *args, **kwargs)
-			# If the rh_method returned a Future a la `raise Return(value)`
-			#   we grab the output.
-			if isinstance(output, Future):
-				output = yield output
+			with timer.stage("handler"):
+				output = rh_method(self, *args, **kwargs)
+				# If the rh_method returned a Future a la `raise Return(value)`
+				#   we grab the output.
+				if isinstance(output, Future):
+					try:
+						output = yield output
+					except CancelledError:
+						# The handler abandoned its work because the client
+						#  disconnected, so there is nobody to write back to.
+						return
 
-			if output_schema is not None:
+			if output_schema is not None and should_validate_output():
 				# We wrap output in an object before validating in case
 				#  output is a string (and ergo not a validatable JSON object)
-				try:
-					jsonschema.validate(
-						output,
-						output_schema
-					)
-				except jsonschema.ValidationError as e:
-					# We essentially re-raise this as a TypeError because
-					#  we don't want this error data passed back to the client
-					#  because it's a fault on our end. The client should
-					#  only see a 500 - Internal Server Error.
-					raise TypeError(str(e))
+				with timer.stage("output_validation"):
+					try:
+						output_validator.validate(output)
+					except jsonschema.ValidationError as e:
+						# We essentially re-raise this as a TypeError because
+						#  we don't want this error data passed back to the client
+						#  because it's a fault on our end. The client should
+						#  only see a 500 - Internal Server Error.
+						raise TypeError(str(e))
 
 			# If no ValidationError has been raised up until here, we write
 			#  back output
-			self.success(output)
+			with timer.stage("serialization"):
+				self.success(output)
 
 		setattr(_wrapper, "input_schema", input_schema)
 		setattr(_wrapper, "output_schema", output_schema)
@@ -6,59 +6,38 @@ Created on Jul 07, 2015
 @author: Matthew Sevrens
 """
 
-import concurrent.futures
-import json
+#################### USAGE ##########################
 
-from tornado import gen
-from tornado_json.requesthandlers import APIHandler
+# curl -X POST -d @schemas/sentiment/example_input.json http://localhost:443/sentiment/ | python3.3 -m json.tool
 
-from scipy.interpolate import interp1d
+#####################################################
 
 from mind.api import schema
-
-HL_PATTERN = re.compile(r"HL \d+")
-HAPPY_PATTERN = re.compile(r"#happy:? \d+\.?\d?")
-MOOD_PATTERN = re.compile(r"#mood:? \d+\.?\d?")
-
-def HL(scale, x):
-	match = re.search(HL_PATTERN, x["Thought"])
-	if match:
-		return scale(float(match.group().split(" ")[1]))
-	else: 
-		return ""
-
-def parse_mood(scale, x):
-	happy_match = re.search(HAPPY_PATTERN, x["Thought"].lower())
-	mood_match = re.search(MOOD_PATTERN, x["Thought"].lower())
-	if happy_match:
-		value = float(happy_match.group().split(" ")[1])
-		value = value if value <= 10 else 10
-		return scale(value)
-	elif mood_match:
-		value = float(mood_match.group().split(" ")[1])
-		value = value if value <= 10 else 10
-		return scale(value)
-	else:
-		return ""
+from mind.api.base import Base_Handler
 
 def process_by_day(data):
 	"""Process data by data and return in proper format"""
 
+	# numpy and pandas are imported on first use to keep startup fast
+	import numpy as np
+	from mind.mood import extract_sentiment
+
 	output = {"days" : []}
-	scale = interp1d([0, 10], [-1, 1])
+	days = data["days"]
 
-	for day in data["days"]:
+	# Extract moods for every day's thoughts in one pass
+	thoughts = [thought for day in days for thought in day["thoughts"]]
+	moods = extract_sentiment(thoughts)["mood"]
+	offset = 0
 
-		thoughts = day["thoughts"]
-		moods = []
+	for day in days:
 
-		for thought in thougths:
-			mood = parse_mood(scale, thought)
-			if mood != "":
-				moods.append(mood)
+		day_moods = moods[offset:offset + len(day["thoughts"])]
+		day_moods = day_moods[~np.isnan(day_moods)]
+		offset += len(day["thoughts"])
 
-		if len(moods) > 0:
-			average_mood = sum(moods) / float(len(moods))
+		if len(day_moods) > 0:
+			average_mood = float(np.sum(day_moods) / len(day_moods))
 			today = {"mood": average_mood, "date": day["date"]}
 			output["days"].append(today)
 		else:
@@ -66,31 +45,22 @@ def process_by_day(data):
 
 	return output
 
-class Sentiment_Analysis(APIHandler):
+class Sentiment_Analysis(Base_Handler):
 	"""This class handles Sentiment Analysis for Prophet"""
 
-	with open("schemas/sentiment/schema_input.json") as data_file:
-		schema_input = json.load(data_file)
-
-	with open("schemas/sentiment/example_input.json") as data_file:
-		example_input = json.load(data_file)
-
-	with open("schemas/sentiment/schema_output.json") as data_file:
-		schema_output = json.load(data_file)
+	schemas = schema.load_schemas("sentiment")
 
-	with open("schemas/sentiment/example_output.json") as data_file:
-		example_output = json.load(data_file)
+	@classmethod
+	def warmup(cls):
+		"""Import the mood extraction libraries by analyzing
+		the example request"""
+		process_by_day(cls.schemas["input_example"])
 
-	@schema.validate(
-		input_schema=schema_input,
-		input_example=example_input,
-		output_schema=schema_output,
-		output_example=example_output
-	)
+	@schema.validate(**schemas)
 
 	def post(self):
 		"""Handle post requests"""
-		data = json.loads(self.request.body.decode())
+		data = self.body
 		results = process_by_day(data)
 		return results
 
@@ -99,4 +69,4 @@ class Sentiment_Analysis(APIHandler):
 		return None
 
 if __name__ == "__main__":
-	print("This module is a Class; it should not be run from the console.")
\ No newline at end of file
+	print("This module is a Class; it should not be run from the console.")
@@ -0,0 +1,77 @@
+#!/usr/local/bin/python3
+
+"""This module times the startup of the Prophet Mind web service,
+warms up route handlers before connections are accepted and
+reports readiness to load balancers
+
+Created on Oct 18, 2026
+@author: Matthew Sevrens
+"""
+
+import logging
+import os
+import time
+
+from tornado.options import define, options
+from tornado.web import RequestHandler
+
+define("warmup", default=True, help="prime analysis libraries before accepting connections", type=bool)
+
+_ready = False
+
+class StartupTimer(object):
+	"""Records how long each phase of startup took"""
+
+	def __init__(self, start=None):
+		self.start = time.perf_counter() if start is None else start
+		self.last = self.start
+		self.phases = []
+
+	def mark(self, name):
+		"""End the phase called name, which began at the previous mark"""
+
+		now = time.perf_counter()
+		self.phases.append((name, now - self.last))
+		self.last = now
+
+	def log(self):
+		"""Log the total startup time and its breakdown by phase"""
+
+		breakdown = ", ".join("{0} {1:.3f}s".format(name, seconds) for name, seconds in self.phases)
+		logging.info("Worker {0} ready in {1:.3f}s: {2}".format(os.getpid(), self.last - self.start, breakdown))
+
+def warmup(routes, timer):
+	"""Call the warmup of every routed handler that has one,
+	timing each as its own phase"""
+
+	if not options.warmup:
+		return
+
+	for route in routes:
+		handler = route[1]
+		if hasattr(handler, "warmup"):
+			handler.warmup()
+			timer.mark("warmup:" + handler.__name__)
+
+def set_ready(ready=True):
+	"""Flip this worker's readiness"""
+	global _ready
+	_ready = ready
+
+def is_ready():
+	"""Whether this worker has finished warming up"""
+	return _ready
+
+class Ready_Handler(RequestHandler):
+	"""This class answers readiness probes for this worker"""
+
+	def get(self):
+		"""Handle get requests"""
+
+		if not is_ready():
+			self.set_status(503)
+
+		self.write({"ready": is_ready()})
+
+if __name__ == "__main__":
+	print("This module is a library that contains useful functions; it should not be run from the console.")
@@ -0,0 +1,83 @@
+#!/usr/local/bin/python3
+
+"""This module defines the Prophet Mind Thought Type web service API
+
+Created on Oct 18, 2026
+@author: Matthew Sevrens
+"""
+
+#################### USAGE ##########################
+
+# curl -X POST -d @schemas/thoughttype/example_input.json http://localhost:443/thoughttype/ | python3 -m json.tool
+
+#####################################################
+
+from tornado import gen
+from tornado.options import define, options
+
+from mind.api import schema
+from mind.api.base import Base_Handler
+from mind.api.batcher import InferenceBatcher
+
+define("max_batch_size", default=64, help="most thoughts classified in one session run", type=int)
+define("max_batch_wait", default=5, help="milliseconds a request waits for others to join its batch", type=int)
+define("model_idle_timeout", default=0, help="seconds an unused model stays loaded (0 keeps it loaded)", type=int)
+define("model_quantization", default=None, help="serve int8 or float16 weights, or auto for those whose accuracy report passes (default: float32)", type=str)
+define("model_memory_mb", default=0, help="most megabytes of model variables kept loaded (0 disables the limit)", type=int)
+
+_batcher = None
+
+def load_classifier():
+	"""Load the thought type CNN on the inference thread"""
+
+	# Imported here so TensorFlow is only loaded by workers serving this route
+	from mind.load_model import REGISTRY, get_cnn_by_name
+
+	REGISTRY.configure(
+		idle_timeout=options.model_idle_timeout or None,
+		memory_budget=options.model_memory_mb * 2 ** 20 or None
+	)
+
+	apply_cnn = get_cnn_by_name("thought_type", quantization=options.model_quantization)
+
+	def classify(thoughts):
+		return apply_cnn(thoughts, doc_key="thought", label_key="type")
+
+	return classify
+
+def get_batcher():
+	"""Return this worker's shared inference batcher"""
+
+	global _batcher
+
+	if _batcher is None:
+		_batcher = InferenceBatcher(
+			load_classifier,
+			max_batch_size=options.max_batch_size,
+			max_wait=options.max_batch_wait / 1000
+		)
+
+	return _batcher
+
+class Thought_Type_Analysis(Base_Handler):
+	"""This class handles Thought Type classification for Prophet"""
+
+	schemas = schema.load_schemas("thoughttype")
+
+	@schema.validate(**schemas)
+
+	@gen.coroutine
+	def post(self):
+		"""Handle post requests"""
+
+		thoughts = self.body["thoughts"]
+		labeled = yield get_batcher().classify(thoughts)
+		results = {"thoughts": labeled}
+		return results
+
+	def get(self):
+		"""Handle get requests"""
+		return None
+
+if __name__ == "__main__":
+	print("This module is a Class; it should not be run from the console.")
@@ -12,93 +12,128 @@ Created on Sep 04, 2015
 
 #####################################################
 
-import json
+import functools
+import math
 
-import numpy as np
-from nltk.tokenize import TweetTokenizer
-from sklearn.feature_extraction.text import CountVectorizer
+from tornado import gen
+from tornado.options import define, options
+from mind.api import cache, pool, schema
+from mind.api.base import Base_Handler
 
-from tornado_json.requesthandlers import APIHandler
-from mind.api import schema
+define("days_per_task", default=0, help="most days counted together by one pool task (0: split days evenly over the pool)", type=int)
 
-def vectorize(corpus, min_df=1):
-	"""Vectorize text corpus"""
+@functools.lru_cache(maxsize=None)
+def get_counter():
+	"""Return the word counter of the wordstream"""
 
-	tknzr = TweetTokenizer().tokenize
+	# Imported on first use to keep the service quick to import
+	from mind.word_count import WordCounter
 
-	def tokenizer(thought):
-		output = tknzr(thought)
-		output = [o for o in output if len(o) > 2]
-		return output
+	return WordCounter(min_length=3)
 
-	vectorizer = CountVectorizer(min_df=min_df, tokenizer=tokenizer, ngram_range=(1,1), stop_words='english')
-	count_vector = vectorizer.fit_transform(corpus).toarray()
-	num_samples, num_features = count_vector.shape
-	vocab = vectorizer.get_feature_names()
-	wc = word_count(vocab, count_vector, num_samples)
+def cache_namespace():
+	"""Name the counter settings so cached word lists are never
+	reused once the tokenizer or stop words change"""
+	return "wordstream-" + get_counter().fingerprint()
 
-	return wc
+def count_by_day(days):
+	"""Count the number of thoughts containing each word for many
+	days at once, returning one day or None per input day"""
 
-def word_count(vocab, count_vector, num_samples):
-	"""Count words"""
+	counter = get_counter()
+	output = []
 
-	np.clip(count_vector, 0, 1, out=count_vector)
-	dist = np.sum(count_vector, axis=0)
-	dist = dist.tolist()
+	for day, counts in zip(days, counter.count_by_group([day["thoughts"] for day in days])):
 
-	wc = dict(zip(vocab, dist))
+		# Days without countable words are dropped as before
+		if len(counts) == 0:
+			output.append(None)
+			continue
 
-	return wc
+		word_list = [{"word": word, "count": count} for word, count in counts]
+		output.append({"word_list": word_list, "date": day["date"]})
 
-def process_by_day(data):
-	"""Process data by data and return in proper format"""
+	return output
 
-	output = {"days" : []}
+def chunk_days(days, size):
+	"""Split days into consecutive chunks of at most size days"""
+	size = max(1, size)
+	return [days[i:i + size] for i in range(0, len(days), size)]
 
-	for day in data["days"]:
+def days_per_task(num_days):
+	"""Days per pool task, so a request's days fan out over every
+	pool process it may use unless --days_per_task caps the chunks"""
 
-		today = {"word_list": [], "date": day["date"]}
+	even = math.ceil(num_days / pool.parallelism())
 
-		try:
-			counted = vectorize(day["thoughts"])
-		except:
-			continue;
+	return min(even, options.days_per_task) if options.days_per_task > 0 else even
 
-		for word, count in counted.items():
-			today["word_list"].append({"word": word, "count": count})
+def process_by_day(data):
+	"""Process data by data and return in proper format"""
 
-		output["days"].append(today)
+	days = count_by_day(data["days"])
+	output = {"days" : [today for today in days if today is not None]}
 
 	return output
 
-class Wordstream_Analysis(APIHandler):
+class Wordstream_Analysis(Base_Handler):
 	"""This class handles Wordstream Analysis for Prophet"""
 
-	with open("schemas/wordstream/schema_input.json") as data_file:
-		schema_input = json.load(data_file)
+	schemas = schema.load_schemas("wordstream")
 
-	with open("schemas/wordstream/example_input.json") as data_file:
-		example_input = json.load(data_file)
+	@classmethod
+	def warmup(cls):
+		"""Import the counting libraries and build the tokenizer
+		by counting the example request"""
+		count_by_day(cls.schemas["input_example"]["days"])
 
-	with open("schemas/wordstream/schema_output.json") as data_file:
-		schema_output = json.load(data_file)
+	@schema.validate(**schemas)
 
-	with open("schemas/wordstream/example_output.json") as data_file:
-		example_output = json.load(data_file)
+	@gen.coroutine
+	def post(self):
+		"""Handle post requests, counting chunks of days on the process pool"""
+
+		days = self.body["days"]
+		word_lists = yield self.count_days(days)
+		results = {"days": [
+			{"word_list": word_list, "date": day["date"]}
+			for day, word_list in zip(days, word_lists) if word_list
+		]}
+		return results
 
-	@schema.validate(
-		input_schema=schema_input,
-		input_example=example_input,
-		output_schema=schema_output,
-		output_example=example_output
-	)
+	@gen.coroutine
+	def count_days(self, days):
+		"""Return a word list per day, only counting days
+		missing from the result cache"""
 
-	def post(self):
-		"""Handle post requests"""
+		day_cache = cache.get_cache(cache_namespace())
+		word_lists = [None] * len(days)
 
-		data = json.loads(self.request.body.decode())
-		results = process_by_day(data)
-		return results
+		if day_cache is not None:
+			keys = [day_cache.key(day["thoughts"]) for day in days]
+			word_lists = yield day_cache.get_many(keys)
+
+		missing = [i for i, word_list in enumerate(word_lists) if word_list is None]
+		chunks = chunk_days([days[i] for i in missing], days_per_task(len(missing)))
+		counted = yield pool.map_tasks(count_by_day, chunks, is_cancelled=self.is_closed)
+		counted = [today for chunk in counted for today in chunk]
+
+		for index, today in zip(missing, counted):
+			# Days without countable words are cached as empty lists
+			word_lists[index] = today["word_list"] if today else []
+
+		if day_cache is not None:
+			yield day_cache.put_many([(keys[index], word_lists[index]) for index in missing])
+
+		return word_lists
+
+	def on_connection_close(self):
+		"""Stop scheduling work once the client has gone away"""
+		self.connection_closed = True
+
+	def is_closed(self):
+		"""Whether the client disconnected before the response was written"""
+		return getattr(self, "connection_closed", False)
 
 	def get(self):
 		"""Handle get requests"""
@@ -23,12 +23,12 @@ from itertools import zip_longest
 import pandas as pd
 import numpy as np
 
-from mind.load_model import get_tf_cnn_by_name
+from mind.load_model import get_cnn_by_name
 
 def grouper(iterable):
 	return zip_longest(*[iter(iterable)]*1000, fillvalue={"Thought":""})
 
-classifier = get_tf_cnn_by_name(sys.argv[2])
+classifier = get_cnn_by_name(sys.argv[2])
 
 df = pd.read_csv(sys.argv[1], na_filter=False, encoding="utf-8", error_bad_lines=False)
 thoughts = list(df.T.to_dict().values())
@@ -0,0 +1,4 @@
+#!/usr/local/bin/python3
+
+"""This file must exist to define Prophet Mind
+benchmarks as a package"""
\ No newline at end of file
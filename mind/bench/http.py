@@ -0,0 +1,285 @@
+#!/usr/local/bin/python3
+
+"""This module load tests the Prophet Mind web service in process
+with synthetic thoughts and reports throughput, latency and memory
+
+Created on Oct 18, 2026
+@author: Matthew Sevrens
+"""
+
+#################### USAGE ##########################
+
+# python3 -m mind.bench.http
+# python3 -m mind.bench.http --days 365 --thoughts 20 --requests 50 --concurrency 8
+# python3 -m mind.bench.http --route sentiment --modes inline
+
+#####################################################
+
+import argparse
+import datetime
+import json
+import os
+import random
+import resource
+import string
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from tornado import gen
+from tornado.httpclient import AsyncHTTPClient, HTTPRequest
+from tornado.httpserver import HTTPServer
+from tornado.ioloop import IOLoop, PeriodicCallback
+from tornado.options import options
+from tornado.testing import bind_unused_port
+from tornado_json.application import Application
+
+from mind.__main__ import get_routes
+from mind.api import pool, startup
+from mind.tools import current_rss
+
+# Server options applied for each mode under comparison
+MODES = {
+	"inline": {"pool_size": 0, "cache_size": 0},
+	"pool": {"pool_size": None, "cache_size": 0},
+	"cached": {"pool_size": None, "cache_size": 10000}
+}
+
+# Admission limits are lifted in every mode so the handler is measured
+BENCH_OPTIONS = {"max_days": 0, "max_thoughts": 0, "max_body_mb": 0, "max_in_flight": 0}
+
+# Seconds between samples of the memory of the pool processes
+SAMPLE_INTERVAL = 0.1
+
+def parse_arguments(args):
+	""" Create the parser """
+
+	parser = argparse.ArgumentParser(description="Load test the Prophet Mind web service with synthetic thoughts")
+	parser.add_argument('--route', default="wordstream", choices=["wordstream", "sentiment"], help='Route to load test')
+	parser.add_argument('--modes', default="inline,pool,cached", help='Comma separated server modes to compare: ' + ", ".join(MODES))
+	parser.add_argument('--days', type=int, default=30, help='Days per request')
+	parser.add_argument('--thoughts', type=int, default=10, help='Thoughts per day')
+	parser.add_argument('--words', type=int, default=12, help='Average words per thought')
+	parser.add_argument('--vocab', type=int, default=5000, help='Synthetic vocabulary size')
+	parser.add_argument('--distribution', default="zipf", choices=["zipf", "uniform"], help='Word frequency distribution')
+	parser.add_argument('--zipf', type=float, default=1.1, help='Zipf exponent of the word distribution')
+	parser.add_argument('--payloads', type=int, default=4, help='Distinct payloads cycled through')
+	parser.add_argument('--requests', type=int, default=40, help='Requests per mode')
+	parser.add_argument('--concurrency', type=int, default=4, help='Requests in flight at once')
+	parser.add_argument('--seed', type=int, default=0, help='Random seed for payload generation')
+	parser.add_argument('--mode', help=argparse.SUPPRESS)
+
+	return parser.parse_args(args)
+
+def make_vocabulary(size, rng):
+	"""Make pronounceable-ish unique pseudo words"""
+
+	vocab = set()
+
+	while len(vocab) < size:
+		length = rng.randint(3, 10)
+		vocab.add("".join(rng.choice(string.ascii_lowercase) for _ in range(length)))
+
+	return sorted(vocab)
+
+def generate_payload(args, seed):
+	"""Generate a request body of synthetic days and thoughts"""
+
+	rng = random.Random(seed)
+	np_rng = np.random.RandomState(seed)
+	vocab = make_vocabulary(args.vocab, random.Random(args.seed))
+
+	if args.distribution == "zipf":
+		weights = 1.0 / np.arange(1, len(vocab) + 1) ** args.zipf
+	else:
+		weights = np.ones(len(vocab))
+
+	weights /= weights.sum()
+	days = []
+
+	for day in range(args.days):
+
+		thoughts = []
+
+		for _ in range(args.thoughts):
+			length = max(1, np_rng.poisson(args.words))
+			words = np_rng.choice(len(vocab), size=length, p=weights)
+			thought = " ".join(vocab[w] for w in words)
+			if args.route == "sentiment" and rng.random() < 0.2:
+				thought += " #mood " + str(rng.randint(0, 10))
+			thoughts.append(thought)
+
+		date = datetime.date(2014, 1, 1) + datetime.timedelta(days=day)
+		days.append({"thoughts": thoughts, "date": date.isoformat()})
+
+	return {"days": days}
+
+def peak_rss_mb():
+	"""Peak resident set size of this process"""
+
+	own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+	# ru_maxrss is in kilobytes on Linux and bytes on macOS
+	scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+
+	return own / scale
+
+def child_pids():
+	"""Process ids of the children of this process, read from /proc"""
+
+	pids = []
+
+	for entry in os.listdir("/proc"):
+		if not entry.isdigit():
+			continue
+		try:
+			with open("/proc/{0}/stat".format(entry)) as stat:
+				# The parent id follows the parenthesized command name
+				if int(stat.read().rsplit(")", 1)[1].split()[1]) == os.getpid():
+					pids.append(int(entry))
+		except (OSError, ValueError, IndexError):
+			continue
+
+	return pids
+
+class PoolMemory(object):
+	"""Samples the summed resident memory of the pool processes,
+	since the rusage of reaped children only keeps the largest one"""
+
+	def __init__(self):
+		self.peak = 0
+
+	def sample(self):
+		"""Record the current total if it is a new peak"""
+		total = sum(current_rss(pid) or 0 for pid in child_pids())
+		self.peak = max(self.peak, total)
+
+@gen.coroutine
+def drive(args, port, payloads):
+	"""Send requests with bounded concurrency and time each one"""
+
+	client = AsyncHTTPClient(max_clients=args.concurrency)
+	url = "http://127.0.0.1:{0}/{1}/".format(port, args.route)
+	latencies, successes, errors = [], 0, 0
+	remaining = iter(range(args.requests))
+
+	@gen.coroutine
+	def client_loop():
+		nonlocal successes, errors
+		for index in remaining:
+			body = payloads[index % len(payloads)]
+			request = HTTPRequest(url, method="POST", body=body, request_timeout=600)
+			start = time.perf_counter()
+			response = yield client.fetch(request, raise_error=False)
+			if response.code == 200:
+				successes += 1
+				latencies.append(time.perf_counter() - start)
+			else:
+				errors += 1
+
+	start = time.perf_counter()
+	yield [client_loop() for _ in range(args.concurrency)]
+	elapsed = time.perf_counter() - start
+
+	return latencies, successes, errors, elapsed
+
+def run_mode(args):
+	"""Serve the application in process under one mode and load test it"""
+
+	for name, value in list(MODES[args.mode].items()) + list(BENCH_OPTIONS.items()):
+		setattr(options, name, value)
+
+	payloads = [json.dumps(generate_payload(args, args.seed + i)).encode("utf-8") for i in range(args.payloads)]
+	routes = get_routes()
+	application = Application(routes=routes, settings={})
+
+	# Warm up as the service does so cold imports are not timed
+	startup.warmup(routes, startup.StartupTimer())
+	pool.prime()
+
+	sock, port = bind_unused_port()
+	server = HTTPServer(application)
+	server.add_sockets([sock])
+	memory = PoolMemory()
+	sampler = PeriodicCallback(memory.sample, SAMPLE_INTERVAL * 1000)
+	sampler.start()
+
+	latencies, successes, errors, elapsed = IOLoop.current().run_sync(lambda: drive(args, port, payloads))
+	sampler.stop()
+	memory.sample()
+	server.stop()
+	pool.shutdown()
+
+	# Only answered requests count towards throughput and latency
+	latencies = np.array(latencies) * 1000
+	thoughts = successes * args.days * args.thoughts
+
+	def percentile(q):
+		return float(np.percentile(latencies, q)) if len(latencies) else None
+
+	return {
+		"mode": args.mode,
+		"requests": args.requests,
+		"successes": successes,
+		"errors": errors,
+		"seconds": elapsed,
+		"requests_per_second": successes / elapsed,
+		"thoughts_per_second": thoughts / elapsed,
+		"p50_ms": percentile(50),
+		"p95_ms": percentile(95),
+		"p99_ms": percentile(99),
+		"peak_rss_mb": peak_rss_mb(),
+		"pool_peak_rss_mb": memory.peak / 2 ** 20
+	}
+
+def compare_modes(args):
+	"""Run every mode in a fresh process so pools, caches and peak
+	memory do not leak between them"""
+
+	results = []
+
+	for mode in args.modes.split(","):
+		command = [sys.executable, "-m", "mind.bench.http", "--mode", mode] + sys.argv[1:]
+		output = subprocess.check_output(command)
+		results.append(json.loads(output.decode("utf-8").strip().splitlines()[-1]))
+
+	return results
+
+def print_report(args, results):
+	"""Print a comparison table"""
+
+	print("Route: /{0}/  days: {1}  thoughts/day: {2}  requests: {3}  concurrency: {4}".format(
+		args.route, args.days, args.thoughts, args.requests, args.concurrency))
+
+	header = "{0:<8} {1:>9} {2:>12} {3:>9} {4:>9} {5:>9} {6:>10} {7:>10} {8:>7}"
+	print(header.format("mode", "req/s", "thoughts/s", "p50 ms", "p95 ms", "p99 ms", "server MB", "pool MB", "errors"))
+
+	row = "{0:<8} {1:>9.2f} {2:>12.0f} {3:>9} {4:>9} {5:>9} {6:>10.1f} {7:>10.1f} {8:>7}"
+	for r in results:
+		latencies = ["-" if r[key] is None else "{0:.1f}".format(r[key]) for key in ["p50_ms", "p95_ms", "p99_ms"]]
+		flag = " FAILED" if r["errors"] else ""
+		print(row.format(r["mode"], r["requests_per_second"], r["thoughts_per_second"],
+			*latencies, r["peak_rss_mb"], r["pool_peak_rss_mb"], r["errors"]) + flag)
+
+	print("server MB is the peak of the server process, pool MB the sampled peak of its pool processes together")
+
+def main():
+	"""Run module from command line"""
+
+	args = parse_arguments(sys.argv[1:])
+
+	if args.mode:
+		print(json.dumps(run_mode(args)))
+		return
+
+	results = compare_modes(args)
+	print_report(args, results)
+
+	# Throughput of a run with failed requests is not comparable
+	if any(r["errors"] for r in results):
+		sys.exit("Some requests failed; only answered requests were timed")
+
+if __name__ == "__main__":
+	main()
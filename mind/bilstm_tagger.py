@@ -35,7 +35,7 @@ import tensorflow as tf
 from tensorflow.python.client import timeline
 
 from mind.tools import get_tensor, get_op, get_variable
-from mind.tools import load_json, load_dataframe, reverse_map
+from mind.tools import load_json, load_dataframe, reverse_map, ProgressReporter
 
 logging.basicConfig(level=logging.INFO)
 
@@ -303,6 +303,7 @@ def train_model(config, graph, sess, saver, run_options, run_metadata):
 	train = config["train"]
 	train_index = list(range(len(train)))
 	sess.run(get_op(graph, "assign_wembedding"), feed_dict={get_tensor(graph, "embedding_placeholder:0"): config["wembedding"]})
+	reporter = ProgressReporter("bilstm", total=eras * len(train_index), log_path=config.get("progress_log"))
 
 	# Train the Model
 	for step in range(eras):
@@ -344,15 +345,13 @@ def train_model(config, graph, sess, saver, run_options, run_metadata):
 			total_loss += loss
 			total_tagged += len(word_indices)
 
-			# Log
-			if count % 250 == 0:
-				logging.info("count: " + str(count))
-				logging.info("loss: " + str(total_loss/total_tagged))
-				logging.info("%d" % (count / len(train_index) * 100) + "% complete with era " + str(step))
+			# Log Documents and Tagged Tokens per Second
+			reporter.update(examples=len(word_indices), loss=total_loss / total_tagged, era=step)
 
 		# Evaluate Model
 		test_accuracy = evaluate_testset(config, graph, sess, config["test"])
 
+	reporter.close()
 	final_model_path = "./meerkat/longtail/models/"
 	os.makedirs(final_model_path, exist_ok=True)
 	w2i_to_json(config["w2i"], final_model_path)
@@ -377,16 +376,11 @@ def evaluate_testset(config, graph, sess, test):
 
 	total_count = 0
 	total_correct = 0
-	count = 0
+	reporter = ProgressReporter("bilstm_eval", total=len(test))
 	logging.info("---ENTERING EVALUATION---")
 
 	for i in range(len(test)):
 
-		count += 1
-
-		if count % 500 == 0:
-			logging.info("%d" % (count / len(test) * 100) + "% complete with evaluation")
-
 		tokens, tags = test[i]
 		char_inputs, word_lengths, word_indices, labels = doc_to_tensor(config, sess, graph, tokens, tags=tags)
 		total_count += len(tokens)
@@ -403,7 +397,9 @@ def evaluate_testset(config, graph, sess, test):
 
 		correct_count = np.sum(np.argmax(output, 1) == np.argmax(labels, 1))
 		total_correct += correct_count
+		reporter.update(examples=len(tokens))
 
+	reporter.close()
 	test_accuracy = 100.0 * (total_correct / total_count)
 	logging.info("Test accuracy: %.2f%%" % test_accuracy)
 	logging.info("Correct count: " + str(total_correct))
@@ -0,0 +1,111 @@
+#!/usr/local/bin/python3
+
+"""This module encodes batches of thoughts as the one-hot character
+tensors read by the character CNNs, without a Python loop over
+characters
+
+Created on Oct 18, 2026
+@author: Matthew Sevrens
+"""
+
+#################### USAGE ##########################
+
+# from mind.char_encoder import get_char_encoder
+# encoder = get_char_encoder(config["alphabet"], config["doc_length"])
+# x = encoder.encode(["I think it will rain", "Ask me"])
+# indices = encoder.encode_indices(["I think it will rain", "Ask me"])
+
+#####################################################
+
+import functools
+import threading
+
+import numpy as np
+
+class CharEncoder(object):
+	"""Maps thoughts to alphabet indices through a lookup table over
+	their code points. Thoughts are lowercased and cut to doc_length,
+	and their characters are written last to first, so the final
+	character is at position 0. Characters outside the alphabet are
+	left empty."""
+
+	def __init__(self, alphabet, doc_length):
+		self.alphabet_length = len(alphabet)
+		self.doc_length = doc_length
+		self.lookup = np.full(max(map(ord, alphabet)) + 1, -1, dtype=np.int32)
+		self.local = threading.local()
+
+		for index, char in enumerate(alphabet):
+			self.lookup[ord(char)] = index
+
+	def scatter(self, docs):
+		"""Return the row, position and alphabet index of every
+		character of docs that is in the alphabet"""
+
+		docs = [doc.lower()[:self.doc_length] for doc in docs]
+		lengths = np.fromiter(map(len, docs), dtype=np.int64, count=len(docs))
+		encoded = "".join(docs).encode("utf-32-le", "surrogatepass")
+		codepoints = np.frombuffer(encoded, dtype="<u4").astype(np.int64)
+
+		# One lookup for the whole batch; code points past the table are unknown
+		known = codepoints < len(self.lookup)
+		chars = np.where(known, self.lookup[np.where(known, codepoints, 0)], -1)
+
+		# Character k of a thought ending at end lands at end - k - 1
+		rows = np.repeat(np.arange(len(docs)), lengths)
+		positions = np.repeat(np.cumsum(lengths), lengths) - np.arange(len(codepoints)) - 1
+		keep = chars >= 0
+
+		return rows[keep], positions[keep], chars[keep]
+
+	def encode_indices(self, docs):
+		"""Encode docs as a (batch, doc_length) int32 array of alphabet
+		indices, -1 where a position is empty"""
+
+		rows, positions, chars = self.scatter(docs)
+		indices = np.full((len(docs), self.doc_length), -1, dtype=np.int32)
+		indices[rows, positions] = chars
+
+		return indices
+
+	def encode(self, docs, out=None):
+		"""Encode docs as a (batch, 1, doc_length, alphabet) float32
+		one-hot tensor.
+
+		Without out the result is a view of a buffer reused by this
+		thread's next call, so feed it before encoding again. Pass a
+		zeroed array as out to keep several batches at once."""
+
+		rows, positions, chars = self.scatter(docs)
+
+		if out is None:
+			out = self.buffer(len(docs))
+			self.local.last = (rows, positions, chars)
+
+		out[rows, 0, positions, chars] = 1
+
+		return out
+
+	def buffer(self, batch_size):
+		"""Return this thread's buffer sized for batch_size, clearing
+		only the entries set by its previous call"""
+
+		local = self.local
+		buffer = getattr(local, "buffer", None)
+
+		if buffer is None or len(buffer) < batch_size:
+			buffer = np.zeros((batch_size, 1, self.doc_length, self.alphabet_length), dtype=np.float32)
+			local.buffer = buffer
+		else:
+			rows, positions, chars = local.last
+			buffer[rows, 0, positions, chars] = 0
+
+		return buffer[:batch_size]
+
+@functools.lru_cache(maxsize=None)
+def get_char_encoder(alphabet, doc_length):
+	"""Return the shared encoder for an alphabet and document length"""
+	return CharEncoder(alphabet, doc_length)
+
+if __name__ == "__main__":
+	print("This module is a library that contains useful functions; it should not be run from the console.")
@@ -28,7 +28,8 @@ import pandas as pd
 import numpy as np
 import tensorflow as tf
 
-from mind.tools import load_json
+from mind.char_encoder import get_char_encoder
+from mind.tools import load_json, load_columnar, ProgressReporter
 
 logging.basicConfig(level=logging.INFO)
 
@@ -40,6 +41,15 @@ def chunks(array, num):
 def validate_config(config):
 	"""Validate input configuration"""
 
+	config = prepare_config(config)
+	config["train"], config["test"], config["groups_train"] = load_labeled_data(config)
+
+	return config
+
+def prepare_config(config):
+	"""Derive model settings from a configuration without loading
+	the labeled dataset, as needed to apply a trained model"""
+
 	config = load_json(config)
 	logging.debug("Configuration is :\n{0}".format(pprint.pformat(config)))
 	reshape = ((config["doc_length"] - 78) / 27) * 256
@@ -49,7 +59,6 @@ def validate_config(config):
 	config["alpha_dict"] = {a : i for i, a in enumerate(config["alphabet"])}
 	config["base_rate"] = config["base_rate"] * math.sqrt(config["batch_size"]) / math.sqrt(128)
 	config["alphabet_length"] = len(config["alphabet"])
-	config["train"], config["test"], config["groups_train"] = load_labeled_data(config)
 
 	return config
 
@@ -63,7 +72,7 @@ def load_labeled_data(config):
 	reversed_map = dict(zip(label_map.values(), label_map.keys()))
 	map_labels = lambda x: reversed_map.get(str(x[label_key]), "")
 
-	df = pd.read_csv(dataset, na_filter=False, encoding="utf-8", error_bad_lines=False)
+	df = load_columnar(dataset)
 	df["LABEL_NUM"] = df.apply(map_labels, axis=1)
 	df = df[df["LABEL_NUM"] != ""]
 
@@ -101,20 +110,13 @@ def mixed_batching(config, df, groups_train):
 def batch_to_tensor(config, batch):
 	"""Convert a batch to a tensor representation"""
 
-	doc_length = config["doc_length"]
-	alphabet_length = config["alphabet_length"]
 	num_labels = config["num_labels"]
-	batch_size = len(batch.index)
 
 	labels = np.array(batch["LABEL_NUM"].astype(int))
 	labels = (np.arange(num_labels) == labels[:, None]).astype(np.float32)
 	docs = batch["Thought"].tolist()
-	encoded_thoughts = np.zeros(shape=(batch_size, 1, alphabet_length, doc_length))
-	
-	for index, thoughts in enumerate(docs):
-		encoded_thoughts[index][0] = string_to_tensor(config, thoughts, doc_length)
+	encoded_thoughts = get_char_encoder(config["alphabet"], config["doc_length"]).encode(docs)
 
-	encoded_thoughts = np.transpose(encoded_thoughts, (0, 1, 3, 2))
 	return encoded_thoughts, labels
 
 def encode_time_features(config, batch):
@@ -126,8 +128,11 @@ def encode_time_features(config, batch):
 	
 	for time in times:
 
-		# Convert to seconds past midnight
-		parsed = datetime.datetime.strptime(time, '%m/%d/%y %I:%M %p')
+		# Convert to seconds past midnight, parsing unless already a datetime
+		if isinstance(time, datetime.datetime):
+			parsed = time
+		else:
+			parsed = datetime.datetime.strptime(time, '%m/%d/%y %I:%M %p')
 		midnight = parsed.replace(hour=0, minute=0, second=0, microsecond=0)
 		seconds_past_midnight = (parsed - midnight).seconds
 		
@@ -154,14 +159,8 @@ def get_speaker_id_list(config, batch):
 
 def string_to_tensor(config, doc, length):
 	"""Convert thought to tensor format"""
-	alphabet = config["alphabet"]
-	alpha_dict = config["alpha_dict"]
-	doc = doc.lower()[0:length]
-	tensor = np.zeros((len(alphabet), length), dtype=np.float32)
-	for index, char in reversed(list(enumerate(doc))):
-		if char in alphabet:
-			tensor[alpha_dict[char]][len(doc) - index - 1] = 1
-	return tensor
+	encoded = get_char_encoder(config["alphabet"], length).encode([doc], out=np.zeros((1, 1, length, config["alphabet_length"]), dtype=np.float32))
+	return encoded[0][0].T
 
 def string_to_char_indices(config, doc, length):
 	"""Convert characters to character indices for character embeddings"""
@@ -395,8 +394,8 @@ def train_model(config, graph, sess, saver):
 	eras = config["eras"]
 	dataset = config["dataset"]
 	num_eras = epochs * eras
-	logging_interval = 50
 	learning_rate_interval = 15000
+	reporter = ProgressReporter("cnn", total=num_eras, log_path=config.get("progress_log"))
 
 	best_accuracy, best_era = 0, 0
 	save_dir = "models/checkpoints/"
@@ -423,13 +422,11 @@ def train_model(config, graph, sess, saver):
 
 		}
 
-		# Run Training Step
-		sess.run("optimizer", feed_dict=feed_dict)
+		# Run Training Step, Fetching the Loss in the Same Pass
+		_, loss = sess.run(["optimizer", "loss:0"], feed_dict=feed_dict)
 
-		# Log Loss
-		if step % logging_interval == 0:
-			loss = sess.run("loss:0", feed_dict=feed_dict)
-			logging.info("train loss at epoch %d: %g" % (step + 1, loss))
+		# Log Loss and Throughput
+		reporter.update(examples=len(batch), loss=loss, era=step // epochs)
 
 		# Log Accuracy for Tracking
 		if step % 1000 == 0:
@@ -467,6 +464,8 @@ def train_model(config, graph, sess, saver):
 			learning_rate = get_variable(graph, "lr:0")
 			sess.run(learning_rate.assign(learning_rate / 2))
 
+	reporter.close()
+
 	# Clean Up Directory
 	dataset_path = os.path.basename(dataset).split(".")[0]
 	final_model_path = "models/" + dataset_path + ".ckpt"
@@ -24,8 +24,8 @@ import os
 import pandas as pd
 import sys
 
-from mind.load_model import get_cnn_by_path
-from mind.tools import load_json, get_write_func
+from mind.load_model import get_tf_cnn_by_path
+from mind.tools import load_json, CSVWriter, ProgressReporter
 
 def parse_arguments(args):
 	""" Create the parser """
@@ -157,7 +157,6 @@ def main_process(args):
 	human_label_key = args.label_key
 	reader = pd.read_csv(args.testdata, na_filter=False, chunksize=1000)
 	total_thoughts = count_thoughts(args.testdata)
-	processed, chunk_count = 0.0, 0
 	label_map = load_json(args.label_map)
 	reversed_label_map = {}
 
@@ -173,42 +172,42 @@ def main_process(args):
 	# Prepare for data saving
 	path = "data/CNN_stats/"
 	os.makedirs(path, exist_ok=True)
-	write_mislabeled = get_write_func(path + "mislabeled.csv", ['THOUGHT', 'ACTUAL', 'PREDICTED'])
-	write_correct = get_write_func(path + "correct.csv", ['THOUGHT', 'ACTUAL'])
-	write_unpredicted = get_write_func(path + "unpredicted.csv", ["THOUGHT", 'ACTUAL'])
-	write_needs_hand_labeling = get_write_func(path + "need_labeling.csv", ["THOUGHT"])
+	write_mislabeled = CSVWriter(path + "mislabeled.csv", ['THOUGHT', 'ACTUAL', 'PREDICTED'])
+	write_correct = CSVWriter(path + "correct.csv", ['THOUGHT', 'ACTUAL'])
+	write_unpredicted = CSVWriter(path + "unpredicted.csv", ["THOUGHT", 'ACTUAL'])
+	write_needs_hand_labeling = CSVWriter(path + "need_labeling.csv", ["THOUGHT"])
 
 	logging.info("Total number of thoughts: {0}".format(total_thoughts))
 	logging.info("Testing begins.")
 
-	for chunk in reader:
-		processed += len(chunk)
-		my_progress = str(round(((processed/total_thoughts) * 100), 2)) + '%'
-		logging.info("Evaluating {0} of the testset".format(my_progress))
-		logging.warning("Testing chunk {0}.".format(chunk_count))
-		thoughts = chunk.to_dict('records')
-		machine_labeled = classifier(thoughts, doc_key=doc_key, label_key=machine_label_key)
+	reporter = ProgressReporter("cnn_stats", total=total_thoughts)
 
-		# Add Indexes for Labels
-		for item in machine_labeled:
+	# Results are written on background threads while the next chunk is classified
+	with reporter, write_mislabeled, write_correct, write_unpredicted, write_needs_hand_labeling:
+		for chunk in reader:
+			thoughts = chunk.to_dict('records')
+			machine_labeled = classifier(thoughts, doc_key=doc_key, label_key=machine_label_key)
 
-			if item[human_label_key] == "":
-				item['ACTUAL_INDEX'] = None
-				continue
+			# Add Indexes for Labels
+			for item in machine_labeled:
 
-			item['ACTUAL_INDEX'] = int(reversed_label_map[item[human_label_key]])
-			item['PREDICTED_INDEX'] = int(reversed_label_map[item[machine_label_key]])
+				if item[human_label_key] == "":
+					item['ACTUAL_INDEX'] = None
+					continue
 
-		results = compare_label(machine_labeled, machine_label_key, human_label_key, confusion_matrix, num_labels, doc_key=doc_key)
-		mislabeled, correct, unpredicted, needs_hand_labeling, confusion_matrix = results
+				item['ACTUAL_INDEX'] = int(reversed_label_map[item[human_label_key]])
+				item['PREDICTED_INDEX'] = int(reversed_label_map[item[machine_label_key]])
 
-		# Save
-		write_mislabeled(mislabeled)
-		write_correct(correct)
-		write_unpredicted(unpredicted)
-		write_needs_hand_labeling(needs_hand_labeling)
+			results = compare_label(machine_labeled, machine_label_key, human_label_key, confusion_matrix, num_labels, doc_key=doc_key)
+			mislabeled, correct, unpredicted, needs_hand_labeling, confusion_matrix = results
 
-		chunk_count += 1
+			# Save
+			write_mislabeled(mislabeled)
+			write_correct(correct)
+			write_unpredicted(unpredicted)
+			write_needs_hand_labeling(needs_hand_labeling)
+
+			reporter.update(items=len(chunk))
 
 	# Make a Square Confusion Matrix Dataframe
 	df = pd.DataFrame(confusion_matrix)
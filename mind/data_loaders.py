@@ -9,10 +9,10 @@ import numpy as np
 import random
 
 from nltk.corpus import comtrans
-from nltk.tokenize import TweetTokenizer
 from sklearn.feature_extraction.text import CountVectorizer
 
-from mind.tools import load_dataframe, dict_2_json, load_json, load_dict_list
+from mind.tokens import tokenize
+from mind.tools import load_dataframe, dict_2_json, load_json, stream_thoughts
 
 class DataLoader():
 	def __init__(self, bucket_quant, config):
@@ -160,15 +160,12 @@ class DataLoader():
 			print("Loading previous word lookup")
 			return load_json("models/word_lookup.json")
 
-		thoughts = load_dict_list("data/ordered_thoughts.csv")
-		corpus = [t["Thought"] for t in thoughts]
+		corpus = [t["Thought"] for t in stream_thoughts("data/ordered_thoughts.csv")]
 
 		# corpus = self.source_lines + [self.target_lines[-1]]
 
-		tknzr = TweetTokenizer().tokenize
-
 		def tokenizer(thought):
-			output = tknzr(thought)
+			output = tokenize(thought, "tweet")
 			output = [o for o in output if len(o) > 2]
 			return output
 
@@ -293,8 +290,7 @@ class PretrainData(DataLoader):
 		self.load_data("data/Nate_Silver_The_Signal_and_the_Noise.txt")
 
 		# Load Prophet Data
-		prophet_thoughts = load_dict_list("data/ordered_thoughts.csv")
-		prophet_thoughts = [t["Thought"] for t in prophet_thoughts]
+		prophet_thoughts = [t["Thought"] for t in stream_thoughts("data/ordered_thoughts.csv")]
 
 		for i, thought in enumerate(prophet_thoughts):
 			if i + 1 < len(prophet_thoughts):
@@ -0,0 +1,227 @@
+#!/usr/local/bin/python3
+
+"""This module exports a trained thought CNN as a frozen,
+inference-only graph. Batch norm is folded into the convolution and
+fully connected weights and every training node is left out, so
+serving restores no variables and runs no dropout or update ops.
+
+Created on Oct 18, 2026
+@author: Matthew Sevrens
+"""
+
+#################### USAGE ##########################
+
+# python3 -m mind.export_cnn [model_path]
+# python3 -m mind.export_cnn models/thought_type.ckpt
+# python3 -m mind.export_cnn models/sentiment.ckpt --indices
+
+#####################################################
+
+import argparse
+import logging
+import sys
+
+import numpy as np
+
+from mind.tools import load_json
+
+CONFIG_PATH = "config/cnn_config.json"
+
+# Scopes and dilation rates of the layers built by cnn_classifier.build_graph
+CONV_SCOPES = ["dConv0", "dConv1", "dConv2", "dConv3", "dConv4", "dConv5", "dConv6"]
+CONV_RATES = [1, 1, 2, 4, 8, 16, 1]
+FC_SCOPES = ["fc0", "fc1"]
+
+# Default epsilon of tf.contrib.layers.batch_norm
+BN_EPSILON = 0.001
+
+# Checked against the exported graph
+SAMPLE_THOUGHTS = [
+	"I think it will rain tomorrow",
+	"What should I read next?",
+	"Looking back, that was the right call.",
+	""
+]
+
+def variable_name(base, index):
+	"""Name tensorFlow gave the index-th variable called base"""
+	return base if index == 0 else "{0}_{1}".format(base, index)
+
+def read_checkpoint(model_path):
+	"""Read the variables needed for inference from a checkpoint,
+	without building its training graph"""
+
+	import tensorflow as tf
+
+	reader = tf.train.NewCheckpointReader(model_path)
+	layers = len(CONV_SCOPES) + len(FC_SCOPES)
+	names = ["sembed_matrix"]
+
+	for index in range(layers):
+		names += [variable_name("W", index), variable_name("B", index)]
+
+	for scope in CONV_SCOPES + FC_SCOPES:
+		names += [scope + "/bn/" + param for param in ["gamma", "beta", "moving_mean", "moving_variance"]]
+
+	return {name: reader.get_tensor(name) for name in names}
+
+def fold_batch_norm(variables):
+	"""Fold inference-time batch norm into the weights and biases of
+	each layer, returning float32 arrays named conv0_weights,
+	conv0_biases, ..., fc1_biases and sembed_matrix"""
+
+	folded = {"sembed_matrix": variables["sembed_matrix"].astype(np.float32)}
+	layers = [("conv", scope) for scope in CONV_SCOPES] + [("fc", scope) for scope in FC_SCOPES]
+	counts = {"conv": 0, "fc": 0}
+
+	for index, (kind, scope) in enumerate(layers):
+
+		weights = variables[variable_name("W", index)].astype(np.float64)
+		gamma = variables[scope + "/bn/gamma"].astype(np.float64)
+		beta = variables[scope + "/bn/beta"].astype(np.float64)
+		mean = variables[scope + "/bn/moving_mean"].astype(np.float64)
+		variance = variables[scope + "/bn/moving_variance"].astype(np.float64)
+		scale = gamma / np.sqrt(variance + BN_EPSILON)
+		biases = beta - mean * scale
+
+		# Only the fully connected layers add their bias after batch norm
+		if kind == "fc":
+			biases = biases + variables[variable_name("B", index)]
+
+		name = "{0}{1}".format(kind, counts[kind])
+		counts[kind] += 1
+		folded[name + "_weights"] = (weights * scale).astype(np.float32)
+		folded[name + "_biases"] = biases.astype(np.float32)
+
+	return folded
+
+def doc_length_of(folded):
+	"""Document length the model was trained on, derived from the
+	width of its first fully connected layer"""
+
+	channels = folded["conv6_weights"].shape[-1]
+	se_dim = folded["sembed_matrix"].shape[1]
+
+	return (folded["fc0_weights"].shape[0] - 4 - se_dim) // channels
+
+def build_inference_graph(folded, indices_input=False):
+	"""Build the model:0 path of the CNN with its weights as constants.
+	With indices_input it reads int32 alphabet indices, -1 for empty
+	positions, and one-hot encodes them in the graph."""
+
+	import tensorflow as tf
+
+	doc_length = doc_length_of(folded)
+	alphabet_length = folded["conv0_weights"].shape[2]
+	graph = tf.Graph()
+
+	with graph.as_default():
+
+		if indices_input:
+			indices = tf.placeholder(tf.int32, shape=[None, doc_length], name="indices")
+			one_hot = tf.one_hot(indices, alphabet_length, dtype=tf.float32)
+			thoughts = tf.reshape(one_hot, [-1, 1, doc_length, alphabet_length], name="x")
+		else:
+			thoughts = tf.placeholder(tf.float32, shape=[None, 1, doc_length, alphabet_length], name="x")
+
+		time_of_day = tf.placeholder(tf.float32, shape=[None, 4], name="tod")
+		speaker_ids = tf.placeholder(tf.int32, [None], name="speaker_ids")
+
+		# Thought Encoder
+		h_conv = thoughts
+
+		for index, rate in enumerate(CONV_RATES):
+			weights = tf.constant(folded["conv{0}_weights".format(index)])
+			biases = tf.constant(folded["conv{0}_biases".format(index)])
+			h_conv = tf.nn.atrous_conv2d(h_conv, weights, rate, padding="SAME") + biases
+
+		h_reshape = tf.reshape(h_conv, [-1, doc_length * int(h_conv.shape[-1])])
+
+		# Other Features
+		sembeds = tf.gather(tf.constant(folded["sembed_matrix"]), speaker_ids)
+		h_fc = tf.concat([time_of_day, h_reshape, sembeds], 1)
+
+		# Classifier
+		for index in range(len(FC_SCOPES)):
+			weights = tf.constant(folded["fc{0}_weights".format(index)])
+			biases = tf.constant(folded["fc{0}_biases".format(index)])
+			z = tf.matmul(h_fc, weights) + biases
+			h_fc = tf.multiply(tf.to_float(tf.greater_equal(z, 1e-6)), z)
+
+		softmax = tf.nn.softmax(h_fc)
+		tf.log(tf.clip_by_value(softmax, 1e-10, 1.0), name="model")
+
+	return graph
+
+def frozen_path_of(model_path):
+	"""Where the frozen graph of a checkpoint is written"""
+	return model_path.split(".ckpt")[0] + ".pb"
+
+def export_cnn(model_path, output_path=None, indices_input=False):
+	"""Freeze a trained CNN checkpoint into a graph file"""
+
+	output_path = output_path or frozen_path_of(model_path)
+	folded = fold_batch_norm(read_checkpoint(model_path))
+	graph = build_inference_graph(folded, indices_input=indices_input)
+
+	with open(output_path, "wb") as frozen:
+		frozen.write(graph.as_graph_def().SerializeToString())
+
+	logging.info("Exported {0} to {1}".format(model_path, output_path))
+
+	return output_path
+
+def compare_outputs(model_path, frozen_path, alphabet, thoughts=SAMPLE_THOUGHTS):
+	"""Largest difference between model:0 of the checkpoint and of
+	the frozen graph on the same thoughts"""
+
+	from mind.char_encoder import get_char_encoder
+	from mind.load_model import load_frozen_session, restore_session
+
+	outputs = []
+
+	for graph, sess in [restore_session(model_path), load_frozen_session(frozen_path)]:
+
+		names = {op.name for op in graph.get_operations()}
+		doc_length = graph.get_tensor_by_name("x:0").shape.as_list()[2]
+		encoder = get_char_encoder(alphabet, doc_length)
+		feed_dict = {
+			"tod:0": np.zeros((len(thoughts), 4), dtype=np.float32),
+			"speaker_ids:0": np.zeros(len(thoughts), dtype=np.int32)
+		}
+
+		if "indices" in names:
+			feed_dict["indices:0"] = encoder.encode_indices(thoughts)
+		else:
+			feed_dict["x:0"] = encoder.encode(thoughts, out=np.zeros((len(thoughts), 1, doc_length, len(alphabet)), dtype=np.float32))
+
+		if "phase" in names:
+			feed_dict["phase:0"] = False
+
+		outputs.append(sess.run("model:0", feed_dict=feed_dict))
+		sess.close()
+
+	return float(np.max(np.abs(np.exp(outputs[0]) - np.exp(outputs[1]))))
+
+def parse_arguments(args):
+	"""Parse command line arguments"""
+
+	parser = argparse.ArgumentParser(description="Freeze a trained CNN for inference")
+	parser.add_argument("model_path", help="checkpoint such as models/thought_type.ckpt")
+	parser.add_argument("--output", default=None, help="frozen graph path, next to the checkpoint by default")
+	parser.add_argument("--indices", action="store_true", help="take int32 character indices instead of one-hot floats")
+
+	return parser.parse_args(args)
+
+def main():
+	"""Run module from command line"""
+
+	logging.basicConfig(level=logging.INFO)
+	args = parse_arguments(sys.argv[1:])
+	output_path = export_cnn(args.model_path, output_path=args.output, indices_input=args.indices)
+	alphabet = load_json(CONFIG_PATH)["alphabet"]
+	difference = compare_outputs(args.model_path, output_path, alphabet)
+	logging.info("Largest probability difference from the checkpoint: {0:.2e}".format(difference))
+
+if __name__ == "__main__":
+	main()
@@ -29,16 +29,15 @@ from collections import defaultdict
 import gensim
 from gensim.models import word2vec
 
-from mind.tools import dict_2_json, vectorize, word_count, load_json
+from mind.tools import dict_2_json, precompress, load_json, load_columnar
+from mind.word_count import WordCounter
 
 def load_ken():
 	"""Load top words in Prophet data"""
 
-	df = pd.read_csv("data/thoughts.csv", na_filter=False, encoding="utf-8", error_bad_lines=False)
-	seers_grouped = df.groupby('Seer', as_index=False)
-	seers = dict(list(seers_grouped))
-	thoughts = list(seers[sys.argv[1]]["Thought"])
-	ken = vectorize(thoughts, min_df=1)
+	df = load_columnar("data/thoughts.csv", columns=["Thought"], seers=[sys.argv[1]])
+	thoughts = list(df["Thought"])
+	ken = WordCounter(min_length=2).count(thoughts, chunk_size=50000)
 	sorted_ken = sorted(ken.items(), key=operator.itemgetter(1))
 	sorted_ken.reverse()
 
@@ -127,6 +126,7 @@ def knowledge_tree(ken):
 	print(similarity_lookup)
 
 	dict_2_json(similarity_lookup, "fruiting" + "_patrick_tree.json")
+	precompress("fruiting" + "_patrick_tree.json")
 
 	return similarity_lookup
 
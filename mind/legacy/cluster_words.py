@@ -29,7 +29,7 @@ from sklearn.manifold import TSNE
 
 import matplotlib.pyplot as plt
 
-from mind.tools import dict_2_json, vectorize, word_count
+from mind.tools import dict_2_json, vectorize, load_columnar
 
 def to_stdout(string, errors='replace'):
 	"""Converts a string to stdout compatible encoding"""
@@ -58,10 +58,8 @@ def cluster_vectors(word2vec):
 	"""Clusters a set of word vectors"""
 
 	# Load Data
-	df = pd.read_csv("data/input/thought.csv", na_filter=False, encoding="utf-8", error_bad_lines=False)
-	seers_grouped = df.groupby('Seer', as_index=False)
-	seers = dict(list(seers_grouped))
-	thoughts = list(seers["msevrens"]["Thought"])
+	df = load_columnar("data/input/thought.csv", columns=["Thought"], seers=["msevrens"])
+	thoughts = list(df["Thought"])
 	ken = vectorize(thoughts, min_df=1)
 	sorted_ken = sorted(ken.items(), key=operator.itemgetter(1))
 	sorted_ken.reverse()
@@ -34,6 +34,7 @@ import pandas as pd
 import numpy as np
 import tensorflow as tf
 
+from mind.char_encoder import get_char_encoder
 from mind.tools import load_json
 
 logging.basicConfig(level=logging.INFO)
@@ -129,24 +130,17 @@ def batch_to_tensor(config, batch):
 	labels = np.array(batch["LABEL_NUM"].astype(int))
 	labels = (np.arange(num_labels) == labels[:, None]).astype(np.float32)
 	docs = batch["Thought"].tolist()
-	thoughts = np.zeros(shape=(batch_size, 1, alphabet_length, doc_length))
-	
-	for index, t in enumerate(docs):
-		thoughts[index][0] = string_to_tensor(config, t, doc_length)
 
-	thoughts = np.transpose(thoughts, (0, 1, 3, 2))
+	# Labeled and unlabeled batches are fed together, so each gets its own array
+	thoughts = np.zeros(shape=(batch_size, 1, doc_length, alphabet_length), dtype=np.float32)
+	thoughts = get_char_encoder(config["alphabet"], doc_length).encode(docs, out=thoughts)
+
 	return thoughts, labels
 
 def string_to_tensor(config, doc, length):
 	"""Convert thought to tensor format"""
-	alphabet = config["alphabet"]
-	alpha_dict = config["alpha_dict"]
-	doc = doc.lower()[0:length]
-	tensor = np.zeros((len(alphabet), length), dtype=np.float32)
-	for index, char in reversed(list(enumerate(doc))):
-		if char in alphabet:
-			tensor[alpha_dict[char]][len(doc) - index - 1] = 1
-	return tensor
+	encoded = get_char_encoder(config["alphabet"], length).encode([doc], out=np.zeros((1, 1, length, config["alphabet_length"]), dtype=np.float32))
+	return encoded[0][0].T
 
 def evaluate_testset(config, graph, sess, model, test):
 	"""Check error on test set"""
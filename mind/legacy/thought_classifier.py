@@ -32,6 +32,8 @@ from sklearn.pipeline import Pipeline, FeatureUnion
 from sklearn.externals import joblib
 from sklearn.base import TransformerMixin
 
+from mind.tools import stream_thoughts
+
 def split_data(file_name):
 	"""Divides the training set into parts for testing and training."""
 	
@@ -52,15 +54,12 @@ def load_data(file_name):
 	"""Loads human labeled data from a file."""
 
 	thoughts, labels = [], []
-	human_labeled_file = open(file_name, encoding='utf-8', errors="replace")
-	human_labeled = list(csv.DictReader(human_labeled_file, delimiter=','))
-	human_labeled_file.close()
 	doc_col_name = sys.argv[2]
 	label_col_name = sys.argv[3]
 
-	for i in range(len(human_labeled)):
-		thoughts.append(human_labeled[i][doc_col_name])
-		labels.append(human_labeled[i][label_col_name].upper())
+	for thought in stream_thoughts(file_name):
+		thoughts.append(thought[doc_col_name])
+		labels.append(thought[label_col_name].upper())
 
 	return thoughts, labels
 
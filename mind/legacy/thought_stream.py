@@ -19,36 +19,13 @@ import datetime
 import numpy
 from textblob import TextBlob, Word
 from sklearn.feature_extraction.text import TfidfTransformer
-from scipy.interpolate import interp1d
-
-from mind.tools import vectorize, word_count, safe_print, load_dict_list
-from mind.load_model import get_tf_cnn_by_name
-
-SENTIMENT = get_tf_cnn_by_name("sentiment")
-HL_PATTERN = re.compile(r"HL \d+")
-HAPPY_PATTERN = re.compile(r"#happy:? \d+\.?\d?")
-MOOD_PATTERN = re.compile(r"#mood:? \d+\.?\d?")
-
-def HL(scale, x):
-	match = re.search(HL_PATTERN, x["Thought"])
-	if match:
-		return scale(float(match.group().split(" ")[1]))
-	else: 
-		return ""
-
-def parse_mood(scale, x):
-	happy_match = re.search(HAPPY_PATTERN, x["Thought"].lower())
-	mood_match = re.search(MOOD_PATTERN, x["Thought"].lower())
-	if happy_match:
-		value = float(happy_match.group().split(" ")[1])
-		value = value if value <= 10 else 10
-		return scale(value)
-	elif mood_match:
-		value = float(mood_match.group().split(" ")[1])
-		value = value if value <= 10 else 10
-		return scale(value)
-	else:
-		return ""
+
+from mind.tools import vectorize, safe_print, stream_thoughts
+from mind.word_count import WordCounter
+from mind.load_model import get_cnn_by_name
+from mind.mood import extract_sentiment
+
+SENTIMENT = get_cnn_by_name("sentiment")
 
 def write_dict_list(dict_list, file_name, encoding="utf-8", delimiter=","):
 	""" Saves a lists of dicts with uniform keys to file """
@@ -115,17 +92,18 @@ def processByDay(days, ken):
 
 	stream = []
 
-	for day, thoughts in days.items():
-		thoughts = [thought['Thought'] for thought in thoughts]
-		if len(thoughts) == 0: continue
-		word_count = vectorize(thoughts)
+	# Only words of the ken are counted, every day in one pass
+	days = [(day, [thought['Thought'] for thought in thoughts]) for day, thoughts in days.items() if len(thoughts) > 0]
+	counter = WordCounter(min_length=2, vocabulary=ken)
+	daily_counts = counter.count_by_group([thoughts for day, thoughts in days])
+
+	for (day, thoughts), word_count in zip(days, daily_counts):
 		daily_ken = {'Post Date' : day}
 	
 		# Get Daily Words
-		for word, count in word_count.items():
+		for word, count in word_count:
 			#word = Word(word).lemmatize()
-			if word in ken:
-				daily_ken[word] = count
+			daily_ken[word] = count
 
 		# Add Missing Words
 		for word in ken:
@@ -248,11 +226,11 @@ def buildLookup(days, ken):
 	"""Build a lookuptable for search"""
 
 	lookup = collections.defaultdict(list)
+	counter = WordCounter(min_length=2)
 
 	for day, thoughts in days.items():
 		for thought in thoughts:
-			word_count = vectorize([thought['Thought']])
-			for word in word_count.keys():
+			for word in counter.analyze(thought['Thought']):
 				if word in ken:
 					lookup[word].append([thought["ID"], int(datetime.datetime.strptime(day, '%m/%d/%y').timestamp())])
 
@@ -262,19 +240,21 @@ def buildLookup(days, ken):
 def preprocess_thoughts(thoughts):
 	"""Perform preprocessing steps"""
 
-	scale = interp1d([0,10],[-1,1])
+	extracted = extract_sentiment([thought["Thought"] for thought in thoughts])
+	moods = [float(m) if not numpy.isnan(m) else "" for m in extracted["mood"]]
+	hls = [float(h) if not numpy.isnan(h) else "" for h in extracted["hl"]]
 
 	if sys.argv[2] == "pat":
-		for thought in thoughts:
-			thought["mood"] = HL(scale, thought)
+		for thought, hl in zip(thoughts, hls):
+			thought["mood"] = hl
 			if thought["mood"] != "":
 				print(thought["mood"])
 	elif sys.argv[2] == "matt":
-		for thought in thoughts:
-			thought["mood"] = parse_mood(scale, thought)
+		for thought, mood in zip(thoughts, moods):
+			thought["mood"] = mood
 	elif sys.argv[2] == "leah":
-		for thought in thoughts:
-			thought["mood"] = parse_mood(scale, thought)
+		for thought, mood in zip(thoughts, moods):
+			thought["mood"] = mood
 
 	return thoughts
 
@@ -283,8 +263,7 @@ def run_from_command():
 	
 	params = {}
 	collective_thoughts = []
-	thoughts = load_dict_list(sys.argv[1])
-	thinkers = collectThoughts(thoughts)
+	thinkers = collectThoughts(stream_thoughts(sys.argv[1], extra=("mood",)))
 
 	pat_thoughts = thinkers['patch615']
 	matt_thoughts = thinkers['msevrens'] + thinkers['prophet'] + thinkers['researchLog']
@@ -1,128 +1,471 @@
 #!/usr/local/bin/python3.3
 
-"""This module loads classifier from various libraries and produces 
-helper functions that will classify thoughts. Depending on the model 
+"""This module loads classifier from various libraries and produces
+helper functions that will classify thoughts. Depending on the model
 requested this module will load a different previously generated model.
 
+Every model is loaded into its own graph and session, or into NumPy
+alone when its weights have been converted for it, and kept in a
+shared registry, so several models can serve from one process and
+are only loaded from disk on first use.
+
 Created on Apr 27, 2016
 @author: Matthew Sevrens
 """
 
-from os.path import isfile
+#################### USAGE ##########################
+
+# from mind.load_model import get_cnn_by_name, REGISTRY
+# REGISTRY.configure(idle_timeout=600, memory_budget=2 * 2 ** 30)
+# apply_cnn = get_cnn_by_name("thought_type")
+# apply_cnn = get_cnn_by_name("sentiment", quantization="auto")
+# apply_cnn([{"Thought": "I think it will rain"}])
+
+#####################################################
+
+from collections import OrderedDict
+from os.path import getsize, isfile
 import sys
 import logging
 import math
+import threading
+import time
 
 import numpy as np
-import tensorflow as tf
-from tensorflow.python.framework import ops
 
-from mind.tools import load_json
-from mind.tensorflow_cnn import validate_config, get_tensor, string_to_tensor
-from mind.bilstm_tagger import validate_config as bilstm_validate_config
-from mind.bilstm_tagger import doc_to_tensor
+from mind.tools import load_json, get_tensor
+
+CNN_CONFIG_PATH = "config/cnn_config.json"
+RNN_CONFIG_PATH = "config/bilstm_config.json"
+
+CNN_MODELS = {
+	"thought_type": ("models/thought_type.ckpt", {"0": "Predict", "1": "State", "2": "Ask", "3": "Reflect"}),
+	"sentiment": ("models/sentiment.ckpt", {"0": "Negative", "1": "Positive"})
+}
+
+class LoadedModel(object):
+	"""A model restored into its own graph and session"""
+
+	def __init__(self, name, session, apply, size):
+		self.name = name
+		self.session = session
+		self.apply = apply
+		self.size = size
+		self.users = 0
+		self.last_used = time.monotonic()
+		self.retired = False
+
+	def close(self):
+		"""Free the session and everything restored into it"""
+		self.session.close()
+
+class ModelRegistry(object):
+	"""Keeps loaded models resident by name.
+
+	Models are loaded by their registered loader on first use. The
+	least recently used ones are evicted once idle for idle_timeout
+	seconds or while the models together take more than memory_budget
+	bytes. An evicted model is closed once its last call finishes and
+	is loaded again on its next use."""
+
+	def __init__(self, idle_timeout=None, memory_budget=None):
+		self.idle_timeout = idle_timeout
+		self.memory_budget = memory_budget
+		self.loaders = {}
+		self.models = OrderedDict()
+		self.loading = {}
+		self.lock = threading.Lock()
+		self.sweeper = None
+
+	def configure(self, idle_timeout=None, memory_budget=None):
+		"""Set eviction limits; None disables a limit"""
+
+		with self.lock:
+			self.idle_timeout = idle_timeout
+			self.memory_budget = memory_budget
+			self.enforce_budget()
+
+	def register(self, name, loader):
+		"""Register how to load a model, unless name already is"""
+
+		with self.lock:
+			self.loaders.setdefault(name, loader)
+
+	def get(self, name):
+		"""Return a function applying the named model, so callers can
+		keep it while the model itself is evicted and reloaded"""
+
+		def apply_model(*args, **kwargs):
+			return self.call(name, *args, **kwargs)
+
+		return apply_model
+
+	def call(self, name, *args, **kwargs):
+		"""Apply the named model, loading it if it is not resident"""
+
+		model = self.acquire(name)
+
+		try:
+			return model.apply(*args, **kwargs)
+		finally:
+			self.release(model)
+
+	def acquire(self, name):
+		"""Return the named model marked as in use"""
+
+		model = self.checkout(name)
+
+		if model is not None:
+			return model
+
+		with self.lock:
+			if name not in self.loaders:
+				raise KeyError("No model registered as {0}".format(name))
+			loading = self.loading.setdefault(name, threading.Lock())
+
+		# Only one thread loads a model; others wait for it
+		with loading:
+			model = self.checkout(name)
+			if model is None:
+				model = self.load(name)
+
+		return model
+
+	def checkout(self, name):
+		"""Mark a resident model as in use, or return None"""
+
+		with self.lock:
+			model = self.models.get(name)
+			if model is not None:
+				self.models.move_to_end(name)
+				model.users += 1
+				model.last_used = time.monotonic()
+			return model
+
+	def load(self, name):
+		"""Run the loader of a model and make it resident"""
+
+		start = time.perf_counter()
+		model = self.loaders[name]()
+		model.users = 1
+		logging.info("Loaded model {0} ({1:.0f}MB) in {2:.2f}s".format(name, model.size / 2 ** 20, time.perf_counter() - start))
+
+		with self.lock:
+			self.models[name] = model
+			self.enforce_budget()
+
+		self.start_sweeper()
+
+		return model
+
+	def release(self, model):
+		"""Mark one use of a model as finished"""
+
+		with self.lock:
+			model.users -= 1
+			model.last_used = time.monotonic()
+			if model.retired and model.users == 0:
+				model.close()
+
+	def retire(self, name):
+		"""Remove a model from the registry, closing it once unused.
+		Callers must hold the lock."""
+
+		model = self.models.pop(name)
+		model.retired = True
+		logging.info("Evicted model {0}".format(name))
+
+		if model.users == 0:
+			model.close()
+
+	def evict(self, name):
+		"""Unload a model now"""
+
+		with self.lock:
+			if name in self.models:
+				self.retire(name)
+
+	def evict_idle(self):
+		"""Unload models unused for longer than idle_timeout"""
+
+		with self.lock:
+
+			if not self.idle_timeout:
+				return
+
+			now = time.monotonic()
+
+			for name, model in list(self.models.items()):
+				if model.users == 0 and now - model.last_used > self.idle_timeout:
+					self.retire(name)
+
+	def enforce_budget(self):
+		"""Unload least recently used models until the rest fit the
+		memory budget, always keeping the most recent one. Callers
+		must hold the lock."""
+
+		if not self.memory_budget:
+			return
+
+		while len(self.models) > 1 and self.resident_size() > self.memory_budget:
+			self.retire(next(iter(self.models)))
+
+	def resident_size(self):
+		"""Bytes taken by the variables of resident models"""
+		return sum(model.size for model in self.models.values())
+
+	def resident(self):
+		"""Names and sizes of resident models, least recently used first"""
+
+		with self.lock:
+			return [(name, model.size) for name, model in self.models.items()]
+
+	def start_sweeper(self):
+		"""Evict idle models in the background, even without calls"""
+
+		if self.sweeper is not None or not self.idle_timeout:
+			return
+
+		self.sweeper = threading.Thread(target=self.sweep, name="model-sweeper", daemon=True)
+		self.sweeper.start()
+
+	def sweep(self):
+		"""Periodically evict idle models"""
+
+		while True:
+			time.sleep(max(self.idle_timeout or 60, 4) / 4)
+			self.evict_idle()
+
+REGISTRY = ModelRegistry()
+
+def variable_bytes(graph):
+	"""Bytes taken by the variables of a graph"""
+
+	import tensorflow as tf
+
+	with graph.as_default():
+		variables = tf.global_variables()
+
+	return sum(int(np.prod(v.shape.as_list())) * v.dtype.base_dtype.size for v in variables)
 
-def get_cnn_by_name(model_name, gpu_mem_fraction=False):
+def restore_session(model_path, session_config=None):
+	"""Restore a checkpoint into a new graph and session"""
+
+	import tensorflow as tf
+
+	meta_path = model_path.split(".ckpt")[0] + ".meta"
+	graph = tf.Graph()
+
+	with graph.as_default():
+		saver = tf.train.import_meta_graph(meta_path)
+
+	sess = tf.Session(graph=graph, config=session_config)
+	saver.restore(sess, model_path)
+
+	return graph, sess
+
+def load_frozen_session(frozen_path):
+	"""Load a graph frozen by mind.export_cnn into a new session"""
+
+	import tensorflow as tf
+
+	graph_def = tf.GraphDef()
+
+	with open(frozen_path, "rb") as frozen:
+		graph_def.ParseFromString(frozen.read())
+
+	graph = tf.Graph()
+
+	with graph.as_default():
+		tf.import_graph_def(graph_def, name="")
+
+	return graph, tf.Session(graph=graph)
+
+def optional_tensor(graph, name):
+	"""Get a tensor by name, or None if the graph has no such tensor"""
+
+	try:
+		return get_tensor(graph, name)
+	except KeyError:
+		return None
+
+def get_cnn_by_name(model_name, gpu_mem_fraction=False, quantization=None):
 	"""Load a tensorFlow CNN by name"""
 
-	base = "models/"
-	# Switch on Models
-	if model_name == "thought_type":
-		model_path = base + "thought_type.ckpt"
-		label_map_path = {"0": "Predict", "1": "State", "2": "Ask", "3": "Reflect"}
-	elif model_name == "sentiment":
-		model_path = base + "sentiment.ckpt"
-		label_map_path = {"0": "Negative", "1": "Positive"}
-	else:
+	if model_name not in CNN_MODELS:
 		logging.warning("Model not found. Terminating")
 		sys.exit()
 
-	return get_tf_cnn_by_path(model_path, label_map_path, gpu_mem_fraction=gpu_mem_fraction)
+	model_path, label_map = CNN_MODELS[model_name]
 
-def get_tf_cnn_by_path(model_path, label_map_path, gpu_mem_fraction=False):
-	"""Load a tensorFlow module by name"""
+	return get_tf_cnn_by_path(model_path, label_map, gpu_mem_fraction=gpu_mem_fraction, name=model_name, quantization=quantization)
 
-	# Load Config
-	config_path = "config/tf_cnn_config.json"
+def get_tf_cnn_by_path(model_path, label_map_path, gpu_mem_fraction=False, name=None, quantization=None):
+	"""Return a function applying the CNN at model_path, shared under
+	name and loaded on first use. Quantized weights are only served
+	when quantization asks for them, see numpy_cnn.weights_paths_of."""
+
+	name = name or model_path
+	REGISTRY.register(name, lambda: load_cnn(name, model_path, label_map_path, quantization))
+
+	return REGISTRY.get(name)
+
+def load_cnn(name, model_path, label_map_path, quantization=None):
+	"""Load a CNN into NumPy if its weights have been converted by
+	mind.numpy_cnn, or by mind.quantize_cnn when quantization allows,
+	and into tensorFlow otherwise"""
+
+	from mind.numpy_cnn import weights_paths_of
+
+	weights_path = next((path for path in weights_paths_of(model_path, quantization) if isfile(path)), None)
+
+	if weights_path is not None:
+		return load_numpy_cnn(name, weights_path, model_path, label_map_path)
+
+	return load_tf_cnn(name, model_path, label_map_path)
+
+def label_thoughts(thoughts, output, label_key, label_map, is_sentiment):
+	"""Write the labels predicted in output onto thoughts"""
+
+	labels = output[:,1] if is_sentiment else np.argmax(output, 1)
+
+	if is_sentiment:
+		for index, thought in enumerate(thoughts):
+			thought[label_key] = math.pow(10, labels[index])
+	else:
+		for index, thought in enumerate(thoughts):
+			label = label_map.get(str(labels[index]), "")
+			thought[label_key] = label
+
+	return thoughts
+
+def load_numpy_cnn(name, weights_path, model_path, label_map_path):
+	"""Load a CNN into the NumPy engine, without tensorFlow"""
+
+	from mind.char_encoder import get_char_encoder
+	from mind.numpy_cnn import NumpyCNN
+
+	config = load_json(CNN_CONFIG_PATH)
+	label_map = load_json(label_map_path)
+	is_sentiment = "sentiment" in model_path
+	cnn = NumpyCNN.load(weights_path)
+	encoder = get_char_encoder(config["alphabet"], cnn.doc_length)
+
+	# Generate Helper Function
+	def apply_cnn(thoughts, doc_key="Thought", label_key="CNN"):
+		"""Apply CNN to thoughts"""
+
+		indices = encoder.encode_indices([doc[doc_key] for doc in thoughts])
+		output = cnn.forward(indices)
+
+		return label_thoughts(thoughts, output, label_key, label_map, is_sentiment)
+
+	return LoadedModel(name, cnn, apply_cnn, cnn.nbytes)
+
+def load_tf_cnn(name, model_path, label_map_path):
+	"""Restore a tensorFlow CNN into its own graph and session"""
+
+	from mind.char_encoder import get_char_encoder
+	from mind.cnn_classifier import prepare_config
+	from mind.export_cnn import frozen_path_of
+
+	frozen_path = frozen_path_of(model_path)
+	frozen = isfile(frozen_path)
 
 	# Validate Model and Label Map
-	if not isfile(model_path):
+	if not frozen and not isfile(model_path):
 		logging.warning("Resouces to load model not found. Loading from S3")
-		sys.exit()
+		raise IOError("Model not found: {0}".format(model_path))
 
 	# Load Config
-	config = load_json(config_path)
+	config = load_json(CNN_CONFIG_PATH)
 	config["label_map"] = label_map_path
 	config["model_path"] = model_path
-	meta_path = model_path.split(".ckpt")[0] + ".meta"
-	config = validate_config(config)
+	config = prepare_config(config)
 	label_map = config["label_map"]
+	is_sentiment = "sentiment" in model_path
+
+	# Load Session and Graph, Preferring the Frozen Export
+	if frozen:
+		graph, sess = load_frozen_session(frozen_path)
+		size = getsize(frozen_path)
+	else:
+		graph, sess = restore_session(model_path)
+		size = variable_bytes(graph)
 
-	# Load Session and Graph
-	ops.reset_default_graph()
-	saver = tf.train.import_meta_graph(meta_path)
-	sess = tf.Session()
-	saver.restore(sess, config["model_path"])
-	graph = sess.graph
 	model = get_tensor(graph, "model:0")
-	
+	x = get_tensor(graph, "x:0")
+	tod = get_tensor(graph, "tod:0")
+	speaker_ids = get_tensor(graph, "speaker_ids:0")
+
+	# Frozen graphs have no phase and may take character indices
+	phase = optional_tensor(graph, "phase:0")
+	indices = optional_tensor(graph, "indices:0")
+
+	# Documents are as long as the model was trained on
+	doc_length = x.shape.as_list()[2] or config["doc_length"]
+	encoder = get_char_encoder(config["alphabet"], doc_length)
+
 	# Generate Helper Function
 	def apply_cnn(thoughts, doc_key="Thought", label_key="CNN"):
 		"""Apply CNN to thoughts"""
 
-		alphabet_length = config["alphabet_length"]
-		doc_length = config["doc_length"]
 		batch_size = len(thoughts)
+		docs = [doc[doc_key] for doc in thoughts]
 
-		tensor = np.zeros(shape=(batch_size, 1, alphabet_length, doc_length))
+		# Time of day and speaker are unknown when applying the model
+		feed_dict_test = {
+			tod: np.zeros((batch_size, 4), dtype=np.float32),
+			speaker_ids: np.zeros(batch_size, dtype=np.int32)
+		}
 
-		for index, doc in enumerate(thoughts):
-			tensor[index][0] = string_to_tensor(config, doc[doc_key], doc_length)
+		if indices is not None:
+			feed_dict_test[indices] = encoder.encode_indices(docs)
+		else:
+			feed_dict_test[x] = encoder.encode(docs)
 
-		tensor = np.transpose(tensor, (0, 1, 3, 2))
-		feed_dict_test = {get_tensor(graph, "x:0"): tensor}
-		output = sess.run(model, feed_dict=feed_dict_test)
-		labels = output[:,1] if "sentiment" in model_path else np.argmax(output, 1)
+		if phase is not None:
+			feed_dict_test[phase] = False
 
-		if "sentiment" in model_path:
-			for index, thought in enumerate(thoughts):
-				thought[label_key] = math.pow(10, labels[index])				
-		else:
-			for index, thought in enumerate(thoughts):
-				label = label_map.get(str(labels[index]), "")
-				thought[label_key] = label
+		output = sess.run(model, feed_dict=feed_dict_test)
 
-		return thoughts
+		return label_thoughts(thoughts, output, label_key, label_map, is_sentiment)
 
-	return apply_cnn
+	return LoadedModel(name, sess, apply_cnn, size)
 
 def get_rnn_by_path(model_path, w2i_path, gpu_mem_fraction=False, model_name=False):
-	"""Load a tensorflow rnn model"""
+	"""Return a function applying the tensorflow rnn at model_path,
+	restored on first use"""
+
+	name = model_path + ":" + (model_name or "model:0")
+	REGISTRY.register(name, lambda: load_rnn(name, model_path, w2i_path, gpu_mem_fraction, model_name))
+
+	return REGISTRY.get(name)
+
+def load_rnn(name, model_path, w2i_path, gpu_mem_fraction=False, model_name=False):
+	"""Restore a tensorflow rnn into its own graph and session"""
 
-	config_path = "config/bilstm_config.json"
+	import tensorflow as tf
+	from mind.bilstm_tagger import validate_config as bilstm_validate_config
+	from mind.bilstm_tagger import doc_to_tensor
 
 	if not isfile(model_path):
 		logging.warning("Resources to load model not found.")
-		sys.exit()
+		raise IOError("Model not found: {0}".format(model_path))
 
 	# Load Graph
-	config = bilstm_validate_config(config_path)
+	config = bilstm_validate_config(RNN_CONFIG_PATH)
 	config["model_path"] = model_path
-	meta_path = model_path.split(".ckpt")[0] + ".meta"
 	config["w2i"] = load_json(w2i_path)
 
 	# Load Session and Graph
-	ops.reset_default_graph()
-	saver = tf.train.import_meta_graph(meta_path)
-
 	if gpu_mem_fraction:
 		gpu_options = tf.GPUOptions(per_process_gpu_memory_fraction=0.25)
-		sess = tf.Session(config=tf.ConfigProto(allow_soft_placement=True, gpu_options=gpu_options))
+		session_config = tf.ConfigProto(allow_soft_placement=True, gpu_options=gpu_options)
 	else:
-		sess = tf.Session(config=tf.ConfigProto(allow_soft_placement=True))
+		session_config = tf.ConfigProto(allow_soft_placement=True)
 
-	saver.restore(sess, config["model_path"])
-	graph = sess.graph
+	graph, sess = restore_session(config["model_path"], session_config)
 
 	if not model_name:
 		model = get_tensor(graph, "model:0")
@@ -133,13 +476,13 @@ def get_rnn_by_path(model_path, w2i_path, gpu_mem_fraction=False, model_name=Fal
 	def apply_rnn(thought, doc_key="thought", label_key="tag"):
 
 		for index, doc in enumerate(thought):
-			thot = doc[doc_key].lower().split()[0:config["max_tokens"]]
+			tran = doc[doc_key].lower().split()[0:config["max_tokens"]]
 			char_inputs, word_lengths, word_indices, _ = doc_to_tensor(config, sess, graph, tran)
 			feed_dict = {
 				get_tensor(graph, "char_inputs:0"): char_inputs,
 				get_tensor(graph, "word_inputs:0"): word_indices,
 				get_tensor(graph, "word_lengths:0"): word_lengths,
-				get_tensor(graph, "doc_length:0"): len(thot),
+				get_tensor(graph, "doc_length:0"): len(tran),
 				get_tensor(graph, "train:0"): False
 			}
 
@@ -150,7 +493,7 @@ def get_rnn_by_path(model_path, w2i_path, gpu_mem_fraction=False, model_name=Fal
 
 		return thought
 
-	return apply_rnn
+	return LoadedModel(name, sess, apply_rnn, variable_bytes(graph))
 
 if __name__ == "__main__":
 	# pylint:disable=pointless-string-statement
@@ -0,0 +1,49 @@
+#!/usr/local/bin/python3
+
+"""This module extracts self reported mood from batches of thoughts
+for the sentiment API and legacy thought stream
+
+Created on Oct 18, 2026
+@author: Matthew Sevrens
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+# One pass captures every tag: each optional lookahead searches the whole
+# thought independently, so #happy still wins over an earlier #mood
+SENTIMENT_PATTERN = re.compile(
+	r"^(?=(?:.*?(?i:#happy):? (?P<happy>\d+\.?\d?))?)"
+	r"(?=(?:.*?(?i:#mood):? (?P<mood>\d+\.?\d?))?)"
+	r"(?=(?:.*?HL (?P<hl>\d+))?)",
+	re.DOTALL
+)
+
+# Linear map of reported values from [0, 10] onto [-1, 1]
+SCALE_LOW, SCALE_HIGH = 0.0, 10.0
+SCALE_SLOPE = (1.0 - -1.0) / (SCALE_HIGH - SCALE_LOW)
+
+def scale(values):
+	"""Map values from 0 to 10 onto -1 to 1, clipping above 10"""
+	values = np.minimum(values, SCALE_HIGH)
+	return SCALE_SLOPE * (values - SCALE_LOW) + -1.0
+
+def extract_sentiment(thoughts):
+	"""Extract scaled #happy / #mood and HL values from a list of
+	thought strings. Returns a dict of float arrays named "mood" and
+	"hl" aligned with thoughts, holding NaN where nothing was reported."""
+
+	if len(thoughts) == 0:
+		return {"mood": np.zeros(0), "hl": np.zeros(0)}
+
+	tags = pd.Series(thoughts, dtype=object).str.extract(SENTIMENT_PATTERN)
+	tags = tags.apply(pd.to_numeric, errors="coerce")
+	happy = tags["happy"].values
+	mood = np.where(np.isnan(happy), tags["mood"].values, happy)
+
+	return {"mood": scale(mood), "hl": scale(tags["hl"].values)}
+
+if __name__ == "__main__":
+	print("This module is a library that contains useful functions; it should not be run from the console.")
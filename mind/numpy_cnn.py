@@ -0,0 +1,245 @@
+#!/usr/local/bin/python3
+
+"""This module runs the thought CNNs in NumPy alone. A converter
+writes the batch norm folded weights of a checkpoint to an npz file,
+and NumpyCNN reproduces model:0 from those weights or from weights
+quantized by mind.quantize_cnn, so serving never imports TensorFlow.
+
+Created on Oct 18, 2026
+@author: Matthew Sevrens
+"""
+
+#################### USAGE ##########################
+
+# python3 -m mind.numpy_cnn [model_path]
+# python3 -m mind.numpy_cnn models/thought_type.ckpt
+
+# from mind.numpy_cnn import NumpyCNN
+# cnn = NumpyCNN.load("models/thought_type.npz")
+# log_probabilities = cnn.forward(encoder.encode_indices(thoughts))
+
+#####################################################
+
+import logging
+import sys
+
+import numpy as np
+
+from mind.export_cnn import CONV_RATES, FC_SCOPES, doc_length_of
+
+# Columns of a compact weight matrix widened to float32 at a time
+BLOCK_SIZE = 1024
+
+def numpy_path_of(model_path):
+	"""Where the float32 NumPy weights of a checkpoint are written"""
+	return model_path.split(".ckpt")[0] + ".npz"
+
+def weights_paths_of(model_path, quantization=None):
+	"""NumPy weight files of a checkpoint, in order of preference.
+
+	The float32 weights are used unless quantization names a mode of
+	mind.quantize_cnn, or is "auto" to take the quantized weights
+	whose accuracy report passes. Quantized files are never picked
+	just because they exist."""
+
+	from mind.quantize_cnn import MODES, quantized_path_of, report_passes
+
+	if quantization is None:
+		quantized = []
+	elif quantization == "auto":
+		quantized = [path for path in (quantized_path_of(model_path, mode) for mode in MODES) if report_passes(path)]
+	elif quantization in MODES:
+		quantized = [quantized_path_of(model_path, quantization)]
+	else:
+		raise ValueError("Unknown quantization: {0}".format(quantization))
+
+	return quantized + [numpy_path_of(model_path)]
+
+def dense(h, weights, scale=None):
+	"""Multiply h by weights, widening compact weights to float32
+	one block of columns at a time"""
+
+	if weights.dtype == np.float32:
+		return h @ weights
+
+	out = np.empty((h.shape[0], weights.shape[1]), dtype=np.float32)
+
+	for start in range(0, weights.shape[1], BLOCK_SIZE):
+		block = weights[:, start:start + BLOCK_SIZE].astype(np.float32)
+		out[:, start:start + BLOCK_SIZE] = h @ block
+
+	if scale is not None:
+		out *= scale
+
+	return out
+
+def same_padding(width, rate):
+	"""Zeros before and after a sequence for a dilated SAME convolution"""
+	total = (width - 1) * rate
+	return total // 2, total - total // 2
+
+class NumpyCNN(object):
+	"""Forward pass of a thought CNN over batch norm folded weights"""
+
+	def __init__(self, arrays):
+
+		# Convolution weights are small, so compact ones are widened now
+		folded = {}
+		for name, values in arrays.items():
+			if name == "quantization" or name.endswith("_scale"):
+				continue
+			if name.startswith("conv") and name + "_scale" in arrays:
+				values = values * arrays[name + "_scale"]
+			folded[name] = values if name.startswith("fc") and name.endswith("_weights") else values.astype(np.float32)
+
+		self.doc_length = doc_length_of(folded)
+		self.sembed_matrix = folded["sembed_matrix"]
+
+		# The one-hot first layer is a lookup of weight rows by character,
+		# with an extra zero row for the empty positions marked -1
+		first = folded["conv0_weights"][0]
+		self.first_table = np.concatenate([first, np.zeros_like(first[:, :1])], axis=1)
+		self.first_biases = folded["conv0_biases"]
+		self.first_rate = CONV_RATES[0]
+
+		self.convs = []
+		for index, rate in enumerate(CONV_RATES[1:], 1):
+			weights = folded["conv{0}_weights".format(index)][0]
+			width, channels_in, channels_out = weights.shape
+			self.convs.append((weights.reshape(width * channels_in, channels_out), folded["conv{0}_biases".format(index)], width, rate))
+
+		self.fcs = []
+		for index in range(len(FC_SCOPES)):
+			name = "fc{0}_weights".format(index)
+			self.fcs.append((folded[name], arrays.get(name + "_scale"), folded["fc{0}_biases".format(index)]))
+
+		self.nbytes = sum(values.nbytes for values in folded.values())
+
+	@classmethod
+	def load(cls, path):
+		"""Load weights written by this module or mind.quantize_cnn"""
+
+		from mind.quantize_cnn import load_quantized
+
+		return cls(load_quantized(path))
+
+	def embed_characters(self, indices):
+		"""First convolution over (batch, doc_length) character indices"""
+
+		width = self.first_table.shape[0]
+		before, after = same_padding(width, self.first_rate)
+		padded = np.pad(indices, ((0, 0), (before, after)), constant_values=-1)
+		h = np.broadcast_to(self.first_biases, indices.shape + self.first_biases.shape).copy()
+
+		for tap in range(width):
+			offset = tap * self.first_rate
+			h += self.first_table[tap][padded[:, offset:offset + self.doc_length]]
+
+		return h
+
+	def convolve(self, h, weights, biases, width, rate):
+		"""Dilated SAME convolution of (batch, doc_length, channels) as
+		one matrix product over strided windows"""
+
+		batch, length, channels = h.shape
+
+		if width == 1:
+			return (h.reshape(-1, channels) @ weights + biases).reshape(batch, length, -1)
+
+		before, after = same_padding(width, rate)
+		padded = np.pad(h, ((0, 0), (before, after), (0, 0)))
+		strides = padded.strides
+		windows = np.lib.stride_tricks.as_strided(
+			padded,
+			shape=(batch, length, width, channels),
+			strides=(strides[0], strides[1], strides[1] * rate, strides[2]),
+			writeable=False
+		)
+
+		columns = windows.reshape(batch * length, width * channels)
+
+		return (columns @ weights + biases).reshape(batch, length, -1)
+
+	def forward(self, indices, tod=None, speaker_ids=None):
+		"""Log class probabilities for (batch, doc_length) int32
+		character indices, as model:0 computes them"""
+
+		batch = len(indices)
+		tod = np.zeros((batch, 4), dtype=np.float32) if tod is None else tod
+		speaker_ids = np.zeros(batch, dtype=np.int32) if speaker_ids is None else speaker_ids
+
+		# Thought Encoder
+		h = self.embed_characters(indices)
+
+		for weights, biases, width, rate in self.convs:
+			h = self.convolve(h, weights, biases, width, rate)
+
+		# Other Features
+		h = np.concatenate([tod.astype(np.float32), h.reshape(batch, -1), self.sembed_matrix[speaker_ids]], axis=1)
+
+		# Classifier
+		for weights, scale, biases in self.fcs:
+			z = dense(h, weights, scale) + biases
+			h = z * (z >= 1e-6)
+
+		h = h - np.max(h, axis=1, keepdims=True)
+		softmax = np.exp(h)
+		softmax /= np.sum(softmax, axis=1, keepdims=True)
+
+		return np.log(np.clip(softmax, 1e-10, 1.0))
+
+	def close(self):
+		"""Release the weights"""
+		self.convs, self.fcs = [], []
+
+def convert(model_path, output_path=None):
+	"""Write the batch norm folded weights of a checkpoint to npz"""
+
+	from mind.export_cnn import fold_batch_norm, read_checkpoint
+	from mind.quantize_cnn import save_quantized
+
+	output_path = output_path or numpy_path_of(model_path)
+	save_quantized(output_path, fold_batch_norm(read_checkpoint(model_path)))
+	logging.info("Converted {0} to {1}".format(model_path, output_path))
+
+	return output_path
+
+def compare_outputs(model_path, numpy_path, alphabet):
+	"""Largest probability difference between model:0 of the
+	checkpoint and NumpyCNN on the export sample thoughts"""
+
+	from mind.char_encoder import get_char_encoder
+	from mind.export_cnn import SAMPLE_THOUGHTS
+	from mind.load_model import restore_session
+
+	cnn = NumpyCNN.load(numpy_path)
+	encoder = get_char_encoder(alphabet, cnn.doc_length)
+	graph, sess = restore_session(model_path)
+	count = len(SAMPLE_THOUGHTS)
+
+	expected = sess.run("model:0", feed_dict={
+		"x:0": encoder.encode(SAMPLE_THOUGHTS),
+		"tod:0": np.zeros((count, 4), dtype=np.float32),
+		"speaker_ids:0": np.zeros(count, dtype=np.int32),
+		"phase:0": False
+	})
+	sess.close()
+
+	actual = cnn.forward(encoder.encode_indices(SAMPLE_THOUGHTS))
+
+	return float(np.max(np.abs(np.exp(expected) - np.exp(actual))))
+
+def main():
+	"""Run module from command line"""
+
+	from mind.export_cnn import CONFIG_PATH
+	from mind.tools import load_json
+
+	logging.basicConfig(level=logging.INFO)
+	model_path = sys.argv[1]
+	numpy_path = convert(model_path)
+	difference = compare_outputs(model_path, numpy_path, load_json(CONFIG_PATH)["alphabet"])
+	logging.info("Largest probability difference from the checkpoint: {0:.2e}".format(difference))
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,34 @@
+#!/usr/local/bin/python3
+
+"""This module backfills gzip and brotli copies of JSON artifacts in
+the data directory, such as word2vec_tree.json and the sensemaking
+trees, that were generated before their generator compressed them
+
+Created on Oct 18, 2026
+@author: Matthew Sevrens
+"""
+
+#################### USAGE ##########################
+
+# python3 -m mind.precompress [directory]
+# python3 -m mind.precompress data
+
+#####################################################
+
+import sys
+
+from mind.tools import precompress_dir
+
+def main():
+	"""Run module from command line"""
+
+	directory = sys.argv[1] if len(sys.argv) > 1 else "data"
+	written = precompress_dir(directory)
+
+	for filename in written:
+		print("Wrote " + filename)
+
+	print("Precompressed {0} files in {1}".format(len(written), directory))
+
+if __name__ == "__main__":
+	main()
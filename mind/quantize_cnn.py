@@ -0,0 +1,209 @@
+#!/usr/local/bin/python3
+
+"""This module quantizes the weights of a trained thought CNN to
+int8 with a scale per output channel, or to float16, and reports
+how closely the quantized model agrees with the float model on a
+held-out CSV
+
+Created on Oct 18, 2026
+@author: Matthew Sevrens
+"""
+
+#################### USAGE ##########################
+
+# python3 -m mind.quantize_cnn [model_path] --mode [int8|float16]
+# python3 -m mind.quantize_cnn models/thought_type.ckpt --mode int8
+# python3 -m mind.quantize_cnn models/sentiment.ckpt --mode float16 --test data/sentiment_test.csv --label_key Sentiment
+
+#####################################################
+
+import argparse
+import json
+import logging
+import os
+import pprint
+import sys
+
+import numpy as np
+
+from mind.char_encoder import get_char_encoder
+from mind.export_cnn import CONFIG_PATH, fold_batch_norm, read_checkpoint
+from mind.tools import load_json, load_columnar
+
+MODES = ["int8", "float16"]
+
+# What an accuracy report must show for its weights to be served
+MIN_AGREEMENT = 0.99
+MAX_ACCURACY_DROP = 0.005
+
+def quantized_path_of(model_path, mode):
+	"""Where the quantized weights of a checkpoint are written"""
+	return "{0}.{1}.npz".format(model_path.split(".ckpt")[0], mode)
+
+def report_path_of(quantized_path):
+	"""Where the accuracy report of quantized weights is written"""
+	return quantized_path[:-len(".npz")] + ".report.json"
+
+def report_passes(quantized_path, min_agreement=MIN_AGREEMENT, max_accuracy_drop=MAX_ACCURACY_DROP):
+	"""Whether quantized weights have an accuracy report, written after
+	them, in which they agree with the float model on at least
+	min_agreement of the thoughts and lose at most max_accuracy_drop
+	accuracy"""
+
+	report_path = report_path_of(quantized_path)
+
+	try:
+		if os.stat(report_path).st_mtime_ns < os.stat(quantized_path).st_mtime_ns:
+			return False
+		report = load_json(report_path)
+	except (OSError, ValueError):
+		return False
+
+	if report.get("agreement") is None or report["agreement"] < min_agreement:
+		return False
+
+	if report.get("float_accuracy") is not None and report.get("quantized_accuracy") is not None:
+		return report["quantized_accuracy"] >= report["float_accuracy"] - max_accuracy_drop
+
+	return True
+
+def quantize(folded, mode):
+	"""Quantize the weights of folded, as returned by
+	export_cnn.fold_batch_norm. Biases and speaker embeddings are
+	small and stay float32."""
+
+	if mode not in MODES:
+		raise ValueError("Unknown quantization: {0}".format(mode))
+
+	quantized = {"quantization": np.array(mode)}
+
+	for name, values in folded.items():
+
+		if not name.endswith("_weights"):
+			quantized[name] = values
+		elif mode == "float16":
+			quantized[name] = values.astype(np.float16)
+		else:
+			# Symmetric, one scale per output channel
+			axes = tuple(range(values.ndim - 1))
+			scale = np.max(np.abs(values), axis=axes) / 127
+			scale[scale == 0] = 1
+			quantized[name] = np.clip(np.rint(values / scale), -127, 127).astype(np.int8)
+			quantized[name + "_scale"] = scale.astype(np.float32)
+
+	return quantized
+
+def save_quantized(path, quantized):
+	"""Write quantized weights to an npz file"""
+	with open(path, "wb") as output:
+		np.savez(output, **quantized)
+
+def load_quantized(path):
+	"""Read weights written by save_quantized"""
+	with np.load(path) as arrays:
+		return {name: arrays[name] for name in arrays.files}
+
+def weight_bytes(arrays):
+	"""Bytes taken by the arrays of a model"""
+	return sum(values.nbytes for values in arrays.values())
+
+def predict(arrays, thoughts, alphabet, batch_size=128):
+	"""Class probabilities of thoughts under the given weights,
+	computed by the NumPy engine that serves them"""
+
+	from mind.numpy_cnn import NumpyCNN
+
+	cnn = NumpyCNN(arrays)
+	encoder = get_char_encoder(alphabet, cnn.doc_length)
+	outputs = []
+
+	for start in range(0, len(thoughts), batch_size):
+		batch = thoughts[start:start + batch_size]
+		outputs.append(np.exp(cnn.forward(encoder.encode_indices(batch))))
+
+	if not outputs:
+		return np.zeros((0, len(cnn.fcs[-1][2])), dtype=np.float32)
+
+	return np.concatenate(outputs)
+
+def accuracy_report(model_path, quantized_path, test_path, label_map, doc_key="Thought", label_key="Type"):
+	"""Compare the float and quantized models on a labeled CSV"""
+
+	config = load_json(CONFIG_PATH)
+	float_arrays = fold_batch_norm(read_checkpoint(model_path))
+	quantized = load_quantized(quantized_path)
+
+	df = load_columnar(test_path, columns=[doc_key, label_key])
+	thoughts = df[doc_key].astype(str).tolist()
+	reversed_map = {str(label): int(index) for index, label in label_map.items()}
+	truth = np.array([reversed_map.get(str(label), -1) for label in df[label_key]])
+	labeled = truth >= 0
+
+	float_probabilities = predict(float_arrays, thoughts, config["alphabet"])
+	quantized_probabilities = predict(quantized, thoughts, config["alphabet"])
+	float_predictions = np.argmax(float_probabilities, 1)
+	quantized_predictions = np.argmax(quantized_probabilities, 1)
+	difference = np.abs(float_probabilities - quantized_probabilities)
+
+	return {
+		"model": model_path,
+		"quantization": str(quantized["quantization"]),
+		"thoughts": len(thoughts),
+		"labeled": int(np.sum(labeled)),
+		"float_accuracy": float(np.mean(float_predictions[labeled] == truth[labeled])) if labeled.any() else None,
+		"quantized_accuracy": float(np.mean(quantized_predictions[labeled] == truth[labeled])) if labeled.any() else None,
+		"agreement": float(np.mean(float_predictions == quantized_predictions)) if thoughts else None,
+		"max_probability_difference": float(np.max(difference)) if thoughts else None,
+		"mean_probability_difference": float(np.mean(difference)) if thoughts else None,
+		"float_bytes": weight_bytes(float_arrays),
+		"quantized_bytes": weight_bytes(quantized)
+	}
+
+def parse_arguments(args):
+	"""Parse command line arguments"""
+
+	parser = argparse.ArgumentParser(description="Quantize the weights of a trained CNN")
+	parser.add_argument("model_path", help="checkpoint such as models/thought_type.ckpt")
+	parser.add_argument("--mode", default="int8", choices=MODES, help="storage type of the weights")
+	parser.add_argument("--test", default=None, help="held-out CSV to compare the float and quantized models on")
+	parser.add_argument("--label_map", default=None, help="label map path, the model's own by default")
+	parser.add_argument("--label_key", default="Type", help="header of the ground truth label column")
+	parser.add_argument("--doc_key", default="Thought", help="header of the thought column")
+
+	return parser.parse_args(args)
+
+def main():
+	"""Run module from command line"""
+
+	from mind.load_model import CNN_MODELS
+
+	logging.basicConfig(level=logging.INFO)
+	args = parse_arguments(sys.argv[1:])
+
+	folded = fold_batch_norm(read_checkpoint(args.model_path))
+	quantized = quantize(folded, args.mode)
+	output_path = quantized_path_of(args.model_path, args.mode)
+	save_quantized(output_path, quantized)
+	logging.info("Wrote {0}: {1:.0f}MB of weights, {2:.0f}MB as float32".format(output_path, weight_bytes(quantized) / 2 ** 20, weight_bytes(folded) / 2 ** 20))
+
+	if args.test is None:
+		return
+
+	if args.label_map is not None:
+		label_map = load_json(args.label_map)
+	else:
+		label_map = {path: labels for path, labels in CNN_MODELS.values()}.get(args.model_path) or load_json(CONFIG_PATH)["label_map"]
+
+	report = accuracy_report(args.model_path, output_path, args.test, label_map, doc_key=args.doc_key, label_key=args.label_key)
+	logging.info("Quantization report:\n{0}".format(pprint.pformat(report)))
+
+	with open(report_path_of(output_path), "w") as report_file:
+		json.dump(report, report_file, indent=4)
+
+	if report_passes(output_path):
+		logging.info("The report passes, so model_quantization=auto serves these weights")
+	else:
+		logging.info("The report does not pass, so model_quantization=auto keeps the float32 weights")
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,161 @@
+#!/usr/local/bin/python3
+
+"""This module memoizes tokenization of thoughts by content and
+tokenizer, in memory and optionally in a sqlite store shared by
+later runs
+
+Created on Oct 18, 2026
+@author: Matthew Sevrens
+"""
+
+#################### USAGE ##########################
+
+# from mind import tokens
+# tokens.tokenize("Hello #gameb world", "tweet")
+# tokens.get_token_cache("alnum", path="data/token_cache.sqlite").tokenize(thought)
+
+#####################################################
+
+import atexit
+import functools
+import hashlib
+import json
+import os
+import re
+import sqlite3
+
+# Bump a version whenever its tokenizer's output changes so
+# persisted token lists are never reused across versions
+TOKENIZERS = {
+	"tweet": "nltk-tweet-v1",
+	"alnum": "alnum-lower-v1"
+}
+
+NON_ALPHANUMERIC = re.compile('[^A-Za-z0-9]+')
+
+def make_tokenizer(name):
+	"""Return the uncached tokenize function called name"""
+
+	if name == "tweet":
+		from nltk.tokenize import TweetTokenizer
+		return TweetTokenizer().tokenize
+
+	if name == "alnum":
+		return lambda text: NON_ALPHANUMERIC.sub(' ', text).lower().split()
+
+	raise ValueError("Unknown tokenizer: {0}".format(name))
+
+class TokenCache(object):
+	"""Least recently used cache of token tuples for one tokenizer,
+	backed by an optional sqlite store keyed by a hash of the
+	tokenizer version and the text"""
+
+	def __init__(self, name, max_entries=200000, path=None, batch_size=1000):
+		self.name = name
+		self.version = TOKENIZERS[name]
+		self.path = path
+		self.batch_size = batch_size
+		self.base_tokenize = make_tokenizer(name)
+		self.tokenize = functools.lru_cache(maxsize=max_entries)(self.lookup)
+		self.connection = None
+		self.pid = None
+		self.unsaved = []
+		self.store_hits = 0
+
+	def key(self, text):
+		"""Content hash of text under this tokenizer version"""
+
+		digest = hashlib.sha1(self.version.encode("utf-8"))
+		digest.update(text.encode("utf-8", errors="surrogatepass"))
+
+		return digest.digest()
+
+	def lookup(self, text):
+		"""Tokenize text on a memory miss, reading and filling the store"""
+
+		if self.path is None:
+			return tuple(self.base_tokenize(text))
+
+		key = self.key(text)
+		row = self.store().execute("SELECT tokens FROM tokens WHERE key = ?", (key,)).fetchone()
+
+		if row is not None:
+			self.store_hits += 1
+			return tuple(json.loads(row[0]))
+
+		tokens = tuple(self.base_tokenize(text))
+		self.unsaved.append((key, json.dumps(tokens)))
+
+		if len(self.unsaved) >= self.batch_size:
+			self.flush()
+
+		return tokens
+
+	def store(self):
+		"""Open the sqlite store, once per process"""
+
+		if self.connection is None or self.pid != os.getpid():
+			directory = os.path.dirname(self.path)
+			if directory:
+				os.makedirs(directory, exist_ok=True)
+			self.connection = sqlite3.connect(self.path, timeout=30)
+			self.connection.execute("CREATE TABLE IF NOT EXISTS tokens (key BLOB PRIMARY KEY, tokens TEXT)")
+			self.pid = os.getpid()
+			self.unsaved = []
+
+		return self.connection
+
+	def flush(self):
+		"""Write newly tokenized texts to the store"""
+
+		if not self.unsaved:
+			return
+
+		with self.store() as connection:
+			connection.executemany("INSERT OR IGNORE INTO tokens VALUES (?, ?)", self.unsaved)
+
+		self.unsaved = []
+
+	def stats(self):
+		"""Counters for sizing the cache"""
+
+		info = self.tokenize.cache_info()
+
+		return {
+			"tokenizer": self.version,
+			"hits": info.hits,
+			"store_hits": self.store_hits,
+			"misses": info.misses - self.store_hits,
+			"entries": info.currsize,
+			"max_entries": info.maxsize
+		}
+
+_caches = {}
+
+def get_token_cache(name, path=None):
+	"""Return this process's cache for tokenizer name, attaching a
+	persistent store at path if one is given"""
+
+	if name not in _caches:
+		_caches[name] = TokenCache(name, path=path)
+	elif path is not None and _caches[name].path is None:
+		_caches[name].path = path
+		_caches[name].tokenize.cache_clear()
+
+	return _caches[name]
+
+def tokenize(text, name="tweet"):
+	"""Return the tokens of text as a tuple, memoized"""
+	return get_token_cache(name).tokenize(text)
+
+@atexit.register
+def flush_all():
+	"""Save unsaved token lists of every cache of this process. Runs
+	on exit, and should be called at the end of each task run in a
+	process pool, whose processes exit without running atexit."""
+	for cache in _caches.values():
+		if cache.path is not None and cache.pid == os.getpid():
+			cache.flush()
+
+if __name__ == "__main__":
+	print("This module is a library that contains useful functions; it should not be run from the console.")
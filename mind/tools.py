@@ -8,15 +8,20 @@ Created on Jan 21, 2015
 """
 
 import csv
+import gzip
+import hashlib
 import json
+import logging
+import mmap
 import os
+import re
 import sys
+import time
 
 import pandas as pd
 import numpy as np
 
-from nltk.tokenize import TweetTokenizer
-from sklearn.feature_extraction.text import CountVectorizer
+PAGE_SIZE = mmap.PAGESIZE
 
 def load_dict_list(file_name, encoding='utf-8', delimiter=","):
 	"""Loads a dictionary of input from a file into a list."""
@@ -26,6 +31,121 @@ def load_dict_list(file_name, encoding='utf-8', delimiter=","):
 		
 	return dict_list
 
+class Record(dict):
+	"""Base of the row types built by make_record_type. A record is
+	the dict load_dict_list would have built, so it serializes and
+	compares like one, with the column order shared by every row of a
+	type so it can also be read and updated by position and rebuilt
+	in other processes."""
+
+	__slots__ = ()
+	_fields = ()
+
+	@classmethod
+	def from_values(cls, values):
+		"""Build a record from one value per field, in field order"""
+		return cls(zip(cls._fields, values))
+
+	def __getitem__(self, key):
+		if isinstance(key, (int, slice)):
+			return list(self.values())[key]
+		return dict.__getitem__(self, key)
+
+	def __setitem__(self, key, value):
+		if isinstance(key, int):
+			key = self._fields[key]
+		dict.__setitem__(self, key, value)
+
+	def __reduce__(self):
+		# Record types are built at runtime, so pickles name the fields
+		return (rebuild_record, (type(self).__name__, self._fields, tuple(self.values())))
+
+	def to_dict(self):
+		"""Convert to a plain dict"""
+		return dict(self)
+
+	def __repr__(self):
+		return "{0}({1})".format(type(self).__name__, dict.__repr__(self))
+
+_record_types = {}
+
+def make_record_type(fields, extra=(), name="Thought"):
+	"""Return the Record subclass for rows with the given columns, plus
+	extra fields such as mood that start out empty"""
+
+	fields = list(fields) + [field for field in extra if field not in fields]
+	fields = tuple(dict.fromkeys(fields))
+
+	if (name, fields) not in _record_types:
+		_record_types[(name, fields)] = type(name, (Record,), {"__slots__": (), "_fields": fields})
+
+	return _record_types[(name, fields)]
+
+def rebuild_record(name, fields, values):
+	"""Unpickle a record, sharing its type with records read here"""
+	return make_record_type(fields, name=name).from_values(values)
+
+def stream_thoughts(file_name, chunk_size=None, extra=(), delimiter=",", materialize=False):
+	"""Read a CSV into records without holding the whole file.
+
+	Yields one record at a time, or lists of up to chunk_size records.
+	With materialize=True a list of every record is returned instead,
+	for callers that need random access."""
+
+	records = iter_records(file_name, extra=extra, delimiter=delimiter)
+
+	if materialize:
+		return list(records)
+
+	if chunk_size:
+		return iter_chunks(records, chunk_size)
+
+	return records
+
+def iter_records(file_name, extra=(), delimiter=","):
+	"""Yield one record per CSV row"""
+
+	with open(file_name, 'r', encoding="utf-8", errors='replace', newline='') as input_file:
+
+		reader = csv.reader(input_file, delimiter=delimiter)
+		header = next(reader, None)
+
+		if header is None:
+			return
+
+		record_type = make_record_type(header, extra=extra)
+		width = len(header)
+		names = header + [field for field in extra if field not in header]
+		padding = [""] * (len(names) - width)
+
+		# Repeated values such as seers and types share one string
+		interned = [i for i, field in enumerate(header) if field in CATEGORICAL_COLUMNS]
+
+		for row in reader:
+			if not row:
+				continue
+			# Short rows are padded with None as csv.DictReader does
+			if len(row) != width:
+				row = row[:width] + [None] * (width - len(row))
+			for i in interned:
+				if row[i] is not None:
+					row[i] = sys.intern(row[i])
+			yield record_type(zip(names, row + padding))
+
+def iter_chunks(iterable, chunk_size):
+	"""Group an iterable into lists of at most chunk_size items"""
+
+	chunk = []
+
+	for item in iterable:
+		chunk.append(item)
+		if len(chunk) == chunk_size:
+			yield chunk
+			chunk = []
+
+	if chunk:
+		yield chunk
+
 def to_stdout(string, errors="replace"):
 	"""Converts a string to stdout compatible encoding"""
 
@@ -38,6 +158,60 @@ def dict_2_json(obj, filename):
 	with open(filename, 'w') as fp:
 		json.dump(obj, fp, indent=4)
 
+def precompress(filename):
+	"""Write gzip and, if brotli is installed, brotli copies of a file
+	next to it so they can be served without compressing per request"""
+
+	with open(filename, 'rb') as source:
+		content = source.read()
+
+	# mtime=0 keeps the gzip output identical between runs
+	with open(filename + ".gz", 'wb') as fp:
+		fp.write(gzip.compress(content, compresslevel=9, mtime=0))
+
+	written = [filename + ".gz"]
+
+	try:
+		import brotli
+	except ImportError:
+		return written
+
+	with open(filename + ".br", 'wb') as fp:
+		fp.write(brotli.compress(content, mode=brotli.MODE_TEXT))
+
+	written.append(filename + ".br")
+
+	return written
+
+def precompress_dir(directory, extensions=(".json",)):
+	"""Precompress every artifact under directory whose compressed
+	copies are missing or older than it, returning the written paths"""
+
+	try:
+		import brotli
+		suffixes = [".gz", ".br"]
+	except ImportError:
+		suffixes = [".gz"]
+
+	written = []
+
+	for root, _, names in os.walk(directory):
+		for name in sorted(names):
+
+			if not name.endswith(extensions):
+				continue
+
+			filename = os.path.join(root, name)
+			modified = os.stat(filename).st_mtime_ns
+			variants = [filename + suffix for suffix in suffixes]
+
+			if all(os.path.exists(v) and os.stat(v).st_mtime_ns >= modified for v in variants):
+				continue
+
+			written += precompress(filename)
+
+	return written
+
 def safe_print(*objs, errors="replace"):
 	"""Print without unicode errors"""
 	print(*(to_stdout(str(o), errors) for o in objs))
@@ -53,13 +227,151 @@ def safe_input(prompt=""):
 	except:
 		return ""
 
-def progress(i, my_list, message=""):
-	"""Display progress percent in a loop"""
-	my_progress = (i / len(my_list)) * 100
-	my_progress = str(round(my_progress, 1)) + "% " + message
-	sys.stdout.write('\r')
-	sys.stdout.write(my_progress)
-	sys.stdout.flush()
+def current_rss(pid="self"):
+	"""Resident memory of a process, this one by default, in bytes,
+	or None where /proc is unavailable"""
+
+	try:
+		with open("/proc/{0}/statm".format(pid)) as statm:
+			return int(statm.read().split()[1]) * PAGE_SIZE
+	except (OSError, ValueError, IndexError):
+		return None
+
+def format_duration(seconds):
+	"""Format seconds as 3d04h, 2h05m, 4m09s or 12.5s"""
+
+	if seconds < 60:
+		return "{0:.1f}s".format(seconds)
+
+	minutes, seconds = divmod(int(seconds), 60)
+	hours, minutes = divmod(minutes, 60)
+	days, hours = divmod(hours, 24)
+
+	if days:
+		return "{0}d{1:02d}h".format(days, hours)
+	if hours:
+		return "{0}h{1:02d}m".format(hours, minutes)
+
+	return "{0}m{1:02d}s".format(minutes, seconds)
+
+class ProgressReporter(object):
+	"""Reports the throughput of a long running loop.
+
+	Call update once per step with the items (such as batches) and
+	examples it processed and any values worth following, such as
+	the loss. At most once every interval seconds a line with rates,
+	ETA, moving average step time and resident memory is logged and,
+	given log_path, appended to that file as a JSON record. Between
+	reports update only adds to counters."""
+
+	def __init__(self, name, total=None, interval=30, log_path=None, smoothing=0.98):
+		self.name = name
+		self.total = total
+		self.interval = interval
+		self.smoothing = smoothing
+		self.log_file = open(log_path, "a") if log_path else None
+		self.start = self.last_step = self.last_report = time.perf_counter()
+		self.items = self.examples = 0
+		self.reported_items = self.reported_examples = 0
+		self.step_time = None
+		self.values = {}
+
+	def update(self, items=1, examples=0, **values):
+		"""Count one step, returning True if it was reported"""
+
+		now = time.perf_counter()
+		elapsed = now - self.last_step
+		self.last_step = now
+
+		if self.step_time is None:
+			self.step_time = elapsed
+		else:
+			self.step_time = self.smoothing * self.step_time + (1 - self.smoothing) * elapsed
+
+		self.items += items
+		self.examples += examples
+
+		if values:
+			self.values.update(values)
+
+		if now - self.last_report < self.interval:
+			return False
+
+		self.report(now)
+
+		return True
+
+	def report(self, now=None):
+		"""Log progress since the previous report and return its record"""
+
+		now = time.perf_counter() if now is None else now
+		window = max(now - self.last_report, 1e-9)
+		items_per_sec = (self.items - self.reported_items) / window
+		examples_per_sec = (self.examples - self.reported_examples) / window
+		rss = current_rss()
+
+		record = {
+			"name": self.name,
+			"time": time.time(),
+			"elapsed": now - self.start,
+			"items": self.items,
+			"examples": self.examples,
+			"items_per_sec": items_per_sec,
+			"examples_per_sec": examples_per_sec,
+			"step_time": self.step_time,
+			"eta": None,
+			"rss": rss
+		}
+
+		message = "{0}: {1} items".format(self.name, self.items)
+
+		if self.total:
+			message = "{0}: {1}/{2} items ({3:.1f}%)".format(self.name, self.items, self.total, self.items / self.total * 100)
+			if items_per_sec > 0:
+				record["eta"] = max(self.total - self.items, 0) / items_per_sec
+
+		message += ", {0:.3g} items/s".format(items_per_sec)
+
+		if self.examples:
+			message += ", {0:.4g} examples/s".format(examples_per_sec)
+		if self.step_time is not None:
+			message += ", step {0:.1f}ms".format(self.step_time * 1000)
+		if record["eta"] is not None:
+			message += ", ETA " + format_duration(record["eta"])
+		if rss is not None:
+			message += ", RSS {0:.0f}MB".format(rss / 2 ** 20)
+
+		for key, value in self.values.items():
+			message += ", {0} {1:.4g}".format(key, value) if isinstance(value, (float, np.floating)) else ", {0} {1}".format(key, value)
+			record[key] = value
+
+		logging.info(message)
+
+		if self.log_file is not None:
+			self.log_file.write(json.dumps(record, default=float) + "\n")
+			self.log_file.flush()
+
+		self.last_report = now
+		self.reported_items = self.items
+		self.reported_examples = self.examples
+
+		return record
+
+	def close(self):
+		"""Report the final counts and close the JSON lines file"""
+
+		if self.items != self.reported_items:
+			self.report()
+
+		if self.log_file is not None:
+			self.log_file.close()
+			self.log_file = None
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc_info):
+		self.close()
 
 def safely_remove_file(filename):
 	"""Safely removes a file"""
@@ -87,8 +399,10 @@ def load_json(filename_or_dict):
 		return json_dict
 	return filename_or_dict
 
-def load_dataframe(filename, chunksize=None, usecols=False, sep="|", quoting=None):
-	"""Load dataframe from file name"""
+def load_dataframe(filename, chunksize=None, usecols=False, sep="|", quoting=None, workers=None):
+	"""Load dataframe from file name. With more than one worker the
+	file is parsed in parallel, and chunksize instead asks for an
+	iterator of chunks that each cover a byte range of the file."""
 
 	options = {
 		"quoting": quoting if quoting else csv.QUOTE_NONE,
@@ -108,57 +422,315 @@ def load_dataframe(filename, chunksize=None, usecols=False, sep="|", quoting=Non
 
 	options["dtype"] = {c: "object" for c in columns}
 
+	if workers is not None and workers > 1:
+		options["dtype"] = "object"
+		return read_csv_parallel(filename, workers=workers, iterator=isinstance(chunksize, int), **options)
+
 	if isinstance(chunksize, int):
 		options["chunksize"] = chunksize
 
 	return pd.read_csv(filename, **options)
+
+def count_quotes(mapping, start, end, block_size=1 << 24):
+	"""Count quote characters in a byte range without copying it whole"""
+
+	count = 0
+
+	for offset in range(start, end, block_size):
+		count += mapping[offset:min(offset + block_size, end)].count(b'"')
+
+	return count
+
+def find_record_boundaries(filename, num_ranges, quoting=csv.QUOTE_MINIMAL):
+	"""Split the records after a CSV's header into about num_ranges
+	byte ranges, each starting at the beginning of a record.
+
+	Quoted fields may contain newlines, so unless quoting is QUOTE_NONE
+	a newline only ends a record when an even number of quotes precede
+	it. Escaped quotes are doubled and so never change that parity."""
+
+	size = os.path.getsize(filename)
+
+	if size == 0:
+		return []
+
+	with open(filename, "rb") as reader:
+
+		mapping = mmap.mmap(reader.fileno(), 0, access=mmap.ACCESS_READ)
+		quoted = quoting != csv.QUOTE_NONE
+
+		try:
+			boundaries, position, quotes = [], 0, 0
+
+			# The header is the first range boundary
+			targets = [0] + [size * i // num_ranges for i in range(1, num_ranges)]
+
+			for target in targets:
+
+				target = max(target, position)
+				if quoted:
+					quotes += count_quotes(mapping, position, target)
+				position = target
+
+				while True:
+					newline = mapping.find(b"\n", position)
+					if newline == -1:
+						position = size
+						break
+					if quoted:
+						quotes += count_quotes(mapping, position, newline)
+					position = newline + 1
+					if not quoted or quotes % 2 == 0:
+						break
+
+				if position >= size:
+					break
+				if not boundaries or position > boundaries[-1]:
+					boundaries.append(position)
+
+		finally:
+			mapping.close()
+
+	return [(start, end) for start, end in zip(boundaries, boundaries[1:] + [size])]
+
+def read_csv_range(filename, start, end, names, options):
+	"""Parse the records in one byte range of a CSV"""
+
+	import io
+
+	with open(filename, "rb") as reader:
+		reader.seek(start)
+		data = reader.read(end - start)
+
+	return pd.read_csv(io.BytesIO(data), header=None, names=names, **options)
+
+def read_csv_parallel(filename, workers=None, iterator=False, num_ranges=None, **options):
+	"""Parse a CSV on a process pool, one byte range per task.
+
+	Returns one DataFrame, or with iterator=True a generator of
+	DataFrames in file order. options are passed to pd.read_csv."""
+
+	from concurrent.futures import ProcessPoolExecutor
+
+	workers = workers or os.cpu_count()
+	header_options = {k: v for k, v in options.items() if k != "usecols"}
+	names = list(pd.read_csv(filename, nrows=0, **header_options).columns)
+	ranges = find_record_boundaries(filename, num_ranges or workers * 4, options.get("quoting", csv.QUOTE_MINIMAL))
+
+	def chunks():
+		with ProcessPoolExecutor(max_workers=workers) as executor:
+
+			# Keep a bounded window of ranges in flight so iterating
+			# over a huge file never holds all of it in memory
+			pending = []
+			for start, end in ranges:
+				pending.append(executor.submit(read_csv_range, filename, start, end, names, options))
+				if len(pending) > workers * 2:
+					yield pending.pop(0).result()
+			for future in pending:
+				yield future.result()
+
+	if iterator:
+		return chunks()
+
+	frames = list(chunks())
+
+	if not frames:
+		return pd.read_csv(filename, **options)
+
+	return pd.concat(frames, ignore_index=True)
 	
-def get_write_func(filename, header):
-	
-	file_exists = os.path.isfile(filename)
-	
-	def write_func(data):
-		if len(data) > 0:
-			nonlocal file_exists
-			mode = "a" if file_exists else "w"
-			add_head = False if file_exists else header
-			df = pd.DataFrame(data)
-			df.to_csv(filename, mode=mode, index=False, header=add_head)
-			file_exists = True
+# Typed columns of Prophet thought exports, converted when present
+CATEGORICAL_COLUMNS = ["Seer", "Type", "Privacy"]
+DATE_COLUMNS = {"Post date": "%m/%d/%y %I:%M %p"}
+
+# Versions of a CSV written by load_columnar, never its temporary files
+COLUMNAR_NAME = re.compile(r"^[0-9a-f]{16}\.(parquet|pkl)$")
+
+def columnar_format():
+	"""Parquet if pyarrow is installed, otherwise pickle"""
+
+	try:
+		import pyarrow
+	except ImportError:
+		return "pickle"
+
+	return "parquet"
+
+def columnar_cache_path(filename, cache_dir=None):
+	"""Path of the columnar copy of a CSV. Each CSV has its own
+	directory, named after its absolute path, holding copies keyed by
+	its size and modification time"""
+
+	filename = os.path.abspath(filename)
+	stat = os.stat(filename)
+	source = hashlib.sha1(filename.encode("utf-8")).hexdigest()[:8]
+	version = hashlib.sha1("{0}:{1}".format(stat.st_size, stat.st_mtime_ns).encode("utf-8")).hexdigest()[:16]
+	cache_dir = cache_dir or os.path.join(os.path.dirname(filename), ".columnar")
+	extension = ".parquet" if columnar_format() == "parquet" else ".pkl"
+
+	return os.path.join(cache_dir, os.path.basename(filename) + "." + source, version + extension)
+
+def type_columns(df):
+	"""Convert known thought columns to compact types"""
+
+	for column in CATEGORICAL_COLUMNS:
+		if column in df:
+			df[column] = df[column].astype("category")
+
+	for column, date_format in DATE_COLUMNS.items():
+		if column in df:
+			df[column] = pd.to_datetime(df[column], format=date_format, errors="coerce")
+
+	return df
+
+def remove_stale_columnar(cache_path):
+	"""Delete cached copies of earlier versions of the same CSV,
+	which share the directory of cache_path with nothing else"""
+
+	directory, name = os.path.split(cache_path)
+
+	for other in os.listdir(directory):
+		if other != name and COLUMNAR_NAME.match(other):
+			os.remove(os.path.join(directory, other))
+
+def load_columnar(filename, columns=None, seers=None, cache_dir=None, workers=None):
+	"""Load a thoughts CSV through a typed columnar cache, parsing the
+	CSV only when it has changed since the cache was written. Only
+	the given columns and the thoughts of the given seers are loaded.
+	With more than one worker the CSV is parsed in parallel."""
+
+	cache_path = columnar_cache_path(filename, cache_dir=cache_dir)
+
+	if not os.path.exists(cache_path):
+		options = {"na_filter": False, "encoding": "utf-8", "error_bad_lines": False, "dtype": object}
+		if workers is not None and workers > 1:
+			df = read_csv_parallel(filename, workers=workers, **options)
 		else:
-			open(filename, 'a').close()
-	
-	return write_func
+			df = pd.read_csv(filename, **options)
+		df = type_columns(df)
+		os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+		temp_path = cache_path + ".tmp{0}".format(os.getpid())
+		if cache_path.endswith(".parquet"):
+			df.to_parquet(temp_path, index=False)
+		else:
+			df.to_pickle(temp_path)
+		os.replace(temp_path, cache_path)
+		remove_stale_columnar(cache_path)
+
+	if cache_path.endswith(".parquet"):
+		# Projection and seer filtering happen while reading
+		filters = [("Seer", "in", list(seers))] if seers is not None else None
+		df = pd.read_parquet(cache_path, columns=columns, filters=filters)
+	else:
+		df = pd.read_pickle(cache_path)
+		if seers is not None:
+			df = df[df["Seer"].isin(seers)]
+		if columns is not None:
+			df = df[columns]
 
-def vectorize(corpus, min_df=1):
-	"""Vectorize text corpus"""
+	if seers is not None and "Seer" in df:
+		df["Seer"] = df["Seer"].cat.remove_unused_categories()
 
-	tknzr = TweetTokenizer().tokenize
+	return df.reset_index(drop=True)
 
-	def tokenizer(thought):
-		output = tknzr(thought)
-		output = [o for o in output if len(o) > 1]
-		return output
+class CSVWriter(object):
+	"""Buffers rows and appends them to a CSV on a background thread.
 
-	vectorizer = CountVectorizer(min_df=min_df, tokenizer=tokenizer, ngram_range=(1, 1), stop_words='english')
-	count_vector = vectorizer.fit_transform(corpus).toarray()
-	num_samples, num_features = count_vector.shape
-	vocab = vectorizer.get_feature_names()
+	Each batch of rows is written exactly as pd.DataFrame(rows).to_csv
+	would, with the header only written when the file did not exist.
+	Use as a context manager, or call close, to write the last rows."""
 
-	wc = word_count(vocab, count_vector, num_samples)
+	def __init__(self, filename, header, max_rows=10000, max_bytes=1 << 23, max_pending=2):
+		from concurrent.futures import ThreadPoolExecutor
 
-	return wc
+		self.filename = filename
+		self.header = header
+		self.max_rows = max_rows
+		self.max_bytes = max_bytes
+		self.max_pending = max_pending
+		self.write_header = not os.path.isfile(filename)
+		self.handle = open(filename, "a", encoding="utf-8", newline="")
+		self.executor = ThreadPoolExecutor(max_workers=1)
+		self.pending = []
+		self.batches = []
+		self.buffered_rows = 0
+		self.buffered_bytes = 0
 
-def word_count(vocab, count_vector, num_samples):
-	"""Count words"""
+	def __call__(self, rows):
+		"""Buffer rows, handing them to the writer thread once
+		either threshold is reached"""
 
-	np.clip(count_vector, 0, 1, out=count_vector)
-	dist = np.sum(count_vector, axis=0)
-	dist = dist.tolist()
+		if len(rows) == 0:
+			return
+
+		# Copied since callers may keep appending to the same list
+		self.batches.append(list(rows))
+		self.buffered_rows += len(rows)
+		self.buffered_bytes += sum(len(repr(row)) for row in rows)
+
+		if self.buffered_rows >= self.max_rows or self.buffered_bytes >= self.max_bytes:
+			self.flush()
+
+	def flush(self):
+		"""Hand the buffered rows to the writer thread"""
+
+		self.check_pending()
+
+		if len(self.batches) == 0:
+			return
+
+		self.pending.append(self.executor.submit(self.write_batches, self.batches))
+		self.batches = []
+		self.buffered_rows = 0
+		self.buffered_bytes = 0
+
+		# Stall the caller rather than buffer without limit
+		while len(self.pending) > self.max_pending:
+			self.pending.pop(0).result()
+
+	def write_batches(self, batches):
+		"""Serialize batches on the writer thread, one frame per batch
+		so column types are inferred as they were per call"""
+
+		for rows in batches:
+			header = self.header if self.write_header else False
+			pd.DataFrame(rows).to_csv(self.handle, index=False, header=header)
+			self.write_header = False
+
+		self.handle.flush()
+
+	def check_pending(self):
+		"""Raise the error of any finished write that failed"""
+
+		while self.pending and self.pending[0].done():
+			self.pending.pop(0).result()
+
+	def close(self):
+		"""Write every buffered row and close the file"""
+
+		try:
+			self.flush()
+			for future in self.pending:
+				future.result()
+		finally:
+			self.pending = []
+			self.executor.shutdown(wait=True)
+			self.handle.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc_info):
+		self.close()
+
+def vectorize(corpus, min_df=1):
+	"""Count the thoughts of a corpus containing each word of at
+	least two characters, excluding english stop words"""
 
-	wc = dict(zip(vocab, dist))
+	from mind.word_count import WordCounter
 
-	return wc
+	return WordCounter(min_length=2).count(corpus, min_df=min_df)
 
 def get_tensor(graph, name):
 	"""Get tensor by name"""
@@ -29,7 +29,7 @@ import tensorflow as tf
 
 from mind.mind_models import TruthModel
 from mind.data_loaders import PretrainData
-from mind.tools import load_dict_list, load_json
+from mind.tools import load_dict_list, load_json, ProgressReporter
 
 # Utility
 logging.basicConfig(level=logging.INFO)
@@ -109,17 +109,17 @@ def pretrain_prophet(config):
 
 	# Restore previous checkpoint if existing
 	if last_saved_model_path:
-		print("Restoring Model")
+		logging.info("Restoring model from {0}".format(last_saved_model_path))
 		saver.restore(sess, last_saved_model_path)
 
+	# Report Throughput
+	batches_per_epoch = max(len(buckets[key]) - 1, 0) // batch_size
+	reporter = ProgressReporter("pretrain", total=(epochs - 1) * batches_per_epoch, log_path=config["options"].get("progress_log"))
+
 	# Train Model
 	for i in range(1, epochs):
 
-		cnt = 0
-		cnt += 1
-		
-		print(("Key", cnt, key))
-
+		cnt = 1
 		batch_no = 0
 
 		# Training Step
@@ -152,18 +152,21 @@ def pretrain_prophet(config):
 			# Write to Summary
 			train_writer.add_summary(summary, step)
 
-			print("\n")
-
-			print(("Loss", total_loss, r_loss, kl_loss, real_kl_loss, step, len(buckets[key]), i, cnt, key))
-			
-			# Print Results to Terminal
-			print("******")
-			print(("Source ", thought_stream.char_indices_to_string(source[0], source_vocab)))
-			print("---------")
-			print(("Target ", thought_stream.word_indices_to_string(target[0], target_vocab)))
-			print("----------")
-			print(("Prediction ", thought_stream.word_indices_to_string(prediction[0:int(key)], target_vocab)))
-			print("******")
+			# Report Progress and Log Samples at the Same Cadence
+			reported = reporter.update(
+				examples=len(source),
+				loss=total_loss,
+				r_loss=r_loss,
+				kl_loss=kl_loss,
+				real_kl_loss=real_kl_loss,
+				kl_weight=kl_weight,
+				epoch=i
+			)
+
+			if reported:
+				logging.info("Source: {0}".format(thought_stream.char_indices_to_string(source[0], source_vocab)))
+				logging.info("Target: {0}".format(thought_stream.word_indices_to_string(target[0], target_vocab)))
+				logging.info("Prediction: {0}".format(thought_stream.word_indices_to_string(prediction[0:int(key)], target_vocab)))
 
 			batch_no += 1
 			global_step += batch_size
@@ -177,19 +180,15 @@ def pretrain_prophet(config):
 			kl_weight = 0 if kl_weight < 0 else kl_weight
 			kl_weight = 1 if kl_weight > 1 else kl_weight
 
-			print("\nKL Weight: " + str(kl_weight))
-
 			if step > 0 and step % 512 == 0:
 				feed_dict["phase:0"] = 0
 				new_thought = sess.run(tensors['prediction'], feed_dict=feed_dict)
-				print("----------")
-				print(("Generated Thought: ", thought_stream.word_indices_to_string(new_thought[0:int(key)], target_vocab)))
-				print("******")
+				logging.info("Generated thought: {0}".format(thought_stream.word_indices_to_string(new_thought[0:int(key)], target_vocab)))
 
 			if step % 8192 == 0:
-				print("Saving Model")
-				save_path = saver.save(sess, "models/model_pretrain_epoch_{}_{}.ckpt".format(i, cnt))
 				last_saved_model_path = "models/model_pretrain_epoch_{}_{}.ckpt".format(i, cnt)
+				logging.info("Saving model to {0}".format(last_saved_model_path))
+				save_path = saver.save(sess, last_saved_model_path)
 
 				# Summarize all Gradients
 				for grad, var in grad_vars:
@@ -197,9 +196,11 @@ def pretrain_prophet(config):
 						tf.summary.histogram('logs/' + var.name.replace(':', '_') + '/gradient', grad)
 
 		# Save Checkpoint
-		save_path = saver.save(sess, "models/model_pretrain_epoch_{}.ckpt".format(i))
 		last_saved_model_path = "models/model_pretrain_epoch_{}.ckpt".format(i)
+		logging.info("Saving model to {0}".format(last_saved_model_path))
+		save_path = saver.save(sess, last_saved_model_path)
 
+	reporter.close()
 	tf.reset_default_graph()
 	sess.close()
 
@@ -218,7 +219,7 @@ def count_parameters(t_vars):
 
 		total_parameters += variable_parameters
 
-	print("Trainable Parameters: " + str(total_parameters))
+	logging.info("Trainable parameters: " + str(total_parameters))
 
 def train_prophet(config):
 	"""Train a truth model"""
@@ -14,7 +14,6 @@ model further using Prophet data
 
 import os
 import sys
-import re
 import math
 import json
 import argparse
@@ -27,6 +26,9 @@ import pandas as pd
 from gensim.corpora import WikiCorpus
 from gensim.models.word2vec import Word2Vec, LineSentence, PathLineSentences
 
+from mind.tokens import get_token_cache
+from mind.tools import load_columnar
+
 logging.basicConfig(level=os.environ.get("LOGLEVEL", "INFO"))
 
 def parse_arguments(args):
@@ -63,12 +65,15 @@ def main():
 	# wiki = LineSentence("data/wiki_02.txt")
 
 	# Load Thoughts
-	prophet = pd.read_csv("data/thoughts.csv", na_filter=False, encoding="utf-8", error_bad_lines=False)
-	thoughts = [re.sub('[^A-Za-z0-9]+', ' ', t).lower().split() for t in list(prophet["Thought"])]
+	# Token lists persist between runs, so only new texts are tokenized
+	token_cache = get_token_cache("alnum", path="data/token_cache.sqlite")
+
+	prophet = load_columnar("data/thoughts.csv", columns=["Thought"], workers=multiprocessing.cpu_count())
+	thoughts = [list(token_cache.tokenize(t)) for t in list(prophet["Thought"])]
 
 	# Load Tweets
-	twitter = pd.read_csv("data/twitter_sensemaking_E.csv", na_filter=False, encoding="utf-8", error_bad_lines=False)
-	tweets = [re.sub('[^A-Za-z0-9]+', ' ', t).lower().split() for t in list(twitter["tweet"])]
+	twitter = load_columnar("data/twitter_sensemaking_E.csv", columns=["tweet"], workers=multiprocessing.cpu_count())
+	tweets = [list(token_cache.tokenize(t)) for t in list(twitter["tweet"])]
 
 	# Create Unique Tokens for Key Words
 	for thought in thoughts:
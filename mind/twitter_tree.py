@@ -24,7 +24,7 @@ import tweepy
 import gensim
 from gensim.models import word2vec
 
-from mind.tools import get_write_func, load_dataframe
+from mind.tools import CSVWriter, load_dataframe
 
 search_terms = ['#gameb', 'sensemaking', 'metamodernism', '"memetic mediator"', '"meaning crisis"', 'non-rivalrous', '#transitionb']
 
@@ -54,29 +54,29 @@ def twitter_tree(api):
 	user_ids = []
 	output = []
 
-	write_output = get_write_func(out_file, column_names)
+	with CSVWriter(out_file, column_names) as write_output:
 
-	# Get User IDs of accounts mentioning phrase or hashtag
-	output, user_id = search_for_terms(output, user_ids)
+		# Get User IDs of accounts mentioning phrase or hashtag
+		output, user_id = search_for_terms(output, user_ids)
 
-	# Save focus tweets
-	write_output(output)
+		# Save focus tweets
+		write_output(output)
 
-	# Select most vocal users
-	mention_count = count(user_ids).most_common() # Count Users
-	user_ids = list(set(user_ids)) # Get Unique Users
+		# Select most vocal users
+		mention_count = count(user_ids).most_common() # Count Users
+		user_ids = list(set(user_ids)) # Get Unique Users
 
-	# Get recent statuses from user IDs
-	for user_id in user_ids:
-		print("Getting contextual tweets from: " + user_id)
-		for tweet in tweepy.Cursor(api.user_timeline, id=user_id).items(25):
-			output.append([tweet.user.screen_name, tweet.text.encode("utf-8"), tweet.id_str, tweet.created_at])
+		# Get recent statuses from user IDs
+		for user_id in user_ids:
+			print("Getting contextual tweets from: " + user_id)
+			for tweet in tweepy.Cursor(api.user_timeline, id=user_id).items(25):
+				output.append([tweet.user.screen_name, tweet.text.encode("utf-8"), tweet.id_str, tweet.created_at])
 
-	# Get tweets containing key terms from known users
-	output = get_focus_tweets(user_ids, output)
+		# Get tweets containing key terms from known users
+		output = get_focus_tweets(user_ids, output)
 
-	# Save context tweets
-	write_output(output) 
+		# Save context tweets
+		write_output(output)
 
 	# Remove duplicates
 	consolidate_tweets(out_file)
@@ -148,7 +148,7 @@ def consolidate_tweets(filename):
 	file_exists = os.path.isfile(filename)
 
 	if file_exists:
-		df = load_dataframe(filename, sep=",", quoting=csv.QUOTE_ALL)
+		df = load_dataframe(filename, sep=",", quoting=csv.QUOTE_ALL, workers=os.cpu_count())
 
 	# Remove duplicates
 	print("Rows before consolidation: " + str(df.shape[0]))
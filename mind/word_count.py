@@ -0,0 +1,225 @@
+#!/usr/local/bin/python3
+
+"""This module counts in how many thoughts each word appears, for
+corpora of any size, through sparse thought by term matrices built
+one chunk of thoughts at a time
+
+Created on Oct 18, 2026
+@author: Matthew Sevrens
+"""
+
+#################### USAGE ##########################
+
+# from mind.word_count import WordCounter
+# counts = WordCounter(min_length=2).count(thoughts)
+# daily = WordCounter(min_length=3).count_by_group([day["thoughts"] for day in days])
+# WordCounter(vocabulary="models/ken_vocab.json").count(thoughts, chunk_size=50000, workers=4)
+
+#####################################################
+
+import hashlib
+import json
+import math
+import zlib
+from collections import Counter
+
+import numpy as np
+from scipy import sparse
+
+from mind.tokens import TOKENIZERS, flush_all, tokenize as tokens_of
+from mind.tools import iter_chunks, load_json
+
+class WordCounter(object):
+	"""Counts document frequencies of tweet tokens.
+
+	Thoughts are lowercased and tokenized through the shared token
+	cache, with nltk's TweetTokenizer by default. Tokens shorter than
+	min_length and stop words are dropped, and each token counts at
+	most once per thought, as a one in a sparse binary thought by term
+	matrix. Groups of thoughts, such as days, are counted by
+	multiplying that matrix by a sparse group indicator matrix. With a vocabulary (a list of words or the
+	path of one saved by save_vocabulary) every other word is ignored.
+	With hashing=True words are counted by one of n_features stable
+	hash buckets instead of by name."""
+
+	def __init__(self, min_length=2, stop_words="english", vocabulary=None, hashing=False, n_features=2 ** 20, tokenizer="tweet"):
+		if stop_words == "english":
+			from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+			stop_words = ENGLISH_STOP_WORDS
+
+		if isinstance(vocabulary, str):
+			vocabulary = load_json(vocabulary)["vocabulary"]
+
+		self.min_length = min_length
+		self.stop_words = frozenset(stop_words or ())
+		self.vocabulary = frozenset(vocabulary) if vocabulary is not None else None
+		self.hashing = hashing
+		self.n_features = n_features
+		self.tokenizer = tokenizer
+
+	def fingerprint(self):
+		"""Name the settings that decide what is counted, so results
+		saved under it are never reused once the tokenizer version,
+		stop words or vocabulary change"""
+
+		settings = [
+			sorted(self.stop_words),
+			sorted(self.vocabulary) if self.vocabulary is not None else None,
+			self.hashing and self.n_features
+		]
+		digest = hashlib.sha1(json.dumps(settings).encode("utf-8")).hexdigest()[:12]
+
+		return "{0}-len{1}-{2}".format(TOKENIZERS[self.tokenizer], self.min_length, digest)
+
+	def analyze(self, thought):
+		"""Return the distinct countable terms of a thought"""
+
+		tokens = tokens_of(thought.lower(), self.tokenizer)
+		terms = {t for t in tokens if len(t) >= self.min_length and t not in self.stop_words}
+
+		if self.vocabulary is not None:
+			terms &= self.vocabulary
+
+		if self.hashing:
+			terms = {zlib.crc32(t.encode("utf-8")) % self.n_features for t in terms}
+
+		return terms
+
+	def term_matrix(self, thoughts):
+		"""Return a binary (thoughts, terms) CSR matrix marking the
+		terms of each thought, with the term of each column. Columns
+		are in term order."""
+
+		columns, indices, indptr = {}, [], [0]
+
+		for thought in thoughts:
+			for term in self.analyze(thought):
+				column = columns.get(term)
+				if column is None:
+					column = columns[term] = len(columns)
+				indices.append(column)
+			indptr.append(len(indices))
+
+		# Chunks may run in pool processes, which never run atexit
+		flush_all()
+
+		# Renumber columns so they follow the sorted terms
+		terms = sorted(columns)
+		rank = np.empty(len(terms), dtype=np.int32)
+		rank[[columns[term] for term in terms]] = np.arange(len(terms), dtype=np.int32)
+		indices = rank[np.array(indices, dtype=np.int32)]
+
+		matrix = sparse.csr_matrix(
+			(np.ones(len(indices), dtype=np.int32), indices, np.array(indptr, dtype=np.int64)),
+			shape=(len(indptr) - 1, len(terms))
+		)
+
+		return matrix, terms
+
+	def count_chunk(self, thoughts):
+		"""Count document frequencies in one chunk of thoughts"""
+
+		matrix, terms = self.term_matrix(thoughts)
+		counts = np.asarray(matrix.sum(axis=0)).ravel()
+
+		return dict(zip(terms, counts.tolist()))
+
+	def count(self, thoughts, min_df=1, chunk_size=None, workers=None):
+		"""Return {term: number of thoughts containing it} for terms
+		in at least min_df thoughts. thoughts may be any iterable; it
+		is consumed chunk_size thoughts at a time, on a process pool
+		when workers is more than one. Without chunk_size the thoughts
+		are split evenly between the workers."""
+
+		if chunk_size is None and workers is not None and workers > 1:
+			thoughts = list(thoughts)
+			chunk_size = max(1, math.ceil(len(thoughts) / workers))
+
+		counts = Counter()
+
+		for chunk_counts in self.map_chunks(self.count_chunk, thoughts, chunk_size, workers):
+			counts.update(chunk_counts)
+
+		return {term: count for term, count in counts.items() if count >= min_df}
+
+	def count_groups(self, groups):
+		"""Count each group of thoughts separately with one indicator
+		product, returning lists of (term, count) pairs sorted by term"""
+
+		thoughts, group_index = [], []
+
+		for index, group in enumerate(groups):
+			thoughts += group
+			group_index += [index] * len(group)
+
+		matrix, terms = self.term_matrix(thoughts)
+		indicator = sparse.csr_matrix(
+			(np.ones(len(thoughts), dtype=np.int32), (group_index, np.arange(len(thoughts)))),
+			shape=(len(groups), len(thoughts))
+		)
+		group_counts = (indicator @ matrix).tocsr()
+		group_counts.sort_indices()
+		output = []
+
+		for index in range(len(groups)):
+			start, end = group_counts.indptr[index], group_counts.indptr[index + 1]
+			columns = group_counts.indices[start:end].tolist()
+			output.append([(terms[c], count) for c, count in zip(columns, group_counts.data[start:end].tolist())])
+
+		return output
+
+	def count_by_group(self, groups, chunk_size=None, workers=None):
+		"""Count each group of thoughts separately, such as the
+		thoughts of each day, returning sorted (term, count) lists.
+		Groups are counted chunk_size groups at a time, split evenly
+		between the workers without chunk_size."""
+
+		groups = list(groups)
+
+		if chunk_size is None and workers is not None and workers > 1:
+			chunk_size = max(1, math.ceil(len(groups) / workers))
+
+		return [counts for chunk in self.map_chunks(self.count_groups, groups, chunk_size, workers) for counts in chunk]
+
+	def map_chunks(self, func, items, chunk_size, workers):
+		"""Apply func to chunks of items, in order and in parallel
+		if asked to"""
+
+		items = iter_chunks(items, chunk_size) if chunk_size else [list(items)]
+
+		if workers is None or workers <= 1:
+			for item in items:
+				yield func(item)
+			return
+
+		from concurrent.futures import ProcessPoolExecutor
+
+		with ProcessPoolExecutor(max_workers=workers) as executor:
+
+			# Bound the chunks in flight so huge corpora stream through
+			pending = []
+			for item in items:
+				pending.append(executor.submit(func, item))
+				if len(pending) > workers * 2:
+					yield pending.pop(0).result()
+			for future in pending:
+				yield future.result()
+
+	def fit_vocabulary(self, thoughts, min_df=1, max_features=None, chunk_size=None, workers=None):
+		"""Keep the max_features most frequent words of thoughts as the
+		vocabulary of this counter and return it"""
+
+		counts = self.count(thoughts, min_df=min_df, chunk_size=chunk_size, workers=workers)
+		ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+		self.vocabulary = frozenset(word for word, _ in ranked[:max_features])
+
+		return sorted(self.vocabulary)
+
+	def save_vocabulary(self, filename):
+		"""Save the vocabulary so later runs count the same words"""
+
+		with open(filename, "w") as fp:
+			json.dump({"min_length": self.min_length, "vocabulary": sorted(self.vocabulary)}, fp)
+
+if __name__ == "__main__":
+	print("This module is a library that contains useful functions; it should not be run from the console.")
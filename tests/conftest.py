@@ -0,0 +1,50 @@
+"""Shared fixtures for the Prophet Mind tests"""
+
+import numpy as np
+import pytest
+from tornado.options import options
+
+# Imported so every option the tests override is defined
+import mind.__main__
+
+@pytest.fixture
+def set_options():
+	"""Override tornado options for one test, restoring every
+	option afterwards"""
+
+	saved = options.as_dict()
+
+	def override(**values):
+		for name, value in values.items():
+			setattr(options, name, value)
+
+	yield override
+
+	for name, value in saved.items():
+		setattr(options, name, value)
+
+@pytest.fixture
+def cnn_variables():
+	"""Random checkpoint variables of a small thought CNN, named as
+	cnn_classifier.build_graph names them"""
+
+	from mind.export_cnn import CONV_SCOPES, FC_SCOPES, variable_name
+
+	rng = np.random.RandomState(0)
+	alphabet, channels, doc_length, se_dim, hidden, classes = 12, 6, 20, 3, 10, 4
+	features = 4 + doc_length * channels + se_dim
+	shapes = [(1, 3, alphabet, channels)] + [(1, 3, channels, channels)] * 5 + [(1, 1, channels, channels)]
+	shapes += [(features, hidden), (hidden, classes)]
+	variables = {"sembed_matrix": rng.randn(5, se_dim).astype(np.float32)}
+
+	for index, (scope, shape) in enumerate(zip(CONV_SCOPES + FC_SCOPES, shapes)):
+		outputs = shape[-1]
+		variables[variable_name("W", index)] = (rng.randn(*shape) / np.sqrt(np.prod(shape[:-1]))).astype(np.float32)
+		variables[variable_name("B", index)] = rng.randn(outputs).astype(np.float32) * 0.1
+		# Large enough that the classes get clearly different probabilities
+		variables[scope + "/bn/gamma"] = rng.uniform(1, 2.5, outputs).astype(np.float32)
+		variables[scope + "/bn/beta"] = rng.randn(outputs).astype(np.float32) * 0.1
+		variables[scope + "/bn/moving_mean"] = rng.randn(outputs).astype(np.float32) * 0.1
+		variables[scope + "/bn/moving_variance"] = rng.uniform(0.5, 2, outputs).astype(np.float32)
+
+	return variables
@@ -0,0 +1,103 @@
+"""Tests for API admission control"""
+
+import json
+
+import pytest
+from tornado import gen
+from tornado.testing import AsyncHTTPTestCase, gen_test
+from tornado.options import options
+from tornado_json.application import Application
+from tornado_json.exceptions import APIError
+
+from mind.api import admission, schema
+from mind.api.base import Base_Handler
+
+@pytest.fixture(autouse=True)
+def limits(set_options):
+	set_options(max_days=3, max_thoughts=5, max_body_mb=1, max_in_flight=2, retry_after=7)
+	yield
+	admission._in_flight.clear()
+
+def test_size_limits():
+	admission.check_size("Test", 3, 5)
+	for days, thoughts in [(4, 1), (1, 6)]:
+		with pytest.raises(APIError) as error:
+			admission.check_size("Test", days, thoughts)
+		assert error.value.status_code == 413
+
+def test_body_limit():
+	admission.check_body("Test", 2 ** 20)
+	with pytest.raises(APIError) as error:
+		admission.check_body("Test", 2 ** 20 + 1)
+	assert error.value.status_code == 413
+
+def test_zero_disables_limits():
+	options.max_days = options.max_thoughts = options.max_body_mb = options.max_in_flight = 0
+	admission.check_size("Test", 10 ** 6, 10 ** 6)
+	admission.check_body("Test", 2 ** 40)
+	for _ in range(100):
+		admission.acquire("Test")
+
+def test_in_flight_slots():
+	admission.acquire("Test")
+	admission.acquire("Test")
+	admission.acquire("Other")
+	assert admission.in_flight() == 3
+
+	with pytest.raises(admission.Overloaded) as error:
+		admission.acquire("Test")
+	assert (error.value.status_code, error.value.retry_after) == (503, 7)
+
+	admission.release("Test")
+	admission.acquire("Test")
+
+class Slow_Handler(Base_Handler):
+
+	@schema.validate(input_schema={"type": "object"})
+	@gen.coroutine
+	def post(self):
+		yield gen.sleep(0.2)
+		return {"ok": True}
+
+class Strict_Handler(Base_Handler):
+
+	# No request can pass, so any 413 was decided before validation
+	@schema.validate(input_schema={"type": "object", "required": ["missing"]})
+	def post(self):
+		return {"ok": True}
+
+class Test_Admission(AsyncHTTPTestCase):
+
+	def get_app(self):
+		return Application(routes=[("/slow", Slow_Handler), ("/strict", Strict_Handler)], settings={})
+
+	def post_strict(self, body):
+		return self.fetch("/strict", method="POST", body=body, raise_error=False)
+
+	def test_size_is_checked_before_validation(self):
+		too_many = {"days": [{"date": "2015-01-01", "thoughts": []}] * 4}
+		assert self.post_strict(json.dumps(too_many)).code == 413
+		assert self.post_strict(json.dumps({"days": []})).code == 400
+
+	def test_large_body_is_not_decoded(self):
+		assert self.post_strict(b"{" * (2 ** 20 + 1)).code == 413
+		assert self.post_strict(b"{").code == 400
+
+	def post(self, days=1, thoughts=1):
+		body = {"days": [{"date": "2015-01-01", "thoughts": ["x"] * thoughts}] * days}
+		return self.http_client.fetch(self.get_url("/slow"), method="POST", body=json.dumps(body), raise_error=False)
+
+	@gen_test
+	def test_oversized_request_gets_413(self):
+		response = yield self.post(days=4)
+		assert response.code == 413
+		assert json.loads(response.body)["status"] == "fail"
+
+	@gen_test
+	def test_overloaded_route_gets_503_with_retry_after(self):
+		responses = yield [self.post() for _ in range(3)]
+		codes = sorted(response.code for response in responses)
+		assert codes == [200, 200, 503]
+		rejected = [response for response in responses if response.code == 503][0]
+		assert rejected.headers["Retry-After"] == "7"
+		assert admission.in_flight() == 0
@@ -0,0 +1,97 @@
+"""Tests for serving pre-compressed artifacts"""
+
+import gzip
+import os
+
+from tornado.testing import AsyncHTTPTestCase
+from tornado_json.application import Application
+
+from mind.api.artifacts import Artifact_Handler, accepted_encodings, is_artifact
+from mind.tools import precompress_dir
+
+CONTENT = b'{"truth": [{"w": "mind", "d": 0.9, "l": true}]}' * 50
+
+def test_accepted_encodings():
+	assert accepted_encodings("gzip, br;q=0.5, deflate;q=0") == {"gzip", "br"}
+	assert accepted_encodings("") == set()
+	assert accepted_encodings("GZIP;q=bad") == set()
+
+def test_is_artifact():
+	assert is_artifact("word2vec_tree.json")
+	assert is_artifact("sensemaking_word2vec_tree_03-31-20.json")
+	assert not is_artifact("thoughts.csv")
+	assert not is_artifact("token_cache.sqlite")
+	assert not is_artifact("word2vec_tree.json.gz")
+	assert not is_artifact("sensemaking_word2vec_tree_/../thoughts.json")
+	assert not is_artifact("trees/word2vec_tree.json")
+
+def test_precompress_dir_skips_current_copies(tmp_path):
+	(tmp_path / "trees").mkdir()
+	tree = tmp_path / "trees" / "word2vec_tree.json"
+	tree.write_bytes(CONTENT)
+	(tmp_path / "notes.txt").write_text("not an artifact")
+	(tmp_path / "thoughts.csv").write_text("Thought\nprivate\n")
+
+	assert str(tree) + ".gz" in precompress_dir(str(tmp_path))
+	assert gzip.decompress((tmp_path / "trees" / "word2vec_tree.json.gz").read_bytes()) == CONTENT
+	assert precompress_dir(str(tmp_path)) == []
+	assert not (tmp_path / "notes.txt.gz").exists()
+	assert not (tmp_path / "thoughts.csv.gz").exists()
+
+	os.utime(str(tree), ns=(2 ** 62, 2 ** 62))
+	assert str(tree) + ".gz" in precompress_dir(str(tmp_path))
+
+class Test_Artifact_Handler(AsyncHTTPTestCase):
+
+	def get_app(self):
+		self.data_dir = self.make_data_dir()
+		return Application(routes=[("/data/(.*)", Artifact_Handler, {"path": self.data_dir})], settings={})
+
+	def make_data_dir(self):
+		import tempfile
+		data_dir = tempfile.mkdtemp()
+		with open(os.path.join(data_dir, "word2vec_tree.json"), "wb") as tree:
+			tree.write(CONTENT)
+		with open(os.path.join(data_dir, "thoughts.csv"), "w") as thoughts:
+			thoughts.write("Thought\nprivate\n")
+		precompress_dir(data_dir)
+		return data_dir
+
+	def get(self, encoding=None, **headers):
+		if encoding is not None:
+			headers["Accept-Encoding"] = encoding
+		return self.fetch("/data/word2vec_tree.json", headers=headers, decompress_response=False)
+
+	def test_gzip_copy_is_served_when_accepted(self):
+		response = self.get("gzip")
+		assert response.headers["Content-Encoding"] == "gzip"
+		assert response.headers["Content-Type"] == "application/json"
+		assert gzip.decompress(response.body) == CONTENT
+		size = os.path.getsize(os.path.join(self.data_dir, "word2vec_tree.json.gz"))
+		assert response.headers["Etag"].endswith('-{0:x}"'.format(size))
+
+	def test_original_is_served_otherwise(self):
+		response = self.get("identity")
+		assert "Content-Encoding" not in response.headers
+		assert response.body == CONTENT
+
+	def test_stale_copy_is_ignored(self):
+		os.utime(os.path.join(self.data_dir, "word2vec_tree.json"), ns=(2 ** 62, 2 ** 62))
+		response = self.get("gzip")
+		# The original is compressed on the fly instead
+		assert response.headers["Etag"] == '"{0:x}-{1:x}"'.format(2 ** 62, len(CONTENT))
+		assert gzip.decompress(response.body) == CONTENT
+
+	def test_repeat_visit_gets_not_modified(self):
+		etag = self.get("gzip").headers["Etag"]
+		assert self.get("gzip", **{"If-None-Match": etag}).code == 304
+		assert self.get("identity", **{"If-None-Match": etag}).code == 200
+
+	def test_range(self):
+		response = self.get("identity", Range="bytes=10-19")
+		assert response.code == 206
+		assert response.body == CONTENT[10:20]
+
+	def test_only_artifacts_are_served(self):
+		for path in ["thoughts.csv", "word2vec_tree.json.gz", "missing.json", "sensemaking_word2vec_tree_x.json", "../etc/passwd"]:
+			assert self.fetch("/data/" + path).code == 404, path
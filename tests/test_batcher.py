@@ -0,0 +1,53 @@
+"""Tests for micro-batching classification requests"""
+
+import pytest
+from tornado import gen
+from tornado.ioloop import IOLoop
+
+from mind.api.batcher import InferenceBatcher
+
+class Recording_Classifier(object):
+	"""Labels thoughts with their length, recording each batch"""
+
+	def __init__(self):
+		self.batches = []
+
+	def __call__(self, thoughts):
+		self.batches.append(list(thoughts))
+		return [{"thought": thought, "label": len(thought)} for thought in thoughts]
+
+def classify_all(batcher, requests):
+	@gen.coroutine
+	def run():
+		results = yield [batcher.classify(thoughts) for thoughts in requests]
+		return results
+	return IOLoop.current().run_sync(run)
+
+def test_each_request_gets_its_own_results_in_order():
+	classifier = Recording_Classifier()
+	batcher = InferenceBatcher(lambda: classifier, max_batch_size=64)
+	requests = [["a", "bb"], ["ccc"], [], ["dddd", "e", "ff"]]
+	results = classify_all(batcher, requests)
+	assert results == [[classifier([t])[0] for t in thoughts] for thoughts in requests]
+
+def test_concurrent_requests_share_batches():
+	classifier = Recording_Classifier()
+	batcher = InferenceBatcher(lambda: classifier, max_batch_size=4, max_wait=0.05)
+	classify_all(batcher, [["a"], ["b", "c"], ["d"], ["e"], ["f", "g", "h", "i", "j"]])
+	assert [len(batch) for batch in classifier.batches] == [4, 1, 5]
+
+def test_classifier_is_loaded_once():
+	loads = []
+	batcher = InferenceBatcher(lambda: loads.append(1) or Recording_Classifier(), max_batch_size=1)
+	classify_all(batcher, [["a"], ["b"], ["c"]])
+	assert len(loads) == 1
+
+def test_failures_reach_every_request_in_the_batch():
+
+	def failing(thoughts):
+		raise RuntimeError("model failed")
+
+	batcher = InferenceBatcher(lambda: failing)
+
+	with pytest.raises(RuntimeError):
+		classify_all(batcher, [["a"], ["b"]])
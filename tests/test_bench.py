@@ -0,0 +1,29 @@
+"""Tests for the in process HTTP benchmark"""
+
+import pytest
+
+from mind.bench import http
+
+def bench_args(*extra):
+	return http.parse_arguments(["--days", "3", "--thoughts", "4", "--requests", "3", "--concurrency", "2", "--payloads", "2", "--vocab", "50", "--mode", "inline"] + list(extra))
+
+def test_payloads_are_deterministic_and_sized():
+	args = bench_args()
+	payload = http.generate_payload(args, 7)
+	assert payload == http.generate_payload(args, 7)
+	assert payload != http.generate_payload(args, 8)
+	assert len(payload["days"]) == 3
+	assert all(len(day["thoughts"]) == 4 for day in payload["days"])
+
+def test_answered_requests_are_timed(set_options):
+	result = http.run_mode(bench_args())
+	assert (result["successes"], result["errors"]) == (3, 0)
+	assert result["thoughts_per_second"] == pytest.approx(result["requests_per_second"] * 3 * 4)
+	assert result["p50_ms"] is not None
+
+def test_failed_requests_are_not_counted(set_options, monkeypatch):
+	monkeypatch.setattr(http, "BENCH_OPTIONS", {"max_days": 1, "max_thoughts": 0, "max_in_flight": 0})
+	result = http.run_mode(bench_args())
+	assert (result["successes"], result["errors"]) == (0, 3)
+	assert result["thoughts_per_second"] == result["requests_per_second"] == 0
+	assert result["p95_ms"] is None
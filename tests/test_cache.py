@@ -0,0 +1,62 @@
+"""Tests for the wordstream result cache"""
+
+import json
+
+from tornado.ioloop import IOLoop
+
+from mind.api import cache, codec
+from mind.api.cache import ResultCache
+
+def run(future_factory):
+	return IOLoop.current().run_sync(future_factory)
+
+def test_keys_ignore_key_order_and_namespace_separates():
+	first = ResultCache(10, namespace="a")
+	assert first.key({"x": 1, "y": ["é"]}) == first.key({"y": ["é"], "x": 1})
+	assert first.key(["one"]) != ResultCache(10, namespace="b").key(["one"])
+
+def test_keys_do_not_depend_on_the_api_codec(monkeypatch):
+	day_cache = ResultCache(10, namespace="n")
+	key = day_cache.key(["Café", "rain"])
+	monkeypatch.setattr(codec, "dumps", lambda obj: json.dumps(obj, indent=2).encode("utf-8"))
+	assert day_cache.key(["Café", "rain"]) == key
+
+def test_least_recently_used_entry_is_evicted():
+	day_cache = ResultCache(2)
+	day_cache.put("a", [1])
+	day_cache.put("b", [2])
+	assert day_cache.get("a") == [1]
+	day_cache.put("c", [3])
+	assert day_cache.get("b") is None
+	assert day_cache.get("a") == [1] and day_cache.get("c") == [3]
+	assert day_cache.evictions == 1
+
+def test_disk_tier_survives_a_new_cache(tmp_path):
+	writer = ResultCache(10, directory=str(tmp_path), namespace="n")
+	keys = [writer.key(["day", i]) for i in range(3)]
+	run(lambda: writer.put_many([(keys[0], [{"word": "rain", "count": 2}]), (keys[1], [])]))
+
+	reader = ResultCache(10, directory=str(tmp_path), namespace="n")
+	values = run(lambda: reader.get_many(keys))
+	assert values == [[{"word": "rain", "count": 2}], [], None]
+	assert (reader.disk_hits, reader.misses, reader.hits) == (2, 1, 0)
+
+	# Entries read from disk are then served from memory
+	run(lambda: reader.get_many(keys[:2]))
+	assert reader.hits == 2
+	assert not [p for p in tmp_path.rglob("*") if p.is_file() and not p.name.endswith(".json")]
+
+def test_namespace_follows_counter_settings():
+	from mind.api.wordstream import cache_namespace, get_counter
+	from mind.tokens import TOKENIZERS
+	from mind.word_count import WordCounter
+
+	namespace = cache_namespace()
+	assert TOKENIZERS[get_counter().tokenizer] in namespace
+	assert WordCounter(min_length=3).fingerprint() in namespace
+	assert WordCounter(min_length=3, stop_words=["rain"]).fingerprint() not in namespace
+	assert WordCounter(min_length=2).fingerprint() not in namespace
+
+def test_disabled_cache(set_options):
+	set_options(cache_size=0)
+	assert cache.get_cache("disabled") is None
@@ -0,0 +1,82 @@
+"""Tests for the batched character encoder of the CNNs"""
+
+import os
+import random
+import threading
+
+import numpy as np
+import pytest
+
+from mind.char_encoder import CharEncoder, get_char_encoder
+from mind.tools import load_json
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ALPHABET = load_json(os.path.join(ROOT, "config", "cnn_config.json"))["alphabet"]
+DOC_LENGTH = 40
+
+def reference(docs, alphabet=ALPHABET, length=DOC_LENGTH):
+	"""The per character loop of the former string_to_tensor, stacked
+	into the (batch, 1, doc_length, alphabet) layout"""
+
+	alpha_dict = {char: index for index, char in enumerate(alphabet)}
+	tensor = np.zeros((len(docs), 1, length, len(alphabet)), dtype=np.float32)
+
+	for row, doc in enumerate(docs):
+		doc = doc.lower()[0:length]
+		for index, char in reversed(list(enumerate(doc))):
+			if char in alphabet:
+				tensor[row, 0, len(doc) - index - 1, alpha_dict[char]] = 1
+
+	return tensor
+
+def random_docs(seed, count):
+	rng = random.Random(seed)
+	chars = ALPHABET + ALPHABET.upper() + " \n\tÉİßé€😀\udc80"
+	return [
+		"".join(rng.choice(chars) for _ in range(rng.randint(0, DOC_LENGTH * 2)))
+		for _ in range(count)
+	]
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_reference_loop(seed):
+	docs = random_docs(seed, 32)
+	encoder = CharEncoder(ALPHABET, DOC_LENGTH)
+	expected = reference(docs)
+
+	np.testing.assert_array_equal(encoder.encode(docs), expected)
+	np.testing.assert_array_equal(encoder.encode(docs, out=np.zeros_like(expected)), expected)
+
+	indices = encoder.encode_indices(docs)
+	np.testing.assert_array_equal(indices >= 0, expected.sum(axis=3)[:, 0] > 0)
+	np.testing.assert_array_equal(np.where(indices >= 0, indices, 0), expected.argmax(axis=3)[:, 0])
+
+def test_reused_buffer_is_cleared():
+	encoder = CharEncoder(ALPHABET, DOC_LENGTH)
+	first = encoder.encode(random_docs(0, 16))
+	second = encoder.encode(["ok", "ask me"])
+
+	assert np.shares_memory(first, second)
+	np.testing.assert_array_equal(second, reference(["ok", "ask me"]))
+
+	# Growing the batch allocates a fresh buffer
+	docs = random_docs(1, 64)
+	np.testing.assert_array_equal(encoder.encode(docs), reference(docs))
+	np.testing.assert_array_equal(encoder.encode([]), reference([]))
+
+def test_threads_have_own_buffers():
+	encoder = get_char_encoder(ALPHABET, DOC_LENGTH)
+	results = {}
+
+	def encode(seed):
+		docs = random_docs(seed, 8)
+		for _ in range(50):
+			results[seed] = np.array_equal(encoder.encode(docs), reference(docs))
+
+	threads = [threading.Thread(target=encode, args=(seed,)) for seed in range(4)]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+
+	assert all(results.values()) and len(results) == 4
+	assert get_char_encoder(ALPHABET, DOC_LENGTH) is encoder
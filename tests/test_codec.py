@@ -0,0 +1,49 @@
+"""Tests for the API JSON codec and error responses"""
+
+import json
+
+from tornado.testing import AsyncHTTPTestCase
+from tornado_json.application import Application
+
+from mind.api import codec
+from mind.api.base import Base_Handler
+
+PAYLOAD = {"days": [{"date": "2015-09-04", "thoughts": ["Café ☕ at 5", "\"quoted\"\n", ""]}], "count": 3, "rate": 0.5, "ok": True, "none": None}
+
+def test_round_trip_matches_stdlib():
+	encoded = codec.dumps(PAYLOAD)
+	assert isinstance(encoded, bytes)
+	assert json.loads(encoded.decode("utf-8")) == PAYLOAD
+	assert codec.loads(encoded) == PAYLOAD
+
+def test_loads_accepts_str_and_bytes():
+	text = json.dumps(PAYLOAD)
+	assert codec.loads(text) == codec.loads(text.encode("utf-8")) == PAYLOAD
+
+class Error_Handler(Base_Handler):
+
+	def get(self):
+		self.send_error(413)
+
+	def post(self):
+		self.success(PAYLOAD)
+
+class Test_Base_Handler(AsyncHTTPTestCase):
+
+	def get_app(self):
+		return Application(routes=[("/error", Error_Handler)], settings={})
+
+	def test_success_is_encoded_with_the_codec(self):
+		response = self.fetch("/error", method="POST", body="")
+		assert response.headers["Content-Type"].startswith("application/json")
+		assert json.loads(response.body) == {"status": "success", "data": PAYLOAD}
+
+	def test_send_error_without_exception(self):
+		response = self.fetch("/error")
+		assert response.code == 413
+		assert json.loads(response.body)["message"] == "Request Entity Too Large"
+
+	def test_unsupported_method(self):
+		response = self.fetch("/error", method="DELETE")
+		assert response.code == 405
+		assert json.loads(response.body)["status"] == "error"
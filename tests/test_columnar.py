@@ -0,0 +1,74 @@
+"""Tests for the typed columnar cache of thought CSVs"""
+
+import os
+
+import pandas as pd
+import pytest
+
+from mind import tools
+from mind.tools import load_columnar
+
+CSV = (
+	"Thought,Seer,Type,Privacy,Post date\n"
+	"I think it will rain,alice,Prediction,Public,09/04/15 10:30 PM\n"
+	"\"Commas, and \"\"quotes\"\"\",bob,Question,Private,09/05/15 01:05 AM\n"
+	"\"Multi\nline\",alice,Reflection,Public,not a date\n"
+)
+
+@pytest.fixture(params=["parquet", "pickle"])
+def columnar_format(request, monkeypatch):
+	if request.param == "parquet":
+		pytest.importorskip("pyarrow")
+	monkeypatch.setattr(tools, "columnar_format", lambda: request.param)
+	return request.param
+
+def write_csv(path, content=CSV):
+	path.write_text(content, encoding="utf-8")
+	return str(path)
+
+def reference(filename):
+	df = pd.read_csv(filename, na_filter=False, dtype=object)
+	for column in tools.CATEGORICAL_COLUMNS:
+		df[column] = df[column].astype("category")
+	df["Post date"] = pd.to_datetime(df["Post date"], format="%m/%d/%y %I:%M %p", errors="coerce")
+	return df
+
+def test_matches_parsed_csv(tmp_path, columnar_format):
+	filename = write_csv(tmp_path / "thoughts.csv")
+	pd.testing.assert_frame_equal(load_columnar(filename), reference(filename))
+
+	# The second load reads the cache without parsing the CSV
+	expected = reference(filename)
+	with pytest.MonkeyPatch.context() as patch:
+		patch.setattr(pd, "read_csv", None)
+		patch.setattr(tools, "read_csv_parallel", None)
+		pd.testing.assert_frame_equal(load_columnar(filename), expected)
+
+def test_columns_and_seers(tmp_path, columnar_format):
+	filename = write_csv(tmp_path / "thoughts.csv")
+	df = load_columnar(filename, columns=["Thought", "Seer"], seers=["alice"])
+	assert list(df.columns) == ["Thought", "Seer"]
+	assert list(df["Thought"]) == ["I think it will rain", "Multi\nline"]
+	assert list(df["Seer"].cat.categories) == ["alice"]
+
+def cached_files(cache_dir):
+	return sorted(os.path.relpath(os.path.join(root, name), cache_dir) for root, _, names in os.walk(cache_dir) for name in names)
+
+def test_changed_csv_replaces_only_its_own_cache(tmp_path, columnar_format):
+	cache_dir = str(tmp_path / "cache")
+	filenames = [write_csv(tmp_path / name) for name in ["thoughts.csv", "thoughts.old.csv", "thoughts.csv.bak"]]
+	(tmp_path / "other").mkdir()
+	filenames.append(write_csv(tmp_path / "other" / "thoughts.csv"))
+
+	for filename in filenames:
+		load_columnar(filename, cache_dir=cache_dir)
+	before = cached_files(cache_dir)
+	assert len(before) == 4
+
+	write_csv(tmp_path / "thoughts.csv", CSV + "New thought,carol,Idea,Public,01/01/16 09:00 AM\n")
+	os.utime(filenames[0], ns=(2 ** 62, 2 ** 62))
+	assert len(load_columnar(filenames[0], cache_dir=cache_dir)) == 4
+
+	after = cached_files(cache_dir)
+	assert len(after) == 4
+	assert len(set(before) & set(after)) == 3
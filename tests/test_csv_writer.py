@@ -0,0 +1,56 @@
+"""Tests for the buffered background CSVWriter"""
+
+import pandas as pd
+import pytest
+
+from mind.tools import CSVWriter
+
+HEADER = ["Thought", "Seer", "Score"]
+
+def batches():
+	return [
+		[["first, thought", "alice", 1], ["multi\nline \"quoted\"", "bob", 2.5]],
+		[],
+		[["third", "", None]],
+		[["fourth", "carol", 4]]
+	]
+
+def reference(path, header=True):
+	with open(path, "a", encoding="utf-8", newline="") as handle:
+		for rows in batches():
+			if rows:
+				pd.DataFrame(rows).to_csv(handle, index=False, header=HEADER if header else False)
+				header = False
+
+@pytest.mark.parametrize("max_rows", [1, 2, 10000])
+def test_matches_to_csv(tmp_path, max_rows):
+	expected, written = tmp_path / "expected.csv", tmp_path / "written.csv"
+	reference(expected)
+
+	with CSVWriter(str(written), HEADER, max_rows=max_rows, max_pending=1) as write:
+		for rows in batches():
+			write(rows)
+
+	assert written.read_bytes() == expected.read_bytes()
+
+def test_appends_without_header(tmp_path):
+	expected, written = tmp_path / "expected.csv", tmp_path / "written.csv"
+	for path in [expected, written]:
+		path.write_text("Thought,Seer,Score\n", encoding="utf-8")
+	reference(expected, header=False)
+
+	with CSVWriter(str(written), HEADER) as write:
+		for rows in batches():
+			write(rows)
+
+	assert written.read_bytes() == expected.read_bytes()
+
+def test_rows_are_copied(tmp_path):
+	path = tmp_path / "written.csv"
+	rows = [["one", "alice", 1]]
+
+	with CSVWriter(str(path), HEADER) as write:
+		write(rows)
+		rows.append(["two", "bob", 2])
+
+	assert len(pd.read_csv(str(path))) == 1
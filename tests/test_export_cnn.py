@@ -0,0 +1,44 @@
+"""Tests for folding batch norm into the CNN weights"""
+
+import numpy as np
+
+from mind.export_cnn import BN_EPSILON, CONV_SCOPES, FC_SCOPES, doc_length_of, fold_batch_norm, variable_name
+
+def batch_norm(z, variables, scope):
+	"""Inference time batch norm as tf.contrib.layers.batch_norm applies it"""
+
+	mean = variables[scope + "/bn/moving_mean"]
+	variance = variables[scope + "/bn/moving_variance"]
+	gamma = variables[scope + "/bn/gamma"]
+	beta = variables[scope + "/bn/beta"]
+
+	return gamma * (z - mean) / np.sqrt(variance + BN_EPSILON) + beta
+
+def test_fold_matches_batch_norm(cnn_variables):
+	folded = fold_batch_norm(cnn_variables)
+	rng = np.random.RandomState(1)
+
+	for index, scope in enumerate(CONV_SCOPES + FC_SCOPES):
+		weights = cnn_variables[variable_name("W", index)].astype(np.float64)
+		weights = weights.reshape(-1, weights.shape[-1])
+		x = rng.randn(16, weights.shape[0])
+		expected = batch_norm(x @ weights, cnn_variables, scope)
+
+		# Convolutions are linear per window, with no bias after batch norm
+		if scope in FC_SCOPES:
+			expected = expected + cnn_variables[variable_name("B", index)]
+			name = "fc{0}".format(FC_SCOPES.index(scope))
+		else:
+			name = "conv{0}".format(CONV_SCOPES.index(scope))
+
+		folded_weights = folded[name + "_weights"]
+		assert folded_weights.dtype == np.float32
+		assert folded_weights.shape == cnn_variables[variable_name("W", index)].shape
+
+		actual = x @ folded_weights.reshape(weights.shape) + folded[name + "_biases"]
+		np.testing.assert_allclose(actual, expected, rtol=1e-5, atol=1e-5)
+
+	np.testing.assert_array_equal(folded["sembed_matrix"], cnn_variables["sembed_matrix"])
+
+def test_doc_length(cnn_variables):
+	assert doc_length_of(fold_batch_norm(cnn_variables)) == 20
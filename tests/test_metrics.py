@@ -0,0 +1,62 @@
+"""Tests for per route API metrics"""
+
+import json
+
+import pytest
+
+from tornado.testing import AsyncHTTPTestCase
+from tornado_json.application import Application
+
+from mind.api import metrics, schema
+from mind.api.base import Base_Handler
+from mind.api.metrics import Counter, Histogram, Metrics_Handler
+
+def test_histogram_buckets_are_cumulative():
+	histogram = Histogram("latency", "Latency", [0.1, 1], ["route"])
+	for value in [0.05, 0.1, 0.5, 3]:
+		histogram.observe(value, "Test")
+	samples = {(name, labels[-1][1] if name.endswith("_bucket") else None): value for name, labels, value in histogram.samples()}
+	assert samples[("latency_bucket", "0.1")] == 2
+	assert samples[("latency_bucket", "1")] == 3
+	assert samples[("latency_bucket", "+Inf")] == 4
+	assert samples[("latency_count", None)] == 4
+	assert samples[("latency_sum", None)] == pytest.approx(3.65)
+
+def test_labels_are_escaped():
+	counter = Counter("errors", "Errors", ["error"])
+	counter.inc('say "hi"\\')
+	assert metrics.format_labels(list(counter.samples())[0][1]) == '{error="say \\"hi\\"\\\\"}'
+
+def test_payload_size():
+	assert metrics.payload_size({"days": [{"thoughts": ["a", "b"]}, {"thoughts": []}, {}]}) == (3, 2)
+	assert metrics.payload_size({"thoughts": ["a"]}) == (0, 1)
+	assert metrics.payload_size(None) == (0, 0)
+
+def test_payload_size_of_malformed_bodies():
+	assert metrics.payload_size({"days": "many"}) == (0, 0)
+	assert metrics.payload_size({"days": [1, {"thoughts": "a"}, {"thoughts": ["a"]}]}) == (3, 1)
+	assert metrics.payload_size({"thoughts": {"a": 1}}) == (0, 0)
+
+class Echo_Handler(Base_Handler):
+
+	@schema.validate(input_schema={"type": "object"}, output_schema={"type": "object"})
+	def post(self):
+		return {"days": len(self.body["days"])}
+
+class Test_Metrics_Handler(AsyncHTTPTestCase):
+
+	def get_app(self):
+		return Application(routes=[("/echo", Echo_Handler), ("/metrics", Metrics_Handler)], settings={})
+
+	def test_request_stages_are_exposed(self):
+		body = json.dumps({"days": [{"thoughts": ["a", "b"]}]})
+		assert self.fetch("/echo", method="POST", body=body).code == 200
+
+		response = self.fetch("/metrics")
+		text = response.body.decode("utf-8")
+		assert response.headers["Content-Type"].startswith("text/plain")
+		assert "# TYPE mind_stage_seconds histogram" in text
+		for stage in ["decode", "input_validation", "handler", "output_validation", "serialization"]:
+			assert 'mind_stage_seconds_count{{route="Echo_Handler",stage="{0}"}}'.format(stage) in text
+		assert 'mind_request_thoughts_sum{route="Echo_Handler"}' in text
+		assert 'mind_requests_total{route="Echo_Handler"}' in text
@@ -0,0 +1,76 @@
+"""Tests that vectorized mood extraction matches the original
+per thought regular expressions"""
+
+import re
+
+import numpy as np
+
+from mind.api import schema
+from mind.api.sentiment import process_by_day
+from mind.mood import extract_sentiment
+
+HL_PATTERN = re.compile(r"HL \d+")
+HAPPY_PATTERN = re.compile(r"#happy:? \d+\.?\d?")
+MOOD_PATTERN = re.compile(r"#mood:? \d+\.?\d?")
+
+def scale(value):
+	return -1 + 2 * min(value, 10) / 10
+
+def reference_mood(thought):
+	"""parse_mood as /sentiment and thought_stream used to run it"""
+
+	for pattern in [HAPPY_PATTERN, MOOD_PATTERN]:
+		match = re.search(pattern, thought.lower())
+		if match:
+			return scale(float(match.group().split(" ")[1]))
+
+	return np.nan
+
+def reference_hl(thought):
+	match = re.search(HL_PATTERN, thought)
+	return scale(float(match.group().split(" ")[1])) if match else np.nan
+
+THOUGHTS = [
+	"Feeling fine #mood 7",
+	"#MOOD: 3.5 and then #happy 9",
+	"#happy:8 without a space",
+	"#happy: 12 is off the scale",
+	"HL 4 and #mood 0",
+	"hl 4 lowercase is not HL",
+	"Nothing reported",
+	"",
+	"#mood 7.25 keeps one decimal",
+	"first #mood 2 then #mood 6",
+	"multi\nline #happy 5"
+]
+
+def test_matches_reference():
+	extracted = extract_sentiment(THOUGHTS)
+	np.testing.assert_allclose(extracted["mood"], [reference_mood(t) for t in THOUGHTS])
+	np.testing.assert_allclose(extracted["hl"], [reference_hl(t) for t in THOUGHTS])
+
+def test_empty_input():
+	extracted = extract_sentiment([])
+	assert len(extracted["mood"]) == len(extracted["hl"]) == 0
+
+def reference_process_by_day(data):
+	output = {"days": []}
+	for day in data["days"]:
+		moods = [m for m in map(reference_mood, day["thoughts"]) if not np.isnan(m)]
+		if moods:
+			output["days"].append({"mood": sum(moods) / float(len(moods)), "date": day["date"]})
+	return output
+
+def test_daily_averages_match_reference():
+	data = {"days": [
+		{"date": "2015-07-01", "thoughts": THOUGHTS[:4]},
+		{"date": "2015-07-02", "thoughts": ["Nothing reported"]},
+		{"date": "2015-07-03", "thoughts": []},
+		{"date": "2015-07-04", "thoughts": THOUGHTS[4:]}
+	]}
+
+	for example in [data, schema.load_schemas("sentiment")["input_example"]]:
+		expected = reference_process_by_day(example)
+		actual = process_by_day(example)
+		assert [day["date"] for day in actual["days"]] == [day["date"] for day in expected["days"]]
+		np.testing.assert_allclose([day["mood"] for day in actual["days"]], [day["mood"] for day in expected["days"]])
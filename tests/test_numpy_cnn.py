@@ -0,0 +1,118 @@
+"""Tests for the NumPy inference engine of the thought CNNs"""
+
+import numpy as np
+import pytest
+
+from mind import numpy_cnn
+from mind.char_encoder import CharEncoder
+from mind.export_cnn import BN_EPSILON, CONV_RATES, CONV_SCOPES, FC_SCOPES, fold_batch_norm, variable_name
+from mind.numpy_cnn import NumpyCNN, weights_paths_of
+from mind.quantize_cnn import quantize, save_quantized
+
+ALPHABET = "abcdefghijkl"
+THOUGHTS = ["abc def", "lkjihgfedcba" * 3, "", "a b c mnop", "kkkk"]
+
+def batch_norm(z, variables, scope):
+	"""Inference time batch norm over the last axis"""
+
+	scale = variables[scope + "/bn/gamma"] / np.sqrt(variables[scope + "/bn/moving_variance"] + BN_EPSILON)
+
+	return (z - variables[scope + "/bn/moving_mean"]) * scale + variables[scope + "/bn/beta"]
+
+def dilated_conv(x, weights, rate):
+	"""atrous_conv2d with SAME padding, one position and tap at a time"""
+
+	batch, length, _ = x.shape
+	width = weights.shape[0]
+	before = (width - 1) * rate // 2
+	out = np.zeros((batch, length, weights.shape[-1]))
+
+	for position in range(length):
+		for tap in range(width):
+			source = position + tap * rate - before
+			if 0 <= source < length:
+				out[:, position] += x[:, source] @ weights[tap]
+
+	return out
+
+def reference(variables, x, tod, speaker_ids):
+	"""model:0 of cnn_classifier.build_graph at inference, from the
+	unfolded checkpoint variables"""
+
+	h = x[:, 0].astype(np.float64)
+	layers = len(CONV_SCOPES)
+
+	# Encoder layers are batch norm of the convolution, without bias or activation
+	for index, (scope, rate) in enumerate(zip(CONV_SCOPES, CONV_RATES)):
+		h = batch_norm(dilated_conv(h, variables[variable_name("W", index)][0], rate), variables, scope)
+
+	h = np.concatenate([tod, h.reshape(len(h), -1), variables["sembed_matrix"][speaker_ids]], axis=1)
+
+	for index, scope in enumerate(FC_SCOPES, layers):
+		z = batch_norm(h @ variables[variable_name("W", index)], variables, scope) + variables[variable_name("B", index)]
+		h = z * (z >= 1e-6)
+
+	softmax = np.exp(h) / np.sum(np.exp(h), axis=1, keepdims=True)
+
+	return np.log(np.clip(softmax, 1e-10, 1.0))
+
+@pytest.fixture
+def encoder():
+	return CharEncoder(ALPHABET, 20)
+
+def test_matches_reference(cnn_variables, encoder):
+	cnn = NumpyCNN(fold_batch_norm(cnn_variables))
+	rng = np.random.RandomState(2)
+	tod = rng.rand(len(THOUGHTS), 4).astype(np.float32)
+	speaker_ids = np.array([0, 1, 2, 3, 4], dtype=np.int32)
+	x = encoder.encode(THOUGHTS, out=np.zeros((len(THOUGHTS), 1, 20, len(ALPHABET)), dtype=np.float32))
+
+	assert cnn.doc_length == 20
+	np.testing.assert_allclose(
+		cnn.forward(encoder.encode_indices(THOUGHTS), tod=tod, speaker_ids=speaker_ids),
+		reference(cnn_variables, x, tod, speaker_ids),
+		rtol=1e-4, atol=1e-4
+	)
+
+	# Unknown time of day and speaker default to zeros
+	zeros = np.zeros((len(THOUGHTS), 4), dtype=np.float32)
+	np.testing.assert_allclose(
+		cnn.forward(encoder.encode_indices(THOUGHTS)),
+		reference(cnn_variables, x, zeros, np.zeros(len(THOUGHTS), dtype=np.int32)),
+		rtol=1e-4, atol=1e-4
+	)
+
+@pytest.mark.parametrize("mode, tolerance", [("float16", 5e-3), ("int8", 3e-2)])
+def test_quantized_outputs_close(cnn_variables, encoder, monkeypatch, mode, tolerance):
+	folded = fold_batch_norm(cnn_variables)
+	indices = encoder.encode_indices(THOUGHTS)
+	expected = np.exp(NumpyCNN(folded).forward(indices))
+
+	# Compact fully connected weights are widened a few columns at a time
+	monkeypatch.setattr(numpy_cnn, "BLOCK_SIZE", 3)
+	cnn = NumpyCNN(quantize(folded, mode))
+
+	assert cnn.fcs[0][0].dtype == (np.int8 if mode == "int8" else np.float16)
+	actual = np.exp(cnn.forward(indices))
+
+	np.testing.assert_allclose(actual, expected, atol=tolerance)
+	np.testing.assert_array_equal(actual.argmax(axis=1), expected.argmax(axis=1))
+
+def test_load(cnn_variables, encoder, tmp_path):
+	folded = fold_batch_norm(cnn_variables)
+	path = str(tmp_path / "model.int8.npz")
+	save_quantized(path, quantize(folded, "int8"))
+	indices = encoder.encode_indices(THOUGHTS)
+
+	np.testing.assert_array_equal(NumpyCNN.load(path).forward(indices), NumpyCNN(quantize(folded, "int8")).forward(indices))
+
+def test_weights_paths(tmp_path):
+	model_path = str(tmp_path / "sentiment.ckpt")
+
+	# Quantized files are only chosen when asked for
+	assert weights_paths_of(model_path) == [str(tmp_path / "sentiment.npz")]
+	assert weights_paths_of(model_path, "float16") == [str(tmp_path / "sentiment.float16.npz"), str(tmp_path / "sentiment.npz")]
+	assert weights_paths_of(model_path, "auto") == [str(tmp_path / "sentiment.npz")]
+
+	with pytest.raises(ValueError):
+		weights_paths_of(model_path, "int4")
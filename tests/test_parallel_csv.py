@@ -0,0 +1,52 @@
+"""Tests for parsing CSVs in parallel over record-aligned byte ranges"""
+
+import csv
+
+import pandas as pd
+import pytest
+
+from mind.tools import find_record_boundaries, read_csv_parallel, read_csv_range
+
+OPTIONS = {"na_filter": False, "encoding": "utf-8", "dtype": object}
+
+@pytest.fixture
+def quoted_csv(tmp_path):
+	rows = [["Thought", "Seer"]]
+	for i in range(200):
+		thought = "line {0}\nstill \"\"thought\"\" {0}".format(i) if i % 3 == 0 else "thought, {0}".format(i)
+		rows.append(['"{0}"'.format(thought), "seer{0}".format(i % 7)])
+	path = tmp_path / "thoughts.csv"
+	path.write_text("".join(",".join(row) + "\n" for row in rows), encoding="utf-8")
+	return str(path)
+
+@pytest.mark.parametrize("num_ranges", [1, 3, 16, 1000])
+def test_ranges_start_at_records(quoted_csv, num_ranges):
+	ranges = find_record_boundaries(quoted_csv, num_ranges)
+	names = ["Thought", "Seer"]
+
+	# Ranges tile the body of the file, after the header
+	with open(quoted_csv, "rb") as reader:
+		assert ranges[0][0] == len(reader.readline())
+	assert all(end == start for (_, end), (start, _) in zip(ranges, ranges[1:]))
+
+	frames = [read_csv_range(quoted_csv, start, end, names, OPTIONS) for start, end in ranges]
+	pd.testing.assert_frame_equal(pd.concat(frames, ignore_index=True), pd.read_csv(quoted_csv, **OPTIONS))
+
+def test_unquoted_ranges(tmp_path):
+	path = tmp_path / "thoughts.txt"
+	path.write_text("a|b\n" + "".join("x\"{0}|{0}\n".format(i) for i in range(50)), encoding="utf-8")
+	ranges = find_record_boundaries(str(path), 4, quoting=csv.QUOTE_NONE)
+	assert len(ranges) == 4
+
+def test_empty_file(tmp_path):
+	path = tmp_path / "empty.csv"
+	path.write_text("")
+	assert find_record_boundaries(str(path), 4) == []
+
+def test_parallel_matches_read_csv(quoted_csv):
+	expected = pd.read_csv(quoted_csv, **OPTIONS)
+	pd.testing.assert_frame_equal(read_csv_parallel(quoted_csv, workers=2, **OPTIONS), expected)
+
+	chunks = list(read_csv_parallel(quoted_csv, workers=2, iterator=True, num_ranges=5, **OPTIONS))
+	assert len(chunks) == 5
+	pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), expected)
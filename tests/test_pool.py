@@ -0,0 +1,39 @@
+"""Tests for running analysis on the process pool"""
+
+from concurrent.futures import CancelledError
+
+import pytest
+from tornado.ioloop import IOLoop
+
+from mind.api import pool
+
+def square(x):
+	return x * x
+
+@pytest.fixture
+def executor(set_options):
+	set_options(pool_size=2, max_fanout=3)
+	yield
+	pool.shutdown()
+
+def test_results_match_inline_and_keep_order(executor):
+	items = list(range(50))
+	results = IOLoop.current().run_sync(lambda: pool.map_tasks(square, items))
+	assert results == [square(x) for x in items]
+
+def test_runs_inline_without_a_pool(set_options):
+	set_options(pool_size=0)
+	assert pool.get_executor() is None
+	assert IOLoop.current().run_sync(lambda: pool.map_tasks(square, [3, 4])) == [9, 16]
+
+def test_stops_scheduling_once_cancelled(executor):
+	calls = []
+
+	def is_cancelled():
+		calls.append(1)
+		return len(calls) > 2
+
+	with pytest.raises(CancelledError):
+		IOLoop.current().run_sync(lambda: pool.map_tasks(square, range(100), is_cancelled=is_cancelled))
+
+	assert len(calls) < 100
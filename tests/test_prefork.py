@@ -0,0 +1,99 @@
+"""Tests for draining and supervising pre-forked workers"""
+
+import os
+import signal
+import subprocess
+import sys
+import textwrap
+import time
+
+import pytest
+from tornado.ioloop import IOLoop
+
+from mind.api import admission, prefork
+
+class Fake_Server(object):
+	"""Stands in for the HTTPServer being stopped"""
+
+	stopped = False
+
+	def stop(self):
+		self.stopped = True
+
+@pytest.fixture
+def io_loop():
+	handlers = {signum: signal.getsignal(signum) for signum in [signal.SIGTERM, signal.SIGINT]}
+	loop = IOLoop()
+	yield loop
+	loop.close()
+	admission._in_flight.clear()
+	for signum, handler in handlers.items():
+		signal.signal(signum, handler)
+
+def stop_after_signal(io_loop, grace):
+	"""Send SIGTERM to this process and time how long the loop runs"""
+
+	server = Fake_Server()
+	prefork.stop_on_signal(server, io_loop, grace=grace)
+	io_loop.add_callback(os.kill, os.getpid(), signal.SIGTERM)
+	start = time.perf_counter()
+	io_loop.start()
+
+	return server, time.perf_counter() - start
+
+def test_stops_at_once_when_idle(io_loop):
+	server, elapsed = stop_after_signal(io_loop, grace=5)
+	assert server.stopped
+	assert elapsed < 1
+
+def test_waits_for_in_flight_requests(io_loop):
+	admission.acquire("Test_Handler")
+	io_loop.call_later(0.3, admission.release, "Test_Handler")
+	_, elapsed = stop_after_signal(io_loop, grace=5)
+	assert 0.3 <= elapsed < 2
+
+def test_gives_up_after_grace(io_loop):
+	admission.acquire("Test_Handler")
+	_, elapsed = stop_after_signal(io_loop, grace=0.3)
+	assert 0.3 <= elapsed < 2
+
+def is_running(pid):
+	"""Whether pid is alive and not a zombie"""
+	try:
+		with open("/proc/{0}/stat".format(pid)) as stat:
+			return stat.read().rsplit(")", 1)[1].split()[0] != "Z"
+	except OSError:
+		return False
+
+@pytest.mark.skipif(not os.path.isdir("/proc"), reason="reads /proc")
+def test_restart_terminates_pool_of_killed_worker(tmp_path):
+	marker = str(tmp_path / "grandchild")
+	script = textwrap.dedent("""
+		import os, signal, sys, time
+		from mind.api import prefork
+		prefork.fork_workers(1, max_restarts=1)
+		if os.path.exists(sys.argv[1]):
+			time.sleep(60)
+		pid = os.fork()
+		if pid == 0:
+			time.sleep(60)
+			os._exit(0)
+		with open(sys.argv[1], "w") as marker:
+			marker.write(str(pid))
+		os.kill(os.getpid(), signal.SIGKILL)
+	""")
+	root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+	parent = subprocess.Popen([sys.executable, "-c", script, marker], cwd=root)
+
+	try:
+		deadline = time.time() + 10
+		while not (os.path.exists(marker) and open(marker).read()) and time.time() < deadline:
+			time.sleep(0.05)
+		grandchild = int(open(marker).read())
+		deadline = time.time() + 5
+		while is_running(grandchild) and time.time() < deadline:
+			time.sleep(0.05)
+		assert not is_running(grandchild)
+	finally:
+		parent.send_signal(signal.SIGTERM)
+		parent.wait(timeout=10)
@@ -0,0 +1,64 @@
+"""Tests for ProgressReporter"""
+
+import json
+import logging
+import time
+
+import numpy as np
+import pytest
+
+from mind.tools import ProgressReporter, format_duration
+
+class Clock(object):
+	"""perf_counter stand in advanced by hand"""
+
+	def __init__(self):
+		self.now = 1000.0
+
+	def __call__(self):
+		return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+	clock = Clock()
+	monkeypatch.setattr(time, "perf_counter", clock)
+	return clock
+
+@pytest.mark.parametrize("seconds, text", [(12.54, "12.5s"), (249, "4m09s"), (7500, "2h05m"), (273600, "3d04h")])
+def test_format_duration(seconds, text):
+	assert format_duration(seconds) == text
+
+def test_reports_once_per_interval(clock, tmp_path, caplog):
+	log_path = str(tmp_path / "progress.jsonl")
+	caplog.set_level(logging.INFO)
+
+	with ProgressReporter("train", total=100, interval=10, log_path=log_path) as progress:
+		reported = []
+		for step in range(25):
+			clock.now += 1
+			reported.append(progress.update(items=2, examples=64, loss=np.float32(0.5), epoch=1))
+
+		# Reports at 10, 20 seconds, then the rest on close
+		assert [i for i, r in enumerate(reported) if r] == [9, 19]
+
+	records = [json.loads(line) for line in open(log_path)]
+
+	assert [r["items"] for r in records] == [20, 40, 50]
+	assert records[0]["items_per_sec"] == pytest.approx(2)
+	assert records[0]["examples_per_sec"] == pytest.approx(64)
+	assert records[0]["eta"] == pytest.approx(40)
+	assert records[1]["elapsed"] == pytest.approx(20)
+	assert records[0]["step_time"] == pytest.approx(1)
+	assert records[0]["loss"] == 0.5 and records[0]["epoch"] == 1
+	assert "train: 20/100 items (20.0%)" in caplog.text
+	assert "ETA 40.0s" in caplog.text
+
+def test_close_without_new_items(clock, tmp_path):
+	log_path = str(tmp_path / "progress.jsonl")
+	progress = ProgressReporter("loop", interval=1, log_path=log_path)
+	clock.now += 2
+	assert progress.update()
+	progress.close()
+
+	records = [json.loads(line) for line in open(log_path)]
+	assert len(records) == 1 and records[0]["eta"] is None
@@ -0,0 +1,95 @@
+"""Tests for quantizing the CNN weights to int8 and float16"""
+
+import json
+import os
+
+import numpy as np
+import pytest
+
+from mind.export_cnn import fold_batch_norm
+from mind.numpy_cnn import weights_paths_of
+from mind.quantize_cnn import load_quantized, predict, quantize, quantized_path_of, report_passes, report_path_of, save_quantized, weight_bytes
+
+ALPHABET = "abcdefghijkl"
+
+@pytest.fixture
+def folded(cnn_variables):
+	return fold_batch_norm(cnn_variables)
+
+def test_int8_error_within_half_a_step(folded):
+	quantized = quantize(folded, "int8")
+
+	for name, values in folded.items():
+		if not name.endswith("_weights"):
+			assert quantized[name] is values
+			continue
+		scale = quantized[name + "_scale"]
+		assert quantized[name].dtype == np.int8 and scale.shape == values.shape[-1:]
+		assert np.abs(quantized[name]).max() == 127
+		assert np.all(np.abs(quantized[name] * scale - values) <= scale / 2 + 1e-7)
+
+def test_float16(folded):
+	quantized = quantize(folded, "float16")
+	weights = quantized["fc0_weights"]
+
+	assert weights.dtype == np.float16 and "fc0_weights_scale" not in quantized
+	np.testing.assert_allclose(weights.astype(np.float32), folded["fc0_weights"], rtol=1e-3, atol=1e-4)
+	assert weight_bytes(quantized) < weight_bytes(folded)
+
+def test_zero_channels_keep_a_scale():
+	quantized = quantize({"fc0_weights": np.zeros((3, 2), dtype=np.float32)}, "int8")
+	np.testing.assert_array_equal(quantized["fc0_weights_scale"], [1, 1])
+
+def test_unknown_mode(folded):
+	with pytest.raises(ValueError):
+		quantize(folded, "int4")
+
+@pytest.mark.parametrize("mode", ["int8", "float16"])
+def test_save_and_load(folded, tmp_path, mode):
+	quantized = quantize(folded, mode)
+	path = str(tmp_path / "model.npz")
+	save_quantized(path, quantized)
+	loaded = load_quantized(path)
+
+	assert str(loaded["quantization"]) == mode
+	assert set(loaded) == set(quantized)
+	for name, values in quantized.items():
+		assert loaded[name].dtype == values.dtype
+		np.testing.assert_array_equal(loaded[name], values)
+
+def test_quantized_path():
+	assert quantized_path_of("models/sentiment.ckpt", "int8") == "models/sentiment.int8.npz"
+
+def test_predict(folded):
+	probabilities = predict(folded, ["abc", "lkj ih", ""], ALPHABET, batch_size=2)
+
+	assert probabilities.shape == (3, 4)
+	np.testing.assert_allclose(probabilities.sum(axis=1), 1, rtol=1e-5)
+	assert predict(folded, [], ALPHABET).shape == (0, 4)
+
+def write_report(quantized_path, **report):
+	with open(report_path_of(quantized_path), "w") as report_file:
+		json.dump(report, report_file)
+
+def test_report_thresholds(folded, tmp_path):
+	model_path = str(tmp_path / "sentiment.ckpt")
+	int8_path, float16_path = quantized_path_of(model_path, "int8"), quantized_path_of(model_path, "float16")
+	save_quantized(int8_path, quantize(folded, "int8"))
+	save_quantized(float16_path, quantize(folded, "float16"))
+
+	# Without reports neither quantized file is served
+	assert not report_passes(int8_path)
+
+	write_report(int8_path, agreement=0.95, float_accuracy=None, quantized_accuracy=None)
+	write_report(float16_path, agreement=0.999, float_accuracy=0.8, quantized_accuracy=0.798)
+	assert not report_passes(int8_path) and report_passes(float16_path)
+	assert weights_paths_of(model_path, "auto") == [float16_path, str(tmp_path / "sentiment.npz")]
+
+	write_report(int8_path, agreement=0.995, float_accuracy=0.8, quantized_accuracy=0.79)
+	assert not report_passes(int8_path)
+	write_report(int8_path, agreement=0.995, float_accuracy=None, quantized_accuracy=None)
+	assert report_passes(int8_path)
+
+	# Weights rewritten after their report are not trusted
+	os.utime(int8_path, ns=(2 ** 62, 2 ** 62))
+	assert not report_passes(int8_path)
@@ -0,0 +1,83 @@
+"""Tests for streaming thoughts as records"""
+
+import json
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from mind.tools import load_dict_list, stream_thoughts
+
+CSV = (
+	"Thought,Seer,Type,Post date\n"
+	"first thought,alice,State,09/04/15 10:30 PM\n"
+	"\"multi\nline, \"\"quoted\"\"\",bob,Ask,09/05/15 01:05 AM\n"
+	"\n"
+	"short row,alice\n"
+	"é unicode,carol,Predict,01/01/16 09:00 AM\n"
+)
+
+@pytest.fixture
+def thoughts_csv(tmp_path):
+	path = tmp_path / "thoughts.csv"
+	path.write_text(CSV, encoding="utf-8")
+	return str(path)
+
+def test_records_match_dict_list(thoughts_csv):
+	expected = load_dict_list(thoughts_csv)
+	records = list(stream_thoughts(thoughts_csv))
+
+	assert [record.to_dict() for record in records] == expected
+	for record, row in zip(records, expected):
+		assert list(record.keys()) == list(row.keys())
+		assert all(record[key] == row[key] and record.get(key) == row.get(key) for key in row)
+		assert "mood" not in record and record.get("mood", 0) == 0
+
+def test_extra_fields(thoughts_csv):
+	records = stream_thoughts(thoughts_csv, extra=("mood", "Seer"), materialize=True)
+
+	assert [record.to_dict() for record in records] == [dict(row, mood="") for row in load_dict_list(thoughts_csv)]
+
+	records[0]["mood"] = 7.0
+	assert records[0]["mood"] == 7.0 and records[0]["Thought"] == "first thought"
+
+def test_chunks_and_interning(thoughts_csv):
+	chunks = list(stream_thoughts(thoughts_csv, chunk_size=3))
+
+	assert [len(chunk) for chunk in chunks] == [3, 1]
+	assert chunks[0][0]["Seer"] is chunks[0][2]["Seer"]
+
+def test_records_behave_like_dicts(thoughts_csv):
+	record = next(stream_thoughts(thoughts_csv, extra=("mood",)))
+	expected = dict(load_dict_list(thoughts_csv)[0], mood="")
+
+	assert record == expected
+	assert list(record.items()) == list(expected.items())
+	assert list(record.values()) == list(expected.values())
+	assert json.loads(json.dumps(record)) == expected
+
+def test_positional_access(thoughts_csv):
+	record = next(stream_thoughts(thoughts_csv))
+
+	assert record[0] == "first thought" and record[-1] == "09/04/15 10:30 PM"
+	assert record[1:3] == ["alice", "State"]
+
+	record[1] = "bob"
+	assert record["Seer"] == "bob"
+
+	with pytest.raises(KeyError):
+		record["missing"]
+
+def count_characters(record):
+	record["mood"] = len(record["Thought"])
+	return record
+
+def test_records_cross_process_pools(thoughts_csv):
+	records = stream_thoughts(thoughts_csv, extra=("mood",), materialize=True)
+
+	with ProcessPoolExecutor(max_workers=2) as executor:
+		returned = list(executor.map(count_characters, records))
+
+	assert [record["mood"] for record in returned] == [len(record["Thought"]) for record in records]
+	assert type(returned[0]) is type(records[0])
+	assert pickle.loads(pickle.dumps(records[1])) == records[1]
@@ -0,0 +1,110 @@
+"""Tests for the shared ModelRegistry, with stand in models"""
+
+import threading
+import time
+
+import pytest
+
+from mind.load_model import LoadedModel, ModelRegistry
+
+class Session(object):
+	"""Records whether the model was closed"""
+
+	def __init__(self):
+		self.closed = False
+
+	def close(self):
+		self.closed = True
+
+class Loaders(object):
+	"""Loaders of stand in models that count their loads"""
+
+	def __init__(self, sizes):
+		self.sizes = sizes
+		self.loads = {name: 0 for name in sizes}
+		self.sessions = {name: [] for name in sizes}
+
+	def register(self, registry):
+		for name in self.sizes:
+			registry.register(name, lambda name=name: self.load(name))
+
+	def load(self, name):
+		self.loads[name] += 1
+		session = Session()
+		self.sessions[name].append(session)
+		return LoadedModel(name, session, lambda value: (name, value), self.sizes[name])
+
+@pytest.fixture
+def loaders():
+	return Loaders({"a": 100, "b": 200, "c": 300})
+
+def test_loads_once_on_first_use(loaders):
+	registry = ModelRegistry()
+	loaders.register(registry)
+	apply_a = registry.get("a")
+
+	assert loaders.loads["a"] == 0
+	assert apply_a(1) == ("a", 1) and apply_a(2) == ("a", 2)
+	assert loaders.loads == {"a": 1, "b": 0, "c": 0}
+
+	with pytest.raises(KeyError):
+		registry.call("missing")
+
+def test_concurrent_first_use_loads_once(loaders):
+	registry = ModelRegistry()
+	original = loaders.load
+	loaders.load = lambda name: (time.sleep(0.05), original(name))[1]
+	loaders.register(registry)
+
+	threads = [threading.Thread(target=registry.call, args=("a", i)) for i in range(8)]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+
+	assert loaders.loads["a"] == 1
+
+def test_budget_evicts_least_recently_used(loaders):
+	registry = ModelRegistry(memory_budget=450)
+	loaders.register(registry)
+
+	registry.call("a", 0)
+	registry.call("b", 0)
+	registry.call("a", 0)
+	registry.call("c", 0)
+
+	assert registry.resident() == [("a", 100), ("c", 300)]
+	assert loaders.sessions["b"][0].closed
+
+	# The most recent model stays even when alone over budget
+	registry.configure(memory_budget=50)
+	assert registry.resident() == [("c", 300)]
+
+	registry.call("b", 0)
+	assert loaders.loads["b"] == 2
+
+def test_idle_eviction(loaders):
+	registry = ModelRegistry()
+	loaders.register(registry)
+	registry.call("a", 0)
+	registry.call("b", 0)
+
+	registry.configure(idle_timeout=0.01)
+	registry.models["b"].last_used = time.monotonic() + 60
+	time.sleep(0.02)
+	registry.evict_idle()
+
+	assert registry.resident() == [("b", 200)]
+	assert loaders.sessions["a"][0].closed
+
+def test_close_deferred_while_in_use(loaders):
+	registry = ModelRegistry()
+	loaders.register(registry)
+	model = registry.acquire("a")
+
+	registry.evict("a")
+	assert registry.resident() == []
+	assert not loaders.sessions["a"][0].closed
+
+	registry.release(model)
+	assert loaders.sessions["a"][0].closed
@@ -0,0 +1,65 @@
+"""Tests for compiled schema validation of API handlers"""
+
+import json
+
+import jsonschema
+import pytest
+from tornado.testing import AsyncHTTPTestCase
+from tornado.options import options
+from tornado_json.application import Application
+
+from mind.api import schema
+from mind.api.base import Base_Handler
+
+INPUT_SCHEMA = {"type": "object", "properties": {"value": {"type": "integer"}}, "required": ["value"]}
+OUTPUT_SCHEMA = {"type": "object", "properties": {"doubled": {"type": "integer"}}, "required": ["doubled"]}
+
+class Doubling_Handler(Base_Handler):
+
+	@schema.validate(input_schema=INPUT_SCHEMA, output_schema=OUTPUT_SCHEMA)
+	def post(self):
+		if self.body["value"] < 0:
+			return {"doubled": "negative"}
+		return {"doubled": self.body["value"] * 2}
+
+def test_invalid_schema_fails_when_decorating():
+	with pytest.raises(jsonschema.SchemaError):
+		schema.validate(input_schema={"type": "not a type"})
+
+def test_route_schemas_load_from_any_directory(tmp_path, monkeypatch):
+	monkeypatch.chdir(tmp_path)
+	loaded = schema.load_schemas("wordstream")
+	assert set(loaded) == {"input_schema", "input_example", "output_schema", "output_example"}
+
+class Test_Validate(AsyncHTTPTestCase):
+
+	def get_app(self):
+		return Application(routes=[("/double", Doubling_Handler)], settings={})
+
+	def post(self, body):
+		return self.fetch("/double", method="POST", body=json.dumps(body))
+
+	def tearDown(self):
+		options.output_validation_rate = 1.0
+		super().tearDown()
+
+	def test_valid_request(self):
+		response = self.post({"value": 4})
+		assert response.code == 200
+		assert json.loads(response.body)["data"] == {"doubled": 8}
+
+	def test_invalid_input_is_rejected(self):
+		assert self.post({"value": "four"}).code == 400
+
+	def test_malformed_input_is_rejected(self):
+		assert self.fetch("/double", method="POST", body="{").code == 400
+
+	def test_invalid_output_is_caught_when_sampled(self):
+		options.output_validation_rate = 1.0
+		assert self.post({"value": -1}).code == 500
+
+	def test_output_validation_can_be_disabled(self):
+		options.output_validation_rate = 0.0
+		response = self.post({"value": -1})
+		assert response.code == 200
+		assert json.loads(response.body)["data"] == {"doubled": "negative"}
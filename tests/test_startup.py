@@ -0,0 +1,53 @@
+"""Tests for fast startup, warmup and readiness"""
+
+import json
+import os
+import subprocess
+import sys
+
+from tornado.testing import AsyncHTTPTestCase
+from tornado.web import Application
+
+from mind.api import startup
+
+HEAVY_MODULES = ["numpy", "scipy", "nltk", "sklearn", "pandas"]
+
+def test_routes_import_without_heavy_libraries():
+	code = "import sys, mind.__main__; print([m for m in {0} if m in sys.modules])".format(HEAVY_MODULES)
+	root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+	output = subprocess.check_output([sys.executable, "-c", code], cwd=root)
+	assert output.strip() == b"[]"
+
+class Warming_Handler(object):
+	calls = 0
+
+	@classmethod
+	def warmup(cls):
+		cls.calls += 1
+
+def test_warmup_runs_each_handler_once_and_times_it(set_options):
+	timer = startup.StartupTimer()
+	startup.warmup([("/a", Warming_Handler), ("/b", object)], timer)
+	assert Warming_Handler.calls == 1
+	assert [name for name, _ in timer.phases] == ["warmup:Warming_Handler"]
+
+	set_options(warmup=False)
+	startup.warmup([("/a", Warming_Handler)], timer)
+	assert Warming_Handler.calls == 1
+
+class Test_Ready_Handler(AsyncHTTPTestCase):
+
+	def get_app(self):
+		return Application([("/ready", startup.Ready_Handler)])
+
+	def tearDown(self):
+		startup.set_ready(False)
+		super().tearDown()
+
+	def test_not_ready_until_serving(self):
+		startup.set_ready(False)
+		response = self.fetch("/ready")
+		assert response.code == 503
+		assert json.loads(response.body) == {"ready": False}
+		startup.set_ready()
+		assert self.fetch("/ready").code == 200
@@ -0,0 +1,66 @@
+"""Tests for the memoized tokenizers and their sqlite store"""
+
+import pytest
+
+from mind import tokens
+from mind.tokens import TokenCache, make_tokenizer
+
+TEXTS = [
+	"Hello #gameb world :) @prophet",
+	"I can't believe it's not butter!!!",
+	"émigré naïve café, ok?",
+	"",
+	"Hello #gameb world :) @prophet"
+]
+
+@pytest.mark.parametrize("name", ["tweet", "alnum"])
+def test_cache_matches_tokenizer(name):
+	base = make_tokenizer(name)
+	cache = TokenCache(name)
+
+	assert [cache.tokenize(text) for text in TEXTS] == [tuple(base(text)) for text in TEXTS]
+	assert cache.stats()["hits"] == 1
+
+def test_unknown_tokenizer():
+	with pytest.raises(ValueError):
+		make_tokenizer("unknown")
+
+def test_store_round_trip(tmp_path):
+	path = str(tmp_path / "store" / "tokens.sqlite")
+	first = TokenCache("tweet", path=path, batch_size=2)
+	expected = [first.tokenize(text) for text in TEXTS]
+	first.flush()
+
+	second = TokenCache("tweet", path=path)
+	second.base_tokenize = None
+	assert [second.tokenize(text) for text in TEXTS] == expected
+	assert second.stats()["store_hits"] == 4
+
+def test_store_keys_differ_by_version(tmp_path):
+	path = str(tmp_path / "tokens.sqlite")
+	cache = TokenCache("tweet", path=path)
+	cache.tokenize(TEXTS[0])
+	cache.flush()
+
+	other = TokenCache("alnum", path=path)
+	assert other.key(TEXTS[0]) != cache.key(TEXTS[0])
+	assert other.tokenize(TEXTS[0]) == ("hello", "gameb", "world", "prophet")
+	assert other.stats()["store_hits"] == 0
+
+def test_module_tokenize(monkeypatch):
+	monkeypatch.setattr(tokens, "_caches", {})
+	assert tokens.tokenize("A b", "alnum") == ("a", "b")
+	assert tokens.get_token_cache("alnum").stats()["misses"] == 1
+
+def test_pool_processes_save_their_tokens(tmp_path, monkeypatch):
+	from mind.word_count import WordCounter
+
+	path = str(tmp_path / "tokens.sqlite")
+	monkeypatch.setattr(tokens, "_caches", {"alnum": TokenCache("alnum", path=path, batch_size=1000)})
+	thoughts = ["thought number {0}".format(i) for i in range(40)]
+	WordCounter(tokenizer="alnum").count(thoughts, chunk_size=10, workers=2)
+
+	stored = TokenCache("alnum", path=path)
+	stored.base_tokenize = None
+	assert [stored.tokenize(t) for t in thoughts] == [("thought", "number", str(i)) for i in range(40)]
+	assert stored.stats()["store_hits"] == 40
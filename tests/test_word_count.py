@@ -0,0 +1,95 @@
+"""Tests for the streaming WordCounter"""
+
+import numpy as np
+import pytest
+
+from nltk.tokenize import TweetTokenizer
+from sklearn.feature_extraction.text import CountVectorizer
+
+from mind.word_count import WordCounter
+
+THOUGHTS = [
+	"The quick brown fox jumps over the lazy dog",
+	"#GameB is the game, the GAME is #gameb",
+	"I think @prophet will predict rain :) tomorrow",
+	"fox fox fox",
+	"",
+	"Dogs and foxes; dogs and FOXES!"
+] * 7
+
+def reference_vectorizer(min_length, vocabulary=None):
+	"""Binary CountVectorizer over the tokens WordCounter keeps"""
+
+	tokenize = TweetTokenizer().tokenize
+	vectorizer = CountVectorizer(
+		tokenizer=lambda text: [t for t in tokenize(text) if len(t) >= min_length],
+		token_pattern=None,
+		stop_words="english",
+		binary=True,
+		vocabulary=vocabulary
+	)
+
+	return vectorizer
+
+def reference(thoughts, min_length, vocabulary=None):
+	"""Document frequencies as a binary CountVectorizer counts them"""
+
+	vectorizer = reference_vectorizer(min_length, vocabulary)
+	counts = np.asarray(vectorizer.fit_transform(thoughts).sum(axis=0)).ravel()
+
+	return {word: int(count) for word, count in zip(vectorizer.get_feature_names_out(), counts) if count > 0}
+
+@pytest.mark.parametrize("min_length", [1, 2, 3])
+def test_matches_count_vectorizer(min_length):
+	assert WordCounter(min_length=min_length).count(THOUGHTS) == reference(THOUGHTS, min_length)
+
+def test_term_matrix_matches_count_vectorizer():
+	vectorizer = reference_vectorizer(3)
+	expected = vectorizer.fit_transform(THOUGHTS)
+	matrix, terms = WordCounter(min_length=3).term_matrix(THOUGHTS)
+
+	assert terms == vectorizer.get_feature_names_out().tolist()
+	assert (matrix != expected).nnz == 0
+
+def test_groups_are_indicator_sums():
+	groups = [THOUGHTS[:5], [], THOUGHTS[5:20], ["the and of"], THOUGHTS[20:]]
+	counter = WordCounter()
+	expected = [sorted(counter.count(group).items()) for group in groups]
+
+	assert counter.count_by_group(groups) == expected
+	assert counter.count_by_group(iter(groups), chunk_size=2) == expected
+	assert counter.count_by_group([]) == []
+
+def test_vocabulary_and_min_df():
+	vocabulary = ["fox", "dogs", "#gameb", "absent"]
+	counter = WordCounter(vocabulary=vocabulary)
+
+	assert counter.count(THOUGHTS) == reference(THOUGHTS, 2, vocabulary=vocabulary)
+	assert counter.count(THOUGHTS, min_df=8) == {"fox": 14}
+
+@pytest.mark.parametrize("chunk_size", [None, 1, 5])
+def test_parallel_matches_serial(chunk_size):
+	counter = WordCounter()
+	serial = counter.count(THOUGHTS)
+
+	assert counter.count(iter(THOUGHTS), chunk_size=chunk_size, workers=2) == serial
+	assert counter.count_by_group([THOUGHTS[:6], THOUGHTS[6:]], workers=2) == \
+		[sorted(counter.count(THOUGHTS[:6]).items()), sorted(counter.count(THOUGHTS[6:]).items())]
+
+def test_hashing_buckets():
+	counts = WordCounter(hashing=True, n_features=8).count(THOUGHTS)
+	assert set(counts) <= set(range(8))
+
+def test_fingerprint():
+	base = WordCounter(min_length=3).fingerprint()
+
+	assert base == WordCounter(min_length=3).fingerprint()
+	assert base.startswith("nltk-tweet-v1-len3-")
+	assert len({
+		base,
+		WordCounter(min_length=2).fingerprint(),
+		WordCounter(min_length=3, stop_words=None).fingerprint(),
+		WordCounter(min_length=3, vocabulary=["fox"]).fingerprint(),
+		WordCounter(min_length=3, hashing=True).fingerprint(),
+		WordCounter(min_length=3, tokenizer="alnum").fingerprint()
+	}) == 6
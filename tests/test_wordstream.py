@@ -0,0 +1,68 @@
+"""Tests that wordstream counts match the original per day
+CountVectorizer path"""
+
+import numpy as np
+from nltk.tokenize import TweetTokenizer
+from sklearn.feature_extraction.text import CountVectorizer
+
+from mind.api import schema
+from mind.api import pool
+from mind.api.wordstream import chunk_days, count_by_day, days_per_task, process_by_day
+
+def reference_process_by_day(data):
+	"""The per day implementation the batched engine replaced"""
+
+	tknzr = TweetTokenizer().tokenize
+	output = {"days": []}
+
+	for day in data["days"]:
+		vectorizer = CountVectorizer(tokenizer=lambda t: [o for o in tknzr(t) if len(o) > 2], stop_words="english", token_pattern=None)
+		try:
+			counts = vectorizer.fit_transform(day["thoughts"]).toarray()
+		except ValueError:
+			continue
+		np.clip(counts, 0, 1, out=counts)
+		word_list = [{"word": w, "count": int(c)} for w, c in zip(vectorizer.get_feature_names_out(), counts.sum(axis=0))]
+		output["days"].append({"word_list": word_list, "date": day["date"]})
+
+	return output
+
+DAYS = {"days": [
+	{"date": "2015-09-01", "thoughts": ["I love running in the rain", "Running late again, love it", "RAIN rain rain #weather @friend"]},
+	{"date": "2015-09-02", "thoughts": ["the and of", "it is"]},
+	{"date": "2015-09-03", "thoughts": []},
+	{"date": "2015-09-04", "thoughts": ["Café crème 🙂 tastes great", "great café, great day http://t.co/x"]}
+]}
+
+def test_matches_reference_on_example_input():
+	example = schema.load_schemas("wordstream")["input_example"]
+	assert process_by_day(example) == reference_process_by_day(example)
+
+def test_matches_reference_with_empty_and_stop_word_days():
+	assert process_by_day(DAYS) == reference_process_by_day(DAYS)
+
+def test_one_result_per_day():
+	counted = count_by_day(DAYS["days"])
+	assert len(counted) == len(DAYS["days"])
+	assert counted[1] is None and counted[2] is None
+
+def test_chunks_cover_every_day_in_order():
+	days = list(range(10))
+	chunks = chunk_days(days, 3)
+	assert [len(chunk) for chunk in chunks] == [3, 3, 3, 1]
+	assert sum(chunks, []) == days
+	assert chunk_days(days, 0) == [[day] for day in days]
+
+def test_days_fan_out_over_the_pool(set_options):
+	set_options(pool_size=4, max_fanout=8, days_per_task=0)
+	assert pool.parallelism() == 4
+	assert [days_per_task(n) for n in [1, 4, 10, 365]] == [1, 1, 3, 92]
+
+	# Fan-out is bounded by max_fanout and by an explicit cap
+	set_options(pool_size=16, max_fanout=8)
+	assert days_per_task(30) == 4
+	set_options(days_per_task=2)
+	assert days_per_task(30) == 2
+
+	set_options(pool_size=0, days_per_task=0)
+	assert days_per_task(30) == 30